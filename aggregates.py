@@ -0,0 +1,149 @@
+"""
+이벤트 단위로 누적 갱신하는 출석 집계.
+이벤트 기록은 보통 뒤에 탭이 추가되거나 진행 중인 마지막 탭만 바뀌므로, 바뀐 이벤트부터만 다시 반영합니다.
+
+- 사람별: 참석 횟수, 처음 온 이벤트, 마지막으로 온 이벤트
+- 이벤트별: 등록자, 참석자, 신규, 복귀, 이전까지 온 사람 수
+- 전체 기간 KPI(고유 참석자, 2회 이상 참석자, 1인당 평균 참석)는 저장된 합계로 O(1)에 답합니다.
+
+이벤트 순서는 출석 매트릭스의 열 순서입니다. 매 새로고침마다 이벤트별 참석자 집합의 요약값을
+비교해, 처음으로 달라진 이벤트 앞까지는 그대로 두고 그 뒤만 되돌린 다음 다시 반영합니다.
+동일인 합치기·이름 변경으로 앞쪽 이벤트의 참석자 표시가 바뀌어도 요약값이 달라지므로 정확합니다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Aggregates:
+    """한 스냅샷 시점의 집계 결과. 만들어진 뒤에는 바뀌지 않습니다."""
+    total_unique: int
+    multi_attendees: int
+    total_attendance: int
+    summary: pd.DataFrame   # analyzer.event_summary(matrix, detail_df)와 같은 표
+    exact: bool             # False면 같은 이름의 행이 있어 2회 이상·평균 KPI는 매트릭스에서 직접 계산해야 함
+
+    @property
+    def avg_events_per_person(self) -> float:
+        return self.total_attendance / self.total_unique if self.total_unique else float("nan")
+
+
+class AggregateStore:
+    """
+    누적 집계 상태. DataService의 새로고침 스레드 하나에서만 갱신합니다.
+    화면·API는 update()가 돌려주는 Aggregates(스냅샷에 담김)만 읽습니다.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.events: list[str] = []
+        self._digests: list[tuple] = []
+        self._attendees: list[frozenset] = []
+        self._per_event: list[tuple[int, int, int, int]] = []  # (등록자, 참석자, 신규, 이전까지 온 사람 수)
+        self.count: dict[str, int] = {}
+        self.first_seen: dict[str, int] = {}  # 사람 -> 이벤트 위치
+        self.last_seen: dict[str, int] = {}
+        self._attendance = 0
+        self._multi = 0
+
+    def update(self, matrix: pd.DataFrame, detail_df: pd.DataFrame) -> Aggregates:
+        """새 매트릭스에 맞춰 바뀐 이벤트부터 다시 반영하고 결과를 돌려줍니다."""
+        events = list(matrix.columns)
+        registered = (
+            detail_df.groupby("event")["user_hash"].nunique().to_dict() if not detail_df.empty else {}
+        )
+        columns = matrix.to_numpy() > 0 if not matrix.empty else np.zeros((0, len(events)), dtype=bool)
+        label_hashes = pd.util.hash_array(matrix.index.to_numpy(dtype=object)) if len(events) else None
+
+        try:
+            start = 0
+            incoming = []
+            for i, event in enumerate(events):
+                attended = columns[:, i]
+                # 참석자 집합의 순서 무관 요약 (해시 합) + 인원 + 등록자 수
+                digest = (event, int(label_hashes[attended].sum()), int(attended.sum()), registered.get(event, 0))
+                incoming.append(digest)
+                if start == i and i < len(self._digests) and self._digests[i] == digest:
+                    start = i + 1
+            self._rewind(start)
+            for i in range(start, len(events)):
+                self._apply(events[i], incoming[i], frozenset(matrix.index[columns[:, i]]))
+        except BaseException:
+            self.clear()  # 중간에 실패하면 다음 새로고침에서 처음부터 다시 계산
+            raise
+        return self._result(matrix.index.is_unique)
+
+    def _apply(self, event: str, digest: tuple, attendees: frozenset) -> None:
+        prev_base = len(self.count)
+        position = len(self.events)
+        new = 0
+        for person in attendees:
+            n = self.count.get(person, 0) + 1
+            self.count[person] = n
+            if n == 1:
+                self.first_seen[person] = position
+                new += 1
+            elif n == 2:
+                self._multi += 1
+            self.last_seen[person] = position
+        self._attendance += len(attendees)
+        self.events.append(event)
+        self._digests.append(digest)
+        self._attendees.append(attendees)
+        self._per_event.append((digest[3], len(attendees), new, prev_base))
+
+    def _rewind(self, position: int) -> None:
+        """position 이후 이벤트의 반영을 되돌립니다."""
+        if position >= len(self.events):
+            return
+        touched: set[str] = set()
+        for attendees in reversed(self._attendees[position:]):
+            for person in attendees:
+                n = self.count[person] - 1
+                if n == 0:
+                    del self.count[person], self.first_seen[person], self.last_seen[person]
+                    continue
+                self.count[person] = n
+                if n == 1:
+                    self._multi -= 1
+                touched.add(person)
+            self._attendance -= len(attendees)
+        del self.events[position:], self._digests[position:], self._attendees[position:], self._per_event[position:]
+        # 남은 사람의 마지막 참석은 앞쪽 이벤트에서 다시 찾음 (처음 참석은 앞쪽에 있으므로 그대로)
+        pending = {p for p in touched if p in self.count}
+        for i in range(position - 1, -1, -1):
+            if not pending:
+                break
+            found = pending & self._attendees[i]
+            for person in found:
+                self.last_seen[person] = i
+            pending -= found
+
+    def member(self, person: str) -> tuple[int, str, str] | None:
+        """(참석 횟수, 처음 온 이벤트, 마지막으로 온 이벤트). 참석 기록이 없으면 None."""
+        n = self.count.get(person)
+        if n is None:
+            return None
+        return n, self.events[self.first_seen[person]], self.events[self.last_seen[person]]
+
+    def _result(self, exact: bool) -> Aggregates:
+        rows = self._per_event
+        summary = pd.DataFrame({
+            "이벤트": list(self.events),
+            "등록자": [r[0] for r in rows],
+            "참석자": [r[1] for r in rows],
+            "신규": [r[2] for r in rows],
+            "복귀": [r[1] - r[2] for r in rows],
+            "복귀율(%)": [round((r[1] - r[2]) / r[3] * 100, 1) if r[3] > 0 else "-" for r in rows],
+        }) if rows else pd.DataFrame()
+        return Aggregates(
+            total_unique=len(self.count),
+            multi_attendees=self._multi,
+            total_attendance=self._attendance,
+            summary=summary,
+            exact=exact,
+        )
@@ -1,7 +1,9 @@
 """
 출석 매트릭스를 기반으로 리텐션 지표를 계산합니다.
 """
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 
 
 def event_summary(matrix: pd.DataFrame, detail_df: pd.DataFrame) -> pd.DataFrame:
@@ -10,40 +12,45 @@ def event_summary(matrix: pd.DataFrame, detail_df: pd.DataFrame) -> pd.DataFrame
     - 등록자 수, 실제 참석자 수, 신규/복귀 참석자 수, 복귀율
     """
     event_cols = list(matrix.columns)
-    results = []
-    cumulative_seen: set = set()
-
-    for event in event_cols:
-        attendees = set(matrix.index[matrix[event] > 0].tolist())
-        new_users = attendees - cumulative_seen
-        returning_users = attendees & cumulative_seen
-
-        # 복귀율: 이전까지 온 사람 중 이번에도 온 비율
-        prev_base = len(cumulative_seen)
-        retention_rate = (
-            len(returning_users) / prev_base * 100 if prev_base > 0 else None
-        )
+    if not event_cols:
+        return pd.DataFrame()
 
-        # 등록자 수 (실제 참석 여부 무관)
-        registered_count = (
-            detail_df[detail_df["event"] == event]["user_hash"].nunique()
-            if detail_df is not None
-            else None
+    # 같은 이름의 행(이름 충돌)은 한 사람으로 셈
+    if not matrix.index.is_unique:
+        matrix = matrix.groupby(level=0).max()
+    attended = matrix.to_numpy() > 0
+
+    # 첫 참석 이벤트로 신규 수를 세고, 누적 합으로 "이전까지 온 사람 수"를 구함
+    has_any = attended.any(axis=1)
+    first = attended[has_any].argmax(axis=1)
+    n_attended = attended.sum(axis=0)
+    n_new = np.bincount(first, minlength=len(event_cols))
+    n_returning = n_attended - n_new
+    prev_base = np.cumsum(n_new) - n_new
+
+    if detail_df is not None:
+        registered = (
+            detail_df.groupby("event")["user_hash"].nunique()
+            .reindex(event_cols, fill_value=0)
+            .tolist()
         )
+    else:
+        registered = [None] * len(event_cols)
 
-        results.append(
-            {
-                "이벤트": event,
-                "등록자": registered_count,
-                "참석자": len(attendees),
-                "신규": len(new_users),
-                "복귀": len(returning_users),
-                "복귀율(%)": round(retention_rate, 1) if retention_rate is not None else "-",
-            }
-        )
-        cumulative_seen |= attendees
+    # 복귀율: 이전까지 온 사람 중 이번에도 온 비율
+    retention = [
+        round(int(r) / int(b) * 100, 1) if b > 0 else "-"
+        for r, b in zip(n_returning, prev_base)
+    ]
 
-    return pd.DataFrame(results)
+    return pd.DataFrame({
+        "이벤트": event_cols,
+        "등록자": registered,
+        "참석자": n_attended.tolist(),
+        "신규": n_new.tolist(),
+        "복귀": n_returning.tolist(),
+        "복귀율(%)": retention,
+    })
 
 
 def attendance_frequency(matrix: pd.DataFrame) -> pd.DataFrame:
@@ -63,40 +70,81 @@ def cohort_retention(matrix: pd.DataFrame) -> pd.DataFrame:
     코호트 = 처음 참석한 이벤트.
     각 셀: 코호트 중 N번째 이후 이벤트에도 온 비율(%).
     """
-    event_cols = list(matrix.columns)
-    n = len(event_cols)
+    table = cohort_retention_bucketed(matrix, "event")
+    if table.empty:
+        return table
+    # 오프셋 열은 가장 이른 코호트가 가질 수 있는 만큼만
+    first_idx = list(matrix.columns).index(table.index[0])
+    return table.iloc[:, : 1 + len(matrix.columns) - first_idx]
 
-    # 각 사용자의 첫 참석 이벤트 인덱스
-    def first_event_idx(row):
-        for i, col in enumerate(event_cols):
-            if row[col] > 0:
-                return i
-        return None
-
-    matrix = matrix.copy()
-    matrix["cohort_idx"] = matrix.apply(first_event_idx, axis=1)
-    matrix = matrix.dropna(subset=["cohort_idx"])
-    matrix["cohort_idx"] = matrix["cohort_idx"].astype(int)
-
-    cohort_data = {}
-    for c_idx in range(n):
-        cohort = matrix[matrix["cohort_idx"] == c_idx]
-        if cohort.empty:
-            continue
-        cohort_size = len(cohort)
-        row = {"코호트": event_cols[c_idx], "코호트 크기": cohort_size}
-        for offset in range(n - c_idx):
-            target_idx = c_idx + offset
-            target_col = event_cols[target_idx]
-            came = cohort[target_col].sum()
-            row[f"+{offset}"] = round(came / cohort_size * 100, 1)
-        cohort_data[c_idx] = row
-
-    if not cohort_data:
+
+def event_buckets(
+    event_cols: list[str], bucket: str | int, event_dates: dict | None = None
+) -> list[str]:
+    """
+    이벤트마다 묶음 라벨을 붙입니다.
+    bucket: "event"(묶지 않음), "month", "quarter", 또는 정수 N(이벤트 N개씩).
+    날짜가 없는 이벤트는 바로 앞(없으면 뒤) 이벤트의 묶음에 넣습니다.
+    """
+    if bucket == "event":
+        return list(event_cols)
+    if isinstance(bucket, int):
+        n = max(1, bucket)
+        return [
+            f"{event_cols[i - i % n]} ~ ({min(n, len(event_cols) - (i - i % n))})"
+            for i in range(len(event_cols))
+        ]
+    freq = {"month": "M", "quarter": "Q"}[bucket]
+    dates = pd.Series([(event_dates or {}).get(c) for c in event_cols], dtype="datetime64[ns]")
+    labels = dates.dt.to_period(freq).astype(str).where(dates.notna())
+    labels = labels.ffill().bfill().fillna("-")
+    return labels.tolist()
+
+
+def cohort_retention_bucketed(
+    matrix: pd.DataFrame, bucket: str | int = "month", event_dates: dict | None = None
+) -> pd.DataFrame:
+    """
+    묶음(월·분기·이벤트 N개) 단위 코호트 리텐션.
+    멤버 × 묶음 참석 여부를 만든 뒤, 코호트 원-핫 행렬과의 곱 한 번으로
+    (코호트, 묶음)별 인원을 세어 +N 오프셋 표로 옮깁니다.
+    반환 형식은 cohort_retention과 같습니다 (index=코호트, 코호트 크기, +0, +1, ...).
+    """
+    if matrix.empty:
         return pd.DataFrame()
+    if bucket == "event":
+        present = matrix > 0
+    else:
+        labels = event_buckets(list(matrix.columns), bucket, event_dates)
+        # 날짜 묶음은 시간순, 그 외에는 등장 순서
+        present = (matrix.T > 0).groupby(labels, sort=bucket in ("month", "quarter")).max().T
+    names = list(present.columns)
+    attended = present.to_numpy()
+    seen = attended.any(axis=1)
+    attended = attended[seen]
+    if attended.size == 0:
+        return pd.DataFrame()
+
+    nb = len(names)
+    cohort = attended.argmax(axis=1)
+    onehot = np.zeros((len(cohort), nb), dtype=np.int64)
+    onehot[np.arange(len(cohort)), cohort] = 1
+    counts = onehot.T @ attended.astype(np.int64)  # [코호트, 묶음] 인원
+    sizes = onehot.sum(axis=0)
+
+    # counts[c, c+k] -> table[c, k]
+    offsets = np.arange(nb)
+    target = offsets[:, None] + offsets[None, :]
+    valid = target < nb
+    shifted = np.where(valid, counts[offsets[:, None], np.minimum(target, nb - 1)], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(valid, np.round(shifted / sizes[:, None] * 100, 1), np.nan)
 
-    df = pd.DataFrame(cohort_data.values()).set_index("코호트")
-    return df
+    table = pd.DataFrame(pct, index=names, columns=[f"+{k}" for k in range(nb)])
+    table.insert(0, "코호트 크기", sizes)
+    table = table[sizes > 0]
+    table.index.name = "코호트"
+    return table
 
 
 def frequency_distribution(matrix: pd.DataFrame) -> pd.DataFrame:
@@ -107,25 +155,259 @@ def frequency_distribution(matrix: pd.DataFrame) -> pd.DataFrame:
     return dist
 
 
+def event_transitions(matrix: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    이벤트 간 이동 분석.
+    참석 한 건마다 "직전에 마지막으로 온 이벤트 → 이번 이벤트"를 세어
+    (직전 참석이 없으면 "신규") 이벤트 × 이벤트 흐름 행렬을 한 번에 만듭니다.
+
+    반환:
+    - 흐름 행렬: rows=직전 참석 이벤트("신규" 포함), cols=이번 이벤트, 값=인원
+    - 복귀 확률(%): rows=이벤트, cols=다음으로 참석한 이벤트 + "미복귀".
+      해당 이벤트 참석자가 다음에 어느 이벤트로 돌아왔는지의 비율 (마르코프 전이)
+    """
+    event_cols = list(matrix.columns)
+    n = len(event_cols)
+    if n == 0 or matrix.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    attended = matrix.to_numpy() > 0
+    # 각 칸 기준 "이 이벤트 이전 마지막 참석 인덱스" (-1 = 없음)
+    seen_idx = np.where(attended, np.arange(n), -1)
+    last_seen = np.maximum.accumulate(seen_idx, axis=1)
+    prev = np.full_like(last_seen, -1)
+    prev[:, 1:] = last_seen[:, :-1]
+
+    # (직전 이벤트 + 1, 이번 이벤트) 쌍을 한 번에 집계. 0행 = 신규
+    src = prev[attended] + 1
+    dst = np.nonzero(attended)[1]
+    counts = np.bincount(src * n + dst, minlength=(n + 1) * n).reshape(n + 1, n)
+
+    flow = pd.DataFrame(counts, index=["신규"] + event_cols, columns=event_cols)
+    flow.index.name = "직전 참석"
+
+    # 복귀 확률: 이벤트 i 참석자 중 다음 참석이 j인 비율
+    sizes = attended.sum(axis=0)
+    moved = counts[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probs = np.where(sizes[:, None] > 0, moved / sizes[:, None] * 100, np.nan)
+    probs[np.tril_indices(n)] = np.nan  # 같은/이전 이벤트로의 이동은 없음
+    prob = pd.DataFrame(np.round(probs, 1), index=event_cols, columns=event_cols)
+    prob["미복귀"] = np.round(100 - np.nansum(probs, axis=1), 1)
+    prob.loc[sizes == 0, "미복귀"] = np.nan
+    prob.index.name = "이벤트"
+    return flow, prob
+
+
+def _label_propagation(weights: sp.csr_matrix, max_iter: int = 20) -> np.ndarray:
+    """가중 그래프에서 라벨 전파로 커뮤니티 번호를 구합니다 (동기식, 희소 연산)."""
+    n = weights.shape[0]
+    labels = np.arange(n)
+    # 자기 라벨에 약한 가중치를 줘서 진동을 막음
+    w = (weights + sp.identity(n, format="csr") * 0.5).tocsr()
+    for _ in range(max_iter):
+        onehot = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        new_labels = np.asarray((w @ onehot).argmax(axis=1)).ravel()
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    # 0부터 시작하는 연속 번호로 정리
+    return np.unique(labels, return_inverse=True)[1]
+
+
+CO_BLOCK_CELLS = 4_000_000  # co_attendance가 한 번에 만드는 멤버 × 멤버 블록의 최대 칸 수
+
+
+def _co_edges(a: sp.csr_matrix, top_k: int, min_shared: int) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    동시 참석 A·Aᵀ를 멤버 행 블록 단위로 계산하면서 바로 가지치기합니다.
+    한 번에 (블록 행 수 × 멤버 수)까지만 만들어 큰 이벤트(참석자 N명 → N² 쌍)에서도 메모리가 블록 크기로 묶입니다.
+    반환: (멤버별 min_shared회 이상 top_k 이웃 간선 i, j, w), 멤버별 함께한 고유 멤버 수
+    """
+    n = a.shape[0]
+    at = a.T
+    step = max(1, CO_BLOCK_CELLS // n)
+    degree = np.zeros(n, dtype=a.indptr.dtype)
+    kept = []
+    for lo in range(0, n, step):
+        block = (a[lo:lo + step] @ at).tocoo()
+        i = block.row + lo
+        off_diag = block.col != i
+        i, j, w = i[off_diag], block.col[off_diag], block.data[off_diag]
+        degree[lo:lo + step] = np.bincount(i - lo, minlength=min(step, n - lo))
+        strong = w >= min_shared
+        i, j, w = i[strong], j[strong], w[strong]
+        # 멤버별로 많이 함께 온 순 top_k (같으면 곱의 순서 그대로 — lexsort는 안정 정렬)
+        order = np.lexsort((-w, i))
+        i, j, w = i[order], j[order], w[order]
+        starts = np.searchsorted(i, i, side="left")
+        top = np.arange(len(i)) - starts < top_k
+        kept.append(pd.DataFrame({"i": i[top], "j": j[top], "w": w[top]}))
+    return pd.concat(kept, ignore_index=True), degree
+
+
+def co_attendance(
+    matrix: pd.DataFrame, top_k: int = 10, min_shared: int = 2
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    함께 참석한 멤버 분석.
+    멤버 × 멤버 동시 참석 횟수를 희소 행렬 곱(A·Aᵀ)으로 계산하고,
+    멤버마다 가장 자주 함께 온 top_k명(min_shared회 이상)만 남겨 그래프를 만듭니다.
+    곱은 멤버 블록 단위로 계산하며 블록마다 가지치기하므로 전체 N×N 행렬은 만들지 않습니다.
+
+    반환: (상위 페어, 커뮤니티 요약, 멤버별 연결 점수)
+    """
+    members = matrix.index.to_numpy()
+    n = len(members)
+    empty = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    if n < 2:
+        return empty
+
+    a = sp.csr_matrix(matrix.to_numpy(dtype=np.int32))
+    attended = np.asarray(a.sum(axis=1)).ravel()
+    # 멤버별 top_k 이웃 + 함께한 고유 멤버 수 (가지치기 전 전체 그래프 기준)
+    edges, degree = _co_edges(a, top_k, min_shared)
+    if edges.empty:
+        return empty
+    pruned = sp.csr_matrix((edges["w"].to_numpy(float), (edges["i"], edges["j"])), shape=(n, n))
+    pruned = pruned.maximum(pruned.T).tocsr()  # 한쪽이라도 top_k면 연결
+
+    # 상위 페어 (i < j 한 번씩)
+    upper = sp.triu(pruned, k=1).tocoo()
+    shared = upper.data.astype(int)
+    jaccard = shared / (attended[upper.row] + attended[upper.col] - shared)
+    pairs = pd.DataFrame({
+        "멤버 A": members[upper.row],
+        "멤버 B": members[upper.col],
+        "함께 참석": shared,
+        "유사도": np.round(jaccard, 3),
+    }).sort_values(["함께 참석", "유사도"], ascending=False, kind="stable").reset_index(drop=True)
+
+    # 커뮤니티
+    community = _label_propagation(pruned)
+    strength = np.asarray(pruned.sum(axis=1)).ravel()
+
+    # 참여 계수: 이웃 가중치가 여러 커뮤니티에 고르게 퍼져 있을수록 1에 가까움
+    n_comm = community.max() + 1
+    membership = sp.csr_matrix((np.ones(n), (np.arange(n), community)), shape=(n, n_comm))
+    by_comm = (pruned @ membership).tocsr()
+    sq = np.asarray(by_comm.multiply(by_comm).sum(axis=1)).ravel()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        participation = np.nan_to_num(1 - sq / strength ** 2)
+
+    connectors = pd.DataFrame({
+        "멤버": members,
+        "참석 횟수": attended,
+        "함께한 멤버 수": degree,
+        "연결 강도": strength.astype(int),
+        "다리 역할": np.round(participation, 2),
+        "커뮤니티": community + 1,
+    })
+    # 연결 점수: 함께한 멤버 비율(%)에 다리 역할 가중
+    connectors["연결 점수"] = np.round(degree / (n - 1) * 100 * (1 + participation), 1)
+    connectors = connectors.sort_values("연결 점수", ascending=False, kind="stable").reset_index(drop=True)
+    connectors.index += 1
+
+    in_graph = connectors[connectors["연결 강도"] > 0]
+    communities = (
+        in_graph.groupby("커뮤니티")
+        .agg(
+            인원=("멤버", "size"),
+            평균_참석=("참석 횟수", "mean"),
+            대표_멤버=("멤버", lambda s: ", ".join(map(str, s.head(3)))),
+        )
+        .rename(columns={"평균_참석": "평균 참석", "대표_멤버": "대표 멤버"})
+        .sort_values("인원", ascending=False, kind="stable")
+    )
+    communities = communities[communities["인원"] > 1]
+    communities["평균 참석"] = communities["평균 참석"].round(1)
+
+    return pairs, communities, connectors
+
+
+def _registrations(detail_df: pd.DataFrame) -> pd.DataFrame:
+    """(이벤트, 멤버)당 한 행: event, member_id, name, attended. 중복 등록은 참석 여부를 OR로 합칩니다.
+    멤버는 익명 ID(member_id)로 구분해 이름이 같은 다른 멤버를 합치지 않고, 이름(user_hash)은 표시용으로만 붙입니다.
+    체크인 기록이 없는 탭(등록 = 참석으로 처리된 탭)은 노쇼를 알 수 없으므로 제외합니다."""
+    tracked = detail_df[detail_df["tracked"]] if "tracked" in detail_df.columns else detail_df
+    if "member_id" not in tracked.columns:
+        tracked = tracked.assign(member_id=tracked["user_hash"])
+    return (
+        tracked.groupby(["event", "member_id"], sort=False)
+        .agg(name=("user_hash", "first"), attended=("attended", "max"))
+        .reset_index()
+    )
+
+
+def funnel_by_event(detail_df: pd.DataFrame, trend_window: int = 3) -> pd.DataFrame:
+    """
+    이벤트별 등록 → 참석 전환:
+    - 등록자, 참석자, 노쇼, 노쇼율, 전환율, 전환율 추세(최근 trend_window개 이벤트 이동 평균)
+    """
+    if detail_df.empty:
+        return pd.DataFrame()
+    regs = _registrations(detail_df)
+    if regs.empty:
+        return pd.DataFrame()
+    funnel = regs.groupby("event", sort=False)["attended"].agg(["size", "sum"])
+    funnel.columns = ["등록자", "참석자"]
+    funnel["참석자"] = funnel["참석자"].astype(int)
+    funnel["노쇼"] = funnel["등록자"] - funnel["참석자"]
+    conversion = funnel["참석자"] / funnel["등록자"] * 100
+    funnel["노쇼율(%)"] = (100 - conversion).round(1)
+    funnel["전환율(%)"] = conversion.round(1)
+    funnel["전환율 추세(%)"] = conversion.rolling(trend_window, min_periods=1).mean().round(1)
+    funnel.index.name = "이벤트"
+    return funnel.reset_index()
+
+
+def member_noshows(detail_df: pd.DataFrame) -> pd.DataFrame:
+    """멤버별 등록·참석·노쇼 횟수와 노쇼율. 노쇼가 많은 순 (동명이인은 ID로 구분)."""
+    if detail_df.empty:
+        return pd.DataFrame()
+    regs = _registrations(detail_df)
+    if regs.empty:
+        return pd.DataFrame()
+    members = regs.groupby("member_id", sort=False).agg(
+        이름=("name", "first"), 등록=("attended", "size"), 참석=("attended", "sum")
+    )
+    members["참석"] = members["참석"].astype(int)
+    members["노쇼"] = members["등록"] - members["참석"]
+    members["노쇼율(%)"] = (members["노쇼"] / members["등록"] * 100).round(1)
+    members.index.name = "ID"
+    members = members[["이름", "등록", "참석", "노쇼", "노쇼율(%)"]]
+    return (
+        members.reset_index()
+        .sort_values(["노쇼", "노쇼율(%)"], ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def repeat_noshows(member_df: pd.DataFrame, min_noshows: int = 2) -> pd.DataFrame:
+    """노쇼가 min_noshows회 이상인 멤버만."""
+    if member_df.empty:
+        return member_df
+    return member_df[member_df["노쇼"] >= min_noshows].reset_index(drop=True)
+
+
 # PRICE_KRW = 20_000
 
 
 def payment_summary(pay_df: pd.DataFrame) -> pd.DataFrame:
     """이벤트별 결제 요약 (등록자, 결제완료, 미결제, 결제율, 매출)."""
-    results = []
-    for event, grp in pay_df.groupby("event"):
-        total = len(grp)
-        paid_count = int(grp["paid"].sum())
-        rate = round(paid_count / total * 100, 1) if total else 0
-        results.append({
-            "이벤트": event,
-            "등록자": total,
-            "결제완료": paid_count,
-            "미결제": total - paid_count,
-            "결제율(%)": rate,
-            # "매출(KRW)": paid_count * PRICE_KRW,
-        })
-    return pd.DataFrame(results)
+    if pay_df.empty:
+        return pd.DataFrame()
+    grp = pay_df.groupby("event")["paid"]
+    total = grp.size()
+    paid_count = grp.sum().astype(int)
+    return pd.DataFrame({
+        "이벤트": total.index,
+        "등록자": total.values,
+        "결제완료": paid_count.values,
+        "미결제": (total - paid_count).values,
+        "결제율(%)": (paid_count / total * 100).round(1).values,
+        # "매출(KRW)": paid_count * PRICE_KRW,
+    })
 
 
 def payment_method_dist(pay_df: pd.DataFrame) -> pd.DataFrame:
@@ -152,17 +434,102 @@ def cash_checkin_summary(pay_df: pd.DataFrame) -> pd.DataFrame:
     cash_df = pay_df[pay_df["method"] == "현금"]
     if cash_df.empty:
         return pd.DataFrame()
-    results = []
-    for event, grp in cash_df.groupby("event"):
-        total = len(grp)
-        checked = int(grp["checked_in"].sum())
-        results.append({
-            "이벤트": event,
-            "현금결제자": total,
-            "체크인": checked,
-            "미체크인": total - checked,
-        })
-    return pd.DataFrame(results)
+    grp = cash_df.groupby("event")["checked_in"]
+    total = grp.size()
+    checked = grp.sum().astype(int)
+    return pd.DataFrame({
+        "이벤트": total.index,
+        "현금결제자": total.values,
+        "체크인": checked.values,
+        "미체크인": (total - checked).values,
+    })
+
+
+def reconcile_payments(pay_df: pd.DataFrame, detail_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    결제 × 참석 대조 (이벤트·멤버당 한 행).
+    결제 행(user_hash)과 출석 행(member_id)을 익명 ID·이벤트로 한 번에 병합해 다음 플래그를 붙입니다.
+    이름은 표시용으로만 붙이므로 동명이인이나 탭마다 다르게 적힌 이름도 섞이지 않습니다.
+    - 현금 수납: 현금 결제자가 체크인함 (현장 수납으로 간주)
+    - 정산 완료: 결제완료 또는 현금 수납
+    - 미결제 참석: 참석했지만 정산되지 않음
+    - 결제 후 노쇼: 결제했지만 참석하지 않음
+    체크인 기록이 없는 탭은 참석 여부를 알 수 없으므로 두 목록에서 제외됩니다.
+    """
+    if pay_df.empty:
+        return pd.DataFrame()
+
+    # 중복 등록은 하나로: 결제·체크인은 한 번이라도 있으면 True
+    pay = (
+        pay_df.assign(cash=pay_df["method"] == "현금")
+        .groupby(["event", "user_hash"], sort=False)
+        .agg(name=("name", "first"), paid=("paid", "max"), cash=("cash", "max"), checked_in=("checked_in", "max"))
+        .reset_index()
+    )
+    if detail_df.empty:
+        att = pd.DataFrame(columns=["event", "user_hash", "attended", "tracked"])
+    else:
+        att = (
+            detail_df.groupby(["event", "member_id"], sort=False)
+            .agg(attended=("attended", "max"), tracked=("tracked", "max"))
+            .reset_index()
+            .rename(columns={"member_id": "user_hash"})
+        )
+    recon = pay.merge(att, on=["event", "user_hash"], how="left")
+    tracked = recon["tracked"].fillna(False).astype(bool)
+    attended = recon["attended"].fillna(recon["checked_in"]).astype(bool)
+
+    paid = recon["paid"].astype(bool)
+    cash_collected = recon["cash"].astype(bool) & recon["checked_in"].astype(bool)
+    settled = paid | cash_collected
+    return pd.DataFrame({
+        "이벤트": recon["event"],
+        "ID": recon["user_hash"],
+        "이름": recon["name"],
+        "결제완료": paid,
+        "현금 수납": cash_collected,
+        "참석": attended.astype("boolean").mask(~tracked),
+        "미결제 참석": tracked & attended & ~settled,
+        "결제 후 노쇼": tracked & paid & ~attended,
+    })
+
+
+def member_balances(recon: pd.DataFrame, fee: int | None = None) -> pd.DataFrame:
+    """
+    멤버별 정산 현황. 익명 ID별로 합치고 index = 이름(정렬됨) — 현장 체크인 때 바로 조회할 수 있습니다.
+    동명이인은 같은 이름의 행 여러 개로, ID 열로 구분됩니다.
+    fee(1회 참가비)를 주면 미수금·현금 수납액(원)도 계산합니다.
+    """
+    if recon.empty:
+        return pd.DataFrame()
+    balances = recon.groupby("ID").agg(
+        이름=("이름", "first"),
+        등록=("이벤트", "size"),
+        결제완료=("결제완료", "sum"),
+        현금_수납=("현금 수납", "sum"),
+        미결제_참석=("미결제 참석", "sum"),
+        결제_후_노쇼=("결제 후 노쇼", "sum"),
+    )
+    balances.columns = ["이름", "등록", "결제완료", "현금 수납", "미결제 참석", "결제 후 노쇼"]
+    counts = ["등록", "결제완료", "현금 수납", "미결제 참석", "결제 후 노쇼"]
+    balances[counts] = balances[counts].astype(int)
+    if fee:
+        balances["미수금(KRW)"] = balances["미결제 참석"] * fee
+        balances["현금 수납액(KRW)"] = balances["현금 수납"] * fee
+    return balances.reset_index().sort_values(["이름", "ID"]).set_index("이름")
+
+
+def lookup_member(balances: pd.DataFrame, query: str, limit: int = 10) -> pd.DataFrame:
+    """정렬된 이름 인덱스에서 정확히 일치하거나 query로 시작하는 멤버를 이진 탐색으로 찾습니다."""
+    query = query.strip()
+    if balances.empty or not query:
+        return balances.iloc[:0]
+    names = balances.index
+    start = names.searchsorted(query, side="left")
+    stop = start
+    while stop < len(names) and stop - start < limit and str(names[stop]).startswith(query):
+        stop += 1
+    return balances.iloc[start:stop]
 
 
 def referral_distribution(ref_df: pd.DataFrame) -> pd.DataFrame:
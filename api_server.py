@@ -0,0 +1,262 @@
+"""
+대시보드와 같은 분석 결과를 HTTP로 제공하는 조회 API (JSON / Arrow IPC).
+도어 체크인 스크립트·디스코드 봇처럼 Streamlit 화면을 긁지 않고 숫자만 필요한 도구용입니다.
+
+    python api_server.py --port 8600        # 단독 실행 (자체 데이터 서비스)
+    python startup.py                       # secrets에 api_port가 있으면 앱과 같은 프로세스에서 실행
+
+응답은 대시보드와 공유하는 스냅샷에서 만들고, 데이터 버전별로 공유 캐시(cache_budget)에 저장합니다.
+ETag가 데이터 버전이라 If-None-Match로 폴링하면 바뀌지 않은 동안은 304만 받습니다.
+요청이 Google Sheets 읽기를 직접 일으키지는 않고, 데이터 서비스에 조회가 있었다고만 알립니다
+(대시보드를 아무도 열지 않아도 정기 새로고침이 계속됨). 첫 로드가 끝나기 전에는 503을 돌려줍니다.
+
+여러 모임(tenancy)을 쓰면 모임마다 [tenants.<ID>]에 api_token을 두고, 토큰으로 그 모임의 데이터만 응답합니다.
+
+엔드포인트 (모두 GET, Authorization: Bearer <api_token> 필요):
+    /v1/version                      데이터 버전·갱신 시각
+    /v1/events?from=2024-03-01&to=2024-06-30&last=10&kind=대회
+                                     날짜순 이벤트 목록 (날짜·종류·정원, last는 1 이상)
+    /v1/summary                      이벤트별 요약
+    /v1/cohort?bucket=event|month|quarter
+    /v1/rankings?top=20              참석 횟수 순위 (top은 1 이상)
+    /v1/payments                     이벤트별 결제 요약
+    /v1/referral                     유입 경로 분포
+    /v1/referral/by-event            이벤트 × 유입 경로
+?format=arrow 또는 Accept: application/vnd.apache.arrow.stream 이면 Arrow IPC 스트림으로 응답합니다.
+"""
+import argparse
+import hmac
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from analyzer import (
+    attendance_frequency,
+    cohort_retention,
+    cohort_retention_bucketed,
+    payment_summary,
+    referral_distribution,
+    referral_by_event,
+)
+from cache_budget import CACHE, ANALYZER
+from data_service import DataService
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+def _positive_int(params, key: str, default: int | None = None) -> int | None:
+    if key not in params:
+        return default
+    try:
+        value = int(params[key])
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise ValueError(f"{key} 값은 1 이상의 정수여야 합니다.")
+    return value
+
+
+def _summary(snap, params):
+    return snap.aggregates.summary
+
+
+def _cohort(snap, params):
+    bucket = params.get("bucket", "event")
+    if bucket == "event":
+        return cohort_retention(snap.matrix)
+    if bucket not in ("month", "quarter"):
+        raise ValueError("bucket은 event, month, quarter 중 하나여야 합니다.")
+    return cohort_retention_bucketed(snap.matrix, bucket, snap.catalog.dates())
+
+
+def _events(snap, params):
+    catalog = snap.catalog
+    try:
+        start, end = (pd.Timestamp(params[k]).date() if k in params else None for k in ("from", "to"))
+    except ValueError:
+        raise ValueError("from·to는 YYYY-MM-DD 형식이어야 합니다.") from None
+    names = catalog.between(start, end) if start or end else catalog.names
+    if "kind" in params:
+        names = catalog.of_kind(names, {params["kind"]})
+    if (last := _positive_int(params, "last")) is not None:
+        names = names[-last:]
+    table = catalog.table().set_index("이벤트").loc[names].reset_index()
+    table["날짜"] = table["날짜"].map(lambda d: d.isoformat() if d is not None else None)  # JSON에서도 YYYY-MM-DD
+    return table
+
+
+def _rankings(snap, params):
+    top = _positive_int(params, "top", 20)
+    ranks = attendance_frequency(snap.matrix).head(top)
+    ranks.index.name = "순위"
+    return ranks
+
+
+def _payments(snap, params):
+    return payment_summary(snap.pay_df)
+
+
+def _referral(snap, params):
+    return referral_distribution(snap.ref_df) if not snap.ref_df.empty else pd.DataFrame(columns=["유입 경로", "인원"])
+
+
+def _referral_by_event(snap, params):
+    return referral_by_event(snap.ref_df) if not snap.ref_df.empty else pd.DataFrame()
+
+
+# 경로 -> (분석 함수, 응답을 가르는 쿼리 파라미터)
+ROUTES = {
+    "/v1/events": (_events, ("from", "to", "last", "kind")),
+    "/v1/summary": (_summary, ()),
+    "/v1/cohort": (_cohort, ("bucket",)),
+    "/v1/rankings": (_rankings, ("top",)),
+    "/v1/payments": (_payments, ()),
+    "/v1/referral": (_referral, ()),
+    "/v1/referral/by-event": (_referral_by_event, ()),
+}
+
+
+def _table(df: pd.DataFrame) -> pd.DataFrame:
+    """의미 있는 인덱스는 열로 꺼내고, 열 이름은 문자열로 맞춥니다 (Arrow 요구사항)."""
+    if not isinstance(df.index, pd.RangeIndex) or df.index.name is not None:
+        df = df.reset_index()
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def encode(df: pd.DataFrame, fmt: str) -> bytes:
+    df = _table(df)
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        # 값이 섞인 object 열(예: 복귀율의 "-")은 문자열로, 빈 값은 null로
+        for c in df.columns[df.dtypes == object]:
+            df[c] = df[c].astype(str).where(df[c].notna(), None)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+    return df.to_json(orient="records", force_ascii=False).encode()
+
+
+def tenant_services(tenants: dict) -> dict[str, DataService]:
+    """API 토큰 -> 그 모임의 데이터 서비스. 토큰이 없는 모임은 API로 조회할 수 없습니다."""
+    return {str(t.get("api_token")): t.service() for t in tenants.values() if t.get("api_token")}
+
+
+def _authorize(services: dict[str, DataService], auth: str) -> DataService | None:
+    found = None
+    for token, service in services.items():  # 모든 토큰과 비교 (비교 시간으로 토큰이 드러나지 않게)
+        if hmac.compare_digest(auth.encode(), f"Bearer {token}".encode()):
+            found = service
+    return found
+
+
+def make_handler(services: dict[str, DataService]):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "RetentionAPI/1"
+
+        def log_message(self, format, *args):  # noqa: A002 — 요청마다 stderr 로그를 남기지 않음
+            pass
+
+        def _send(self, status: int, body: bytes = b"", mime: str = "application/json", etag: str | None = None):
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if body:
+                self.send_header("Content-Type", mime if mime == ARROW_MIME else f"{mime}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode())
+
+        def do_GET(self):
+            service = _authorize(services, self.headers.get("Authorization", ""))
+            if service is None:
+                return self._error(401, "unauthorized")
+
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            service.touch()  # 정기 새로고침 유지 — 응답은 기다리지 않고
+            snap = service.latest()  # 지금 공개된 스냅샷으로
+            if snap is None:
+                return self._error(503, service.last_error or "data not loaded")
+
+            if url.path == "/v1/version":
+                body = json.dumps({"version": snap.version, "loaded_at": snap.loaded_at}).encode()
+                return self._send(200, body)
+
+            route = ROUTES.get(url.path.rstrip("/"))
+            if route is None:
+                return self._error(404, f"unknown endpoint: {url.path}")
+            builder, keys = route
+
+            fmt = "arrow" if query.get("format") == "arrow" or ARROW_MIME in self.headers.get("Accept", "") else "json"
+            params = {k: query[k] for k in keys if k in query}
+            etag = f'"{snap.version}-{fmt}"'
+            if etag in self.headers.get("If-None-Match", ""):
+                return self._send(304, etag=etag)
+
+            # 응답 본문은 공유 캐시(analyzer 이름 공간)에 데이터 버전별로 저장
+            key = ("api", snap.version, url.path.rstrip("/"), tuple(sorted(params.items())), fmt)
+            try:
+                body = CACHE.get_or_build(ANALYZER, key, lambda: encode(builder(snap, params), fmt))
+            except ValueError as e:
+                return self._error(400, str(e))
+            self._send(200, body, ARROW_MIME if fmt == "arrow" else "application/json", etag)
+
+    return Handler
+
+
+def serve(services: dict[str, DataService], host: str = "0.0.0.0", port: int = 8600) -> ThreadingHTTPServer:
+    """API 서버를 만들어 돌려줍니다 (services: tenant_services 결과). serve_forever()는 호출하는 쪽에서."""
+    if not services:
+        raise ValueError("secrets.toml에 api_token을 설정해주세요.")
+    server = ThreadingHTTPServer((host, port), make_handler(services))
+    server.daemon_threads = True
+    for service in services.values():  # 조회가 로드를 일으키지 않으므로 첫 로드는 여기서 시작
+        if service.latest() is None:
+            service.refresh()
+    return server
+
+
+def start_in_background(services: dict[str, DataService], host: str = "0.0.0.0", port: int = 8600) -> ThreadingHTTPServer:
+    """Streamlit과 같은 프로세스에서 데몬 스레드로 실행 — 대시보드와 스냅샷을 공유합니다."""
+    server = serve(services, host, port)
+    threading.Thread(target=server.serve_forever, name="api-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    import streamlit as st
+    from tenancy import load_tenants
+    from cache_budget import configure
+    from sheets_meter import configure as configure_meter
+
+    parser = argparse.ArgumentParser(description="분석 결과 조회 API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(st.secrets.get("api_port", 8600)))
+    args = parser.parse_args()
+
+    configure(st.secrets)
+    configure_meter(st.secrets)
+    tenants = {tid: t for tid, t in load_tenants(st.secrets).items() if t.sources}
+    if not tenants:
+        raise SystemExit("secrets.toml에 spreadsheet_id 또는 spreadsheet_ids를 설정해주세요.")
+    server = serve(tenant_services(tenants), args.host, args.port)
+    print(f"API listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
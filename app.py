@@ -1,24 +1,13 @@
 """
 체스 모임 리텐션 대시보드 / Chess Club Retention Dashboard
 """
+import time
+
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-
-from data_loader import load_all_events, build_attendance_matrix, build_payment_data, build_referral_data, get_worksheet_names, debug_worksheet
-from analyzer import (
-    event_summary,
-    attendance_frequency,
-    cohort_retention,
-    frequency_distribution,
-    payment_summary,
-    payment_method_dist,
-    unpaid_members,
-    cash_checkin_summary,
-    referral_distribution,
-    referral_by_event,
-)
+
+import startup
+from startup import timed
+from tenancy import load_tenants
 
 
 # ── 테마 ──────────────────────────────────────────────────────────────────────
@@ -79,8 +68,28 @@ TRANSLATIONS = {
         "password": "비밀번호",
         "login": "로그인",
         "wrong_password": "비밀번호가 틀렸습니다.",
+        "club": "모임",
+        "unknown_club": "모임을 찾을 수 없습니다: {club}",
         "refresh": "🔄 새로고침",
-        "no_spreadsheet_id": "`secrets.toml`에 `spreadsheet_id`를 설정해주세요.",
+        "refresh_started": "백그라운드에서 새로고침을 시작했습니다. 잠시 후 새 데이터가 반영됩니다.",
+        "last_updated": "마지막 갱신 {time}",
+        "refreshing": "🔄 갱신 중…",
+        "budget_degraded": "⏳ API 요청 한도에 가까워 저장된 데이터를 표시 중",
+        "refresh_joined": "이미 새로고침이 진행 중입니다.",
+        "refresh_limited": "방금 새로고침했습니다. {sec}초 후에 다시 시도해주세요.",
+        "partial_refresh": "🎯 부분 새로고침",
+        "partial_refresh_event": "이벤트(탭)",
+        "refresh_tab": "이 탭만",
+        "refresh_sheet": "이 스프레드시트만",
+        "activity_title": "🆕 최근 활동 · 확인 안 한 변경 {n}건",
+        "activity_empty": "새로고침 사이에 기록된 변경이 아직 없습니다.",
+        "activity_registered": "신규 등록",
+        "activity_checked_in": "체크인",
+        "activity_paid": "결제",
+        "activity_mark_seen": "모두 확인",
+        "col_time": "시각",
+        "col_kind": "변경",
+        "no_spreadsheet_id": "`secrets.toml`에 `spreadsheet_id` 또는 `spreadsheet_ids`를 설정해주세요.",
         "loading": "Google Sheets에서 데이터 불러오는 중...",
         "load_failed": "데이터 로드 실패: ",
         "no_data": "시트에 데이터가 없습니다.",
@@ -92,6 +101,15 @@ TRANSLATIONS = {
         "theme_light": "☀️ 라이트",
         "theme_dark": "🌙 다크",
         "select_events": "분석할 이벤트 선택",
+        "filter_mode": "이벤트 범위",
+        "filter_all": "전체",
+        "filter_range": "기간",
+        "filter_last": "최근 N개",
+        "filter_pick": "직접 선택",
+        "date_range": "기간 (이벤트 날짜)",
+        "last_n": "최근 이벤트 수",
+        "event_kinds": "이벤트 종류",
+        "event_catalog": "📅 이벤트 목록",
         "total_caption": "{n_events}개 이벤트 · {n_members}명",
         "select_one_event": "이벤트를 하나 이상 선택해주세요.",
         "total_unique": "총 고유 참석자",
@@ -113,6 +131,8 @@ TRANSLATIONS = {
         "ref_event_title": "이벤트별 유입 경로",
         "col_source": "유입 경로",
         "col_source_count": "인원",
+        "ref_mapping_title": "응답 → 대표 유입 경로 매핑",
+        "col_raw_source": "원본 응답",
         "bar_title": "이벤트별 신규 / 복귀 참석자",
         "bar_y": "인원",
         "line_title": "이벤트별 복귀율 (%)",
@@ -122,9 +142,16 @@ TRANSLATIONS = {
         "cohort_no_data": "코호트 분석을 위한 데이터가 충분하지 않습니다.",
         "cohort_caption": "각 셀: 해당 코호트 중 N번째 이벤트에도 참석한 비율 (%)",
         "cohort_title": "코호트 리텐션 히트맵",
-        "cohort_x": "첫 참석 기준 +N번째 이벤트",
+        "cohort_x": "첫 참석 기준 +N (코호트 단위)",
         "cohort_y": "코호트 (첫 참석 이벤트)",
         "cohort_hover": "코호트: %{y}<br>오프셋: %{x}<br>리텐션: %{z:.1f}%<extra></extra>",
+        "cohort_bucket": "코호트 단위",
+        "cohort_bucket_event": "이벤트",
+        "cohort_bucket_month": "월",
+        "cohort_bucket_quarter": "분기",
+        "cohort_bucket_n": "이벤트 N개",
+        "cohort_bucket_size": "N",
+        "cohort_capped": "최근 {rows}개 코호트(전체 {total}개)와 +{offsets}까지만 표시합니다. 더 큰 단위로 묶어 보세요.",
         "member_caption": "이름 컬럼이 없는 경우 익명 ID(#해시)로 표시됩니다.",
         "top_n_title": "참석 횟수 상위 {n}명",
         "member_label": "이름",
@@ -164,6 +191,92 @@ TRANSLATIONS = {
         # "col_revenue": "매출(KRW)",
         "col_method": "결제 방법",
         "col_count": "인원",
+        "recon_title": "결제 × 참석 정산",
+        "recon_lookup": "멤버 조회 (현장 체크인용)",
+        "recon_lookup_placeholder": "이름 또는 이름 앞부분",
+        "recon_lookup_empty": "일치하는 멤버가 없습니다.",
+        "recon_cash_collected": "현금 수납",
+        "recon_cash_amount": "현금 수납액",
+        "recon_outstanding": "미결제 참석",
+        "recon_outstanding_amount": "미수금",
+        "recon_paid_noshow": "결제 후 노쇼",
+        "recon_attended_unpaid_title": "참석했지만 미결제",
+        "recon_paid_noshow_title": "결제했지만 불참",
+        "recon_empty": "해당하는 멤버가 없습니다.",
+        "recon_caption": "현금 결제자는 체크인하면 현장 수납으로 간주합니다. 체크인 기록이 없는 이벤트는 목록에서 제외됩니다.",
+        "col_settled_paid": "결제완료",
+        "col_cash_collected": "현금 수납",
+        "col_attended_unpaid": "미결제 참석",
+        "col_paid_noshow": "결제 후 노쇼",
+        "col_outstanding_krw": "미수금(KRW)",
+        "col_cash_krw": "현금 수납액(KRW)",
+        "tab7": "🤝 함께 오는 멤버",
+        "co_no_data": "함께 참석한 기록이 충분하지 않습니다.",
+        "co_caption": "멤버마다 가장 자주 함께 온 {k}명({m}회 이상)만 연결해 분석합니다.",
+        "co_pairs_title": "자주 함께 오는 멤버 페어",
+        "co_connectors_title": "커뮤니티를 잇는 멤버",
+        "co_connectors_help": "연결 점수: 함께 참석한 멤버 비율에 여러 그룹을 잇는 정도(다리 역할)를 반영한 점수",
+        "co_communities_title": "함께 오는 그룹",
+        "col_member_a": "멤버 A",
+        "col_member_b": "멤버 B",
+        "col_shared": "함께 참석",
+        "col_similarity": "유사도",
+        "col_co_members": "함께한 멤버 수",
+        "col_strength": "연결 강도",
+        "col_bridge": "다리 역할",
+        "col_community": "그룹",
+        "col_connector": "연결 점수",
+        "col_avg_attend": "평균 참석",
+        "col_top_members": "대표 멤버",
+        "tab8": "🔀 이벤트 흐름",
+        "flow_no_data": "이벤트가 2개 이상 있어야 흐름을 분석할 수 있습니다.",
+        "flow_caption": "참석자마다 직전에 마지막으로 온 이벤트에서 이번 이벤트로 이어지는 흐름입니다.",
+        "flow_sankey_title": "직전 참석 이벤트 → 이번 이벤트",
+        "flow_new": "신규",
+        "flow_prob_title": "다음 참석 이벤트 확률 (%)",
+        "flow_prob_x": "다음으로 참석한 이벤트",
+        "flow_prob_y": "참석 이벤트",
+        "flow_prob_hover": "%{y} → %{x}<br>%{z:.1f}%<extra></extra>",
+        "flow_churn": "미복귀",
+        "flow_next_rate": "바로 다음 이벤트 복귀율",
+        "tab9": "🚪 등록 → 참석",
+        "funnel_no_data": "체크인 기록(CheckedInAt)이 있는 이벤트가 없어 노쇼를 계산할 수 없습니다.",
+        "funnel_caption": "CheckedInAt 기록이 있는 이벤트만 포함합니다. 같은 사람의 중복 등록은 한 번으로 셉니다.",
+        "funnel_registered": "총 등록",
+        "funnel_attended": "총 참석",
+        "funnel_noshow_rate": "전체 노쇼율",
+        "funnel_bar_title": "이벤트별 등록 대비 참석",
+        "funnel_rate_title": "등록 → 참석 전환율 추이 (%)",
+        "funnel_trend": "추세 ({n}개 이벤트 평균)",
+        "funnel_repeat_title": "반복 노쇼 멤버 ({n}회 이상)",
+        "funnel_repeat_empty": "반복 노쇼 멤버가 없습니다.",
+        "col_noshow": "노쇼",
+        "col_noshow_rate": "노쇼율(%)",
+        "col_conversion": "전환율(%)",
+        "col_conversion_trend": "전환율 추세(%)",
+        "col_reg_count": "등록",
+        "tab10": "⏱️ 체크인",
+        "ci_no_data": "체크인 시각 데이터가 없습니다. CheckedInAt 컬럼을 확인해주세요.",
+        "ci_caption": "시작 시각 {start} 기준 · 시작 후 {grace}분이 지나서 체크인하면 지각으로 봅니다.",
+        "ci_no_start": "탭 이름이나 체크인 기록에서 날짜를 알 수 없는 이벤트는 도착 시각 분석에서 빠집니다.",
+        "ci_late_rate": "지각률",
+        "ci_median_arrival": "도착 중앙값 (시작 기준)",
+        "ci_recheckin_rate": "재체크인 비율",
+        "ci_peak": "분당 최대 체크인",
+        "ci_dist_title": "도착 시각 분포 ({bin}분 단위)",
+        "ci_dist_x": "시작 대비 도착 (분)",
+        "ci_load_title": "분당 체크인 — {event}",
+        "ci_load_event": "입구 혼잡도를 볼 이벤트",
+        "ci_load_x": "시각",
+        "col_late": "지각",
+        "col_late_rate": "지각률(%)",
+        "col_median_arrival": "도착 중앙값(분)",
+        "col_recheckin": "재체크인",
+        "col_recheckin_rate": "재체크인율(%)",
+        "col_max_count": "최대 횟수",
+        "col_peak": "분당 최대",
+        "col_peak_time": "피크 시각",
+        "unit_min": "분",
     },
     "en": {
         "page_title": "Seoul Chess Club Retention Analysis",
@@ -172,8 +285,28 @@ TRANSLATIONS = {
         "password": "Password",
         "login": "Login",
         "wrong_password": "Incorrect password.",
+        "club": "Club",
+        "unknown_club": "Unknown club: {club}",
         "refresh": "🔄 Refresh",
-        "no_spreadsheet_id": "Please set `spreadsheet_id` in `secrets.toml`.",
+        "refresh_started": "Refreshing in the background. New data will appear shortly.",
+        "last_updated": "Last updated {time}",
+        "refreshing": "🔄 Refreshing…",
+        "budget_degraded": "⏳ Near the API request limit — showing cached data",
+        "refresh_joined": "A refresh is already in progress.",
+        "refresh_limited": "Just refreshed. Please try again in {sec}s.",
+        "partial_refresh": "🎯 Partial Refresh",
+        "partial_refresh_event": "Event (tab)",
+        "refresh_tab": "This tab only",
+        "refresh_sheet": "This spreadsheet only",
+        "activity_title": "🆕 Recent activity · {n} unseen changes",
+        "activity_empty": "No changes recorded between refreshes yet.",
+        "activity_registered": "New registrations",
+        "activity_checked_in": "Check-ins",
+        "activity_paid": "Payments",
+        "activity_mark_seen": "Mark all seen",
+        "col_time": "Time",
+        "col_kind": "Change",
+        "no_spreadsheet_id": "Please set `spreadsheet_id` or `spreadsheet_ids` in `secrets.toml`.",
         "loading": "Loading data from Google Sheets...",
         "load_failed": "Failed to load data: ",
         "no_data": "No data found in the sheet.",
@@ -185,6 +318,15 @@ TRANSLATIONS = {
         "theme_light": "☀️ Light",
         "theme_dark": "🌙 Dark",
         "select_events": "Select events to analyze",
+        "filter_mode": "Event range",
+        "filter_all": "All",
+        "filter_range": "Dates",
+        "filter_last": "Last N",
+        "filter_pick": "Pick",
+        "date_range": "Date range (event date)",
+        "last_n": "Number of recent events",
+        "event_kinds": "Event types",
+        "event_catalog": "📅 Event catalog",
         "total_caption": "{n_events} events · {n_members} members",
         "select_one_event": "Please select at least one event.",
         "total_unique": "Total Unique Attendees",
@@ -206,6 +348,8 @@ TRANSLATIONS = {
         "ref_event_title": "Referral Sources by Event",
         "col_source": "Source",
         "col_source_count": "Count",
+        "ref_mapping_title": "Raw answers → canonical sources",
+        "col_raw_source": "Raw answer",
         "bar_title": "New vs. Returning Attendees per Event",
         "bar_y": "Count",
         "line_title": "Return Rate (%) per Event",
@@ -215,9 +359,16 @@ TRANSLATIONS = {
         "cohort_no_data": "Not enough data for cohort analysis.",
         "cohort_caption": "Each cell: % of cohort who also attended the Nth event",
         "cohort_title": "Cohort Retention Heatmap",
-        "cohort_x": "+N events from first attendance",
+        "cohort_x": "+N units from first attendance",
         "cohort_y": "Cohort (first event attended)",
         "cohort_hover": "Cohort: %{y}<br>Offset: %{x}<br>Retention: %{z:.1f}%<extra></extra>",
+        "cohort_bucket": "Cohort unit",
+        "cohort_bucket_event": "Event",
+        "cohort_bucket_month": "Month",
+        "cohort_bucket_quarter": "Quarter",
+        "cohort_bucket_n": "N events",
+        "cohort_bucket_size": "N",
+        "cohort_capped": "Showing the latest {rows} of {total} cohorts up to +{offsets}. Try a larger unit.",
         "member_caption": "Shown as anonymous ID (#hash) if no name column exists.",
         "top_n_title": "Top {n} Members by Attendance",
         "member_label": "Name",
@@ -257,6 +408,92 @@ TRANSLATIONS = {
         "col_revenue": "Revenue (KRW)",
         "col_method": "Payment Method",
         "col_count": "Count",
+        "recon_title": "Payment × Attendance Reconciliation",
+        "recon_lookup": "Member lookup (door check-in)",
+        "recon_lookup_placeholder": "Name or name prefix",
+        "recon_lookup_empty": "No matching member.",
+        "recon_cash_collected": "Cash Collected",
+        "recon_cash_amount": "Cash Collected (KRW)",
+        "recon_outstanding": "Attended Unpaid",
+        "recon_outstanding_amount": "Outstanding",
+        "recon_paid_noshow": "Paid No-shows",
+        "recon_attended_unpaid_title": "Attended but Unpaid",
+        "recon_paid_noshow_title": "Paid but Did Not Attend",
+        "recon_empty": "No members in this list.",
+        "recon_caption": "Cash payers who checked in are treated as paid at the door. Events without check-in records are excluded from the lists.",
+        "col_settled_paid": "Paid",
+        "col_cash_collected": "Cash Collected",
+        "col_attended_unpaid": "Attended Unpaid",
+        "col_paid_noshow": "Paid No-show",
+        "col_outstanding_krw": "Outstanding (KRW)",
+        "col_cash_krw": "Cash Collected (KRW)",
+        "tab7": "🤝 Co-attendance",
+        "co_no_data": "Not enough shared attendance to analyze.",
+        "co_caption": "Each member is linked to the {k} people they attended with most ({m}+ shared events).",
+        "co_pairs_title": "Members Who Often Come Together",
+        "co_connectors_title": "Members Who Connect the Community",
+        "co_connectors_help": "Connector score: share of members attended with, weighted by how many groups the member bridges",
+        "co_communities_title": "Groups That Come Together",
+        "col_member_a": "Member A",
+        "col_member_b": "Member B",
+        "col_shared": "Shared Events",
+        "col_similarity": "Similarity",
+        "col_co_members": "Members Met",
+        "col_strength": "Link Strength",
+        "col_bridge": "Bridging",
+        "col_community": "Group",
+        "col_connector": "Connector Score",
+        "col_avg_attend": "Avg. Attendance",
+        "col_top_members": "Key Members",
+        "tab8": "🔀 Event Flow",
+        "flow_no_data": "At least two events are needed to analyze flow.",
+        "flow_caption": "Each attendee flows from the event they were last seen at to the event they came to.",
+        "flow_sankey_title": "Last Seen At → Came To",
+        "flow_new": "New",
+        "flow_prob_title": "Next Event Attended (%)",
+        "flow_prob_x": "Next event attended",
+        "flow_prob_y": "Event attended",
+        "flow_prob_hover": "%{y} → %{x}<br>%{z:.1f}%<extra></extra>",
+        "flow_churn": "Did not return",
+        "flow_next_rate": "Return rate at the very next event",
+        "tab9": "🚪 Registration → Attendance",
+        "funnel_no_data": "No event has check-in records (CheckedInAt), so no-shows cannot be computed.",
+        "funnel_caption": "Only events with CheckedInAt records are included. Duplicate registrations count once.",
+        "funnel_registered": "Total Registrations",
+        "funnel_attended": "Total Check-ins",
+        "funnel_noshow_rate": "Overall No-show Rate",
+        "funnel_bar_title": "Registered vs. Attended per Event",
+        "funnel_rate_title": "Registration → Check-in Conversion (%)",
+        "funnel_trend": "Trend ({n}-event average)",
+        "funnel_repeat_title": "Repeat No-shows ({n}+ times)",
+        "funnel_repeat_empty": "No repeat no-shows.",
+        "col_noshow": "No-shows",
+        "col_noshow_rate": "No-show Rate (%)",
+        "col_conversion": "Conversion (%)",
+        "col_conversion_trend": "Conversion Trend (%)",
+        "col_reg_count": "Registrations",
+        "tab10": "⏱️ Check-ins",
+        "ci_no_data": "No check-in times found. Please check the CheckedInAt column.",
+        "ci_caption": "Relative to a {start} start · check-ins more than {grace} min after start count as late.",
+        "ci_no_start": "Events whose date cannot be found from the tab name or check-ins are left out of arrival times.",
+        "ci_late_rate": "Late Rate",
+        "ci_median_arrival": "Median Arrival (vs. start)",
+        "ci_recheckin_rate": "Re-check-in Rate",
+        "ci_peak": "Peak Check-ins / min",
+        "ci_dist_title": "Arrival Time Distribution ({bin}-min bins)",
+        "ci_dist_x": "Arrival vs. start (min)",
+        "ci_load_title": "Check-ins per Minute — {event}",
+        "ci_load_event": "Event for door load",
+        "ci_load_x": "Time",
+        "col_late": "Late",
+        "col_late_rate": "Late Rate (%)",
+        "col_median_arrival": "Median Arrival (min)",
+        "col_recheckin": "Re-check-ins",
+        "col_recheckin_rate": "Re-check-in Rate (%)",
+        "col_max_count": "Max Count",
+        "col_peak": "Peak / min",
+        "col_peak_time": "Peak Time",
+        "unit_min": " min",
     },
 }
 
@@ -279,63 +516,182 @@ st.set_page_config(
 )
 
 
-# ── 비밀번호 인증 ────────────────────────────────────────────────────────────
+# ── 비밀번호 인증 (모임별) ───────────────────────────────────────────────────
 def check_auth():
-    if st.session_state.get("authenticated"):
-        return True
+    """로그인한 모임을 반환합니다. 여러 모임이면 주소의 ?club=<ID> 또는 목록에서 고릅니다."""
+    tenants = load_tenants(st.secrets)
+    requested = st.query_params.get("club")
+    if requested is not None and requested not in tenants:
+        st.error(t("unknown_club", club=requested))
+        st.stop()
+    # 모임이 하나면 따로 고르지 않음
+    current = st.session_state.get("tenant", next(iter(tenants)) if len(tenants) == 1 else None)
+    if st.session_state.get("authenticated") and current in tenants and requested in (None, current):
+        return tenants[current]
 
     st.title(t("app_title"))
+    if requested is not None:
+        tenant = tenants[requested]
+    elif len(tenants) > 1:
+        tenant = tenants[st.selectbox(t("club"), list(tenants), format_func=lambda k: tenants[k].name)]
+    else:
+        tenant = next(iter(tenants.values()))
+    if tenant.name:
+        st.caption(tenant.name)
     st.subheader(t("enter_password"))
     pw = st.text_input(t("password"), type="password", key="pw_input")
     if st.button(t("login")):
-        if pw == st.secrets.get("password", ""):
+        if tenant.check_password(pw):
             st.session_state.authenticated = True
+            st.session_state.tenant = tenant.id
             st.rerun()
         else:
             st.error(t("wrong_password"))
     st.stop()
 
 
-check_auth()
+tenant = check_auth()
 apply_theme()
 
 
+# ── 무거운 모듈은 로그인 후에 import — 비밀번호 화면은 streamlit만으로 그림 ──
+with timed("import app modules"):
+    import plotly.express as px
+    import plotly.graph_objects as go
+    import pandas as pd
+
+    from data_loader import get_worksheet_names, debug_worksheet
+    from data_service import STARTED, JOINED
+    from change_feed import REGISTERED, CHECKED_IN, PAID
+    from fetch_pool import FETCH_POOL
+    from cache_budget import CACHE, ANALYZER, cached, configure as configure_cache
+    from figure_cache import figure
+    from sheets_meter import METER, BudgetExceeded, configure as configure_meter
+    from checkins import checkin_report, event_starts, DEFAULT_START, LATE_GRACE_MIN, ARRIVAL_BIN_MIN
+    from analyzer import (
+        event_summary,
+        attendance_frequency,
+        cohort_retention,
+        cohort_retention_bucketed,
+        frequency_distribution,
+        co_attendance,
+        event_transitions,
+        funnel_by_event,
+        member_noshows,
+        repeat_noshows,
+        payment_summary,
+        payment_method_dist,
+        unpaid_members,
+        cash_checkin_summary,
+        reconcile_payments,
+        member_balances,
+        lookup_member,
+        referral_distribution,
+        referral_by_event,
+    )
+
+
 # ── 데이터 로드 ──────────────────────────────────────────────────────────────
-spreadsheet_id = st.secrets.get("spreadsheet_id", "")
+# 메모리·요청 예산은 프로세스 공통, 시트·설정은 로그인한 모임 것
+sources = tenant.sources
+configure_cache(st.secrets)
+configure_meter(st.secrets)
 
 st.title(t("app_title"))
+if tenant.name:
+    st.caption(tenant.name)
+
+if not sources:
+    st.error(t("no_spreadsheet_id"))
+    st.stop()
+
+service = tenant.service()
+
+
+def refresh_feedback(result: str, **cooldown_key) -> None:
+    if result == STARTED:
+        st.toast(t("refresh_started"))
+    elif result == JOINED:
+        st.toast(t("refresh_joined"))
+    else:
+        st.toast(t("refresh_limited", sec=int(service.cooldown_left(**cooldown_key)) + 1))
+
 
 col_title, col_refresh = st.columns([8, 1])
 with col_refresh:
     if st.button(t("refresh")):
-        st.cache_data.clear()
-        st.cache_resource.clear()
-        st.rerun()
+        # 활성 시트만 백그라운드에서 새로고침 — 인증 클라이언트와 다른 캐시는 유지
+        refresh_feedback(service.refresh(manual=True))
 
-if not spreadsheet_id:
-    st.error(t("no_spreadsheet_id"))
+with st.spinner(t("loading")):
+    snapshot = service.snapshot()
+
+if snapshot is None:
+    st.error(t("load_failed") + (service.last_error or ""))
     st.stop()
 
-with st.spinner(t("loading")):
-    try:
-        events = load_all_events(spreadsheet_id)
-    except Exception as e:
-        st.error(t("load_failed") + str(e))
-        st.stop()
+events, data_version = snapshot.events, snapshot.version
+
+with col_title:
+    status = t("last_updated", time=time.strftime("%H:%M:%S", time.localtime(snapshot.loaded_at)))
+    if service.refreshing:
+        status += " · " + t("refreshing")
+    elif service.degraded:
+        status += " · " + t("budget_degraded")
+    st.caption(status)
 
 if not events:
     st.warning(t("no_data"))
     st.stop()
 
-matrix, detail_df = build_attendance_matrix(events)
+matrix, detail_df = snapshot.matrix, snapshot.detail_df
 
 if matrix.empty:
     st.warning(t("no_attendance"))
     st.stop()
 
 
+# ── 데이터 버전별 분석 캐시 ──────────────────────────────────────────────────
+# 같은 데이터 버전·이벤트 선택이면 세션·재실행과 무관하게 한 번만 계산
+# 결과는 공유 캐시(cache_budget)의 메모리 예산 안에서 보관됨
+@cached(ANALYZER)
+def cached_co_attendance(version: str, events_key: tuple, _matrix: pd.DataFrame, top_k: int, min_shared: int):
+    return co_attendance(_matrix, top_k=top_k, min_shared=min_shared)
+
+
+@cached(ANALYZER)
+def cached_transitions(version: str, events_key: tuple, _matrix: pd.DataFrame):
+    return event_transitions(_matrix)
+
+
+@cached(ANALYZER)
+def cached_reconciliation(version: str, events_key: tuple, _pay: pd.DataFrame, _detail: pd.DataFrame, fee: int | None):
+    recon = reconcile_payments(_pay, _detail)
+    return recon, member_balances(recon, fee)
+
+
+@cached(ANALYZER)
+def cached_cohort(version: str, events_key: tuple, _matrix: pd.DataFrame, bucket, _dates: dict):
+    if bucket == "event":
+        return cohort_retention(_matrix)
+    return cohort_retention_bucketed(_matrix, bucket, _dates if bucket in ("month", "quarter") else None)
+
+
+@cached(ANALYZER)
+def cached_funnel(version: str, events_key: tuple, _detail: pd.DataFrame):
+    return funnel_by_event(_detail), member_noshows(_detail)
+
+
+@cached(ANALYZER)
+def cached_checkins(version: str, events_key: tuple, _checkin: pd.DataFrame, _dates: dict, start_time: str):
+    return checkin_report(_checkin, event_starts(_dates, start_time))
+
+
 # ── 사이드바: 설정 + 이벤트 필터 ─────────────────────────────────────────────
+# 매트릭스 열은 이미 카탈로그의 날짜순
+catalog = snapshot.catalog
 all_events = list(matrix.columns)
+matrix_events = set(all_events)
 with st.sidebar:
     with st.expander("⚙️ Settings", expanded=False):
         st.radio(t("language"), ["한국어", "English"], horizontal=True, key="lang_radio")
@@ -350,53 +706,151 @@ with st.sidebar:
             st.session_state.theme_mode = "system"
         apply_theme()
 
+    with st.expander(t("partial_refresh"), expanded=False):
+        target = st.selectbox(t("partial_refresh_event"), list(snapshot.origins))
+        if target:
+            target_sid, target_tab = snapshot.origins[target]
+            c_tab, c_sheet = st.columns(2)
+            if c_tab.button(t("refresh_tab"), use_container_width=True):
+                refresh_feedback(
+                    service.refresh(target_sid, target_tab, manual=True),
+                    source_id=target_sid, tab=target_tab,
+                )
+            if c_sheet.button(t("refresh_sheet"), use_container_width=True):
+                refresh_feedback(service.refresh(target_sid, manual=True), source_id=target_sid)
+
+    with st.expander("⏱️ Admin: 시작 시간", expanded=False):
+        if startup.TIMINGS.get("first snapshot") is None:
+            st.caption("`python startup.py`로 실행하면 서버 시작 시 미리 로드합니다.")
+        if startup.prewarm_error:
+            st.write(f"⚠️ 미리 로드 실패: {startup.prewarm_error}")
+        st.dataframe(
+            pd.DataFrame({"단계": list(startup.TIMINGS), "초": [round(v, 3) for v in startup.TIMINGS.values()]}),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    with st.expander("🧠 Admin: 캐시 메모리", expanded=False):
+        st.write(f"**사용량:** {CACHE.used / 1024 / 1024:.1f} MB / {CACHE.budget / 1024 / 1024:.0f} MB")
+        st.dataframe(CACHE.stats(), use_container_width=True)
+
+    with st.expander("📡 Admin: Sheets API 요청", expanded=False):
+        st.write(f"**최근 {METER.window:g}초 여유:** {METER.remaining(tenant.id)} / {METER.share(tenant.id)}회")
+        st.caption("호출 위치별 누적")
+        st.dataframe(METER.stats(), use_container_width=True)
+        st.caption("최근 새로고침")
+        refreshes = METER.recent_refreshes()
+        if tenant.id:  # 다른 모임의 탭 이름은 보이지 않게
+            refreshes = refreshes[refreshes["대상"].str.startswith(f"[{tenant.id}] ")]
+        st.dataframe(refreshes, use_container_width=True, hide_index=True)
+        st.caption("시트 요청 작업 풀")
+        pool = FETCH_POOL.stats()
+        if tenant.id:  # 다른 모임의 대기 현황은 보이지 않게
+            pool = pool[pool.index == tenant.id]
+        st.dataframe(pool, use_container_width=True)
+
     with st.expander("🔍 Debug: 로딩 현황", expanded=False):
-        all_ws_names = get_worksheet_names(spreadsheet_id)
-        st.write(f"**gspread가 인식한 시트 수:** {len(all_ws_names)}")
         st.write(f"**실제 로딩된 시트 수:** {len(events)}")
-        for name in all_ws_names:
-            in_events = name in events
-            in_matrix = name in matrix.columns
-            if in_matrix:
-                status = "✅ 정상"
-            elif in_events:
-                status = "⚠️ 로딩됨 (매트릭스 제외)"
+        st.write(f"**동일인으로 합친 이메일 수:** {len(snapshot.identities)}")
+        # 탭 목록 조회는 시트마다 API 요청 2회 이상 — 펼칠 때마다가 아니라 켰을 때만
+        ws_names_by_source = {}
+        if st.toggle("Google Sheets 탭 목록과 비교 (API 요청)"):
+            try:
+                with METER.tenant(tenant.id):
+                    ws_names_by_source = {s["id"]: get_worksheet_names(s["id"]) for s in sources}
+            except BudgetExceeded as e:
+                st.write(f"⏳ {e}")
             else:
-                status = "❌ 로딩 실패"
-            st.write(f"- `{name}` — {status}")
-            if not in_events:
-                detail = debug_worksheet(spreadsheet_id, name)
-                st.write(f"  → {detail}")
+                st.write(f"**gspread가 인식한 시트 수:** {sum(len(v) for v in ws_names_by_source.values())}")
+        for source in sources:
+            if source["id"] not in ws_names_by_source:
+                continue
+            if len(sources) > 1:
+                st.write(f"**`{source['id']}`** {'🧊 종료 시즌' if source['frozen'] else '🟢 활성'}")
+            for name in ws_names_by_source[source["id"]]:
+                # 이름이 겹친 탭은 접미사가 붙어 있으므로 앞부분으로 비교
+                in_events = any(e == name or e.startswith(f"{name} · ") for e in events)
+                in_matrix = any(e == name or e.startswith(f"{name} · ") for e in matrix.columns)
+                if in_matrix:
+                    status = "✅ 정상"
+                elif in_events:
+                    status = "⚠️ 로딩됨 (매트릭스 제외)"
+                else:
+                    status = "❌ 로딩 실패"
+                st.write(f"- `{name}` — {status}")
+                if not in_events:
+                    try:
+                        with METER.tenant(tenant.id):
+                            detail = debug_worksheet(source["id"], name)
+                    except BudgetExceeded as e:
+                        detail = f"⏳ {e}"
+                    st.write(f"  → {detail}")
 
     st.header(t("filter"))
-    selected_events = st.multiselect(
-        t("select_events"),
-        options=all_events,
-        default=all_events,
-    )
+    # 탭이 수백 개여도 가볍도록 기본은 전체 — 이벤트 목록 위젯은 직접 선택할 때만 그림
+    mode_opts = {t(f"filter_{m}"): m for m in ("all", "range", "last", "pick") if m != "range" or catalog.dated}
+    mode = mode_opts[st.radio(t("filter_mode"), list(mode_opts), horizontal=True)]
+    if mode == "range":
+        picked = st.date_input(
+            t("date_range"),
+            value=(catalog.first_date, catalog.last_date),
+            min_value=catalog.first_date,
+            max_value=catalog.last_date,
+        )
+        # 끝 날짜를 고르는 중에는 시작 날짜 하나만 옴
+        start, end = picked if len(picked) == 2 else (picked[0], None) if picked else (None, None)
+        picked_events = catalog.between(start, end)
+    elif mode == "last":
+        n_last = st.number_input(t("last_n"), min_value=1, max_value=len(all_events), value=min(10, len(all_events)))
+        picked_events = all_events[-int(n_last):]
+    elif mode == "pick":
+        picked_events = st.multiselect(t("select_events"), options=all_events, default=all_events[-10:])
+    else:
+        picked_events = all_events
+    if len(catalog.kinds) > 1:
+        kinds = st.multiselect(t("event_kinds"), catalog.kinds, default=catalog.kinds)
+        picked_events = catalog.of_kind(picked_events, kinds)
+    # 분석에는 항상 날짜순 열 (직접 선택한 순서와 무관)
+    selected_events = [e for e in catalog.order(picked_events) if e in matrix_events]
     st.caption(t("total_caption", n_events=len(all_events), n_members=matrix.shape[0]))
 
+    with st.expander(t("event_catalog"), expanded=False):
+        st.dataframe(catalog.table(), use_container_width=True, hide_index=True)
+
 if not selected_events:
     st.warning(t("select_one_event"))
     st.stop()
 
 filtered_matrix = matrix[selected_events]
 filtered_detail = detail_df[detail_df["event"].isin(selected_events)] if not detail_df.empty else detail_df
-# 결제 데이터 생성
-pay_df = build_payment_data(events)
+# 결제·유입 경로 데이터는 스냅샷에 미리 만들어져 있음
+pay_df, ref_df = snapshot.pay_df, snapshot.ref_df
 
 # 선택된 이벤트만 필터링
 filtered_pay = pay_df[pay_df["event"].isin(selected_events)] if not pay_df.empty else pay_df
 
-ref_df = build_referral_data(events)
 filtered_ref = ref_df[ref_df["event"].isin(selected_events)] if not ref_df.empty else ref_df
 
+filtered_checkin = snapshot.checkin_df[snapshot.checkin_df["event"].isin(selected_events)]
+
+# 그림 캐시 키 — 데이터·선택·언어·테마가 같으면 세션과 무관하게 같은 그림을 재사용
+fig_key = (data_version, tuple(selected_events), st.session_state.lang, st.session_state.get("theme_mode", "system"))
+
 
 # ── 상단 KPI ─────────────────────────────────────────────────────────────────
-total_unique = filtered_matrix.index.nunique()
+# 전체 이벤트를 보고 있으면 스냅샷의 누적 집계를 그대로 사용 (매트릭스를 다시 훑지 않음)
+aggregates = snapshot.aggregates
+# 누적 집계가 정확할 때만 (아니면 선택한 이벤트로 다시 계산)
+use_aggregates = selected_events == all_events and aggregates.exact
 total_events = len(selected_events)
-multi_attendees = int((filtered_matrix.sum(axis=1) > 1).sum())
-avg_events_per_person = filtered_matrix.sum(axis=1).mean()
+if use_aggregates:
+    total_unique = aggregates.total_unique
+    multi_attendees = aggregates.multi_attendees
+    avg_events_per_person = aggregates.avg_events_per_person
+else:
+    total_unique = filtered_matrix.index.nunique()
+    multi_attendees = int((filtered_matrix.sum(axis=1) > 1).sum())
+    avg_events_per_person = filtered_matrix.sum(axis=1).mean()
 
 up = t("unit_person")
 ut = t("unit_times")
@@ -407,18 +861,55 @@ k2.metric(t("n_events"), f"{total_events}{ut}")
 k3.metric(t("returning_2plus"), f"{multi_attendees}{up}", help=t("returning_help"))
 k4.metric(t("avg_per_person"), f"{avg_events_per_person:.1f}{ut}")
 
+
+# ── 최근 활동: 새로고침 사이에 바뀐 등록·체크인·결제 ─────────────────────────
+ACTIVITY_ROWS = 200  # 표에 보여줄 최근 변경 수
+
+activity_kinds = {
+    REGISTERED: t("activity_registered"),
+    CHECKED_IN: t("activity_checked_in"),
+    PAID: t("activity_paid"),
+}
+activity = service.changes.since()
+activity = activity[activity["event"].isin(selected_events)]
+seen_at = st.session_state.get("activity_seen_at")
+unseen = activity if seen_at is None else activity[activity["at"] > seen_at]
+
+with st.expander(t("activity_title", n=len(unseen)), expanded=not unseen.empty):
+    if activity.empty:
+        st.info(t("activity_empty"))
+    else:
+        activity_cols = st.columns(len(activity_kinds) + 1)
+        for col, (kind, label) in zip(activity_cols, activity_kinds.items()):
+            col.metric(label, f"{int((unseen['kind'] == kind).sum())}{up}")
+        if activity_cols[-1].button(t("activity_mark_seen")):
+            st.session_state.activity_seen_at = time.time()
+            st.rerun()
+
+        recent = activity.head(ACTIVITY_ROWS)
+        st.dataframe(
+            pd.DataFrame({
+                t("col_time"): recent["at"].map(lambda at: time.strftime("%m-%d %H:%M", time.localtime(at))),
+                t("col_event"): recent["event"],
+                t("col_name"): recent["name"],
+                t("col_kind"): recent["kind"].map(activity_kinds),
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+
 st.divider()
 
 
 # ── 탭 ───────────────────────────────────────────────────────────────────────
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
-    [t("tab1"), t("tab2"), t("tab3"), t("tab4"), t("tab5"), t("tab6")]
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(
+    [t("tab1"), t("tab2"), t("tab3"), t("tab4"), t("tab5"), t("tab6"), t("tab7"), t("tab8"), t("tab9"), t("tab10")]
 )
 
 
 # ── Tab 1: 이벤트별 요약 ─────────────────────────────────────────────────────
 with tab1:
-    summary_df = event_summary(filtered_matrix, filtered_detail)
+    summary_df = aggregates.summary if use_aggregates else event_summary(filtered_matrix, filtered_detail)
 
     # 표시용 컬럼명 번역
     col_map = {
@@ -431,38 +922,44 @@ with tab1:
     }
     display_summary = summary_df.rename(columns=col_map)
 
-    fig_bar = px.bar(
-        display_summary,
-        x=t("col_event"),
-        y=[t("col_new"), t("col_returning")],
-        barmode="stack",
-        color_discrete_map={t("col_new"): "#4C8BF5", t("col_returning"): "#34A853"},
-        title=t("bar_title"),
-        labels={"value": t("bar_y"), "variable": ""},
-    )
-    fig_bar.update_layout(legend_title_text="")
-    st.plotly_chart(fig_bar, use_container_width=True)
+    def build_fig_bar():
+        fig_bar = px.bar(
+            display_summary,
+            x=t("col_event"),
+            y=[t("col_new"), t("col_returning")],
+            barmode="stack",
+            color_discrete_map={t("col_new"): "#4C8BF5", t("col_returning"): "#34A853"},
+            title=t("bar_title"),
+            labels={"value": t("bar_y"), "variable": ""},
+        )
+        fig_bar.update_layout(legend_title_text="")
+        return fig_bar
+
+    st.plotly_chart(figure("summary_bar", fig_key, build_fig_bar), use_container_width=True)
 
     retention_vals = [
         v if v != "-" else None for v in summary_df["복귀율(%)"].tolist()
     ]
     if any(v is not None for v in retention_vals):
-        fig_line = go.Figure()
-        fig_line.add_trace(
-            go.Scatter(
-                x=display_summary[t("col_event")],
-                y=retention_vals,
-                mode="lines+markers",
-                line=dict(color="#FBBC05", width=2),
-                name=t("col_retention"),
+        def build_fig_line():
+            fig_line = go.Figure()
+            fig_line.add_trace(
+                go.Scatter(
+                    x=display_summary[t("col_event")],
+                    y=retention_vals,
+                    mode="lines+markers",
+                    line=dict(color="#FBBC05", width=2),
+                    name=t("col_retention"),
+                )
             )
-        )
-        fig_line.update_layout(
-            title=t("line_title"),
-            yaxis=dict(range=[0, 100], ticksuffix="%"),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_line, use_container_width=True)
+            fig_line.update_layout(
+                title=t("line_title"),
+                yaxis=dict(range=[0, 100], ticksuffix="%"),
+                showlegend=False,
+            )
+            return fig_line
+
+        st.plotly_chart(figure("summary_retention", fig_key, build_fig_line), use_container_width=True)
 
     st.dataframe(display_summary, use_container_width=True, hide_index=True)
 
@@ -475,72 +972,106 @@ with tab2:
         "인원 수": t("col_people_count"),
     })
 
-    fig_hist = px.bar(
-        display_dist,
-        x=t("col_attend_count"),
-        y=t("col_people_count"),
-        title=t("hist_title"),
-        color=t("col_people_count"),
-        color_continuous_scale="Blues",
-        text=t("col_people_count"),
-    )
-    fig_hist.update_traces(textposition="outside")
-    fig_hist.update_layout(coloraxis_showscale=False)
-    st.plotly_chart(fig_hist, use_container_width=True)
-
-    fig_pie = px.pie(
-        display_dist,
-        names=t("col_attend_count"),
-        values=t("col_people_count"),
-        title=t("pie_title"),
-        hole=0.4,
-    )
-    fig_pie.update_traces(
-        texttemplate=t("pie_template"),
-        textposition="outside",
-    )
-    st.plotly_chart(fig_pie, use_container_width=True)
+    def build_fig_hist():
+        fig_hist = px.bar(
+            display_dist,
+            x=t("col_attend_count"),
+            y=t("col_people_count"),
+            title=t("hist_title"),
+            color=t("col_people_count"),
+            color_continuous_scale="Blues",
+            text=t("col_people_count"),
+        )
+        fig_hist.update_traces(textposition="outside")
+        fig_hist.update_layout(coloraxis_showscale=False)
+        return fig_hist
+
+    st.plotly_chart(figure("frequency_hist", fig_key, build_fig_hist), use_container_width=True)
+
+    def build_fig_pie():
+        fig_pie = px.pie(
+            display_dist,
+            names=t("col_attend_count"),
+            values=t("col_people_count"),
+            title=t("pie_title"),
+            hole=0.4,
+        )
+        fig_pie.update_traces(
+            texttemplate=t("pie_template"),
+            textposition="outside",
+        )
+        return fig_pie
+
+    st.plotly_chart(figure("frequency_pie", fig_key, build_fig_pie), use_container_width=True)
 
 
 # ── Tab 3: 코호트 리텐션 ────────────────────────────────────────────────────
+# 이벤트가 아무리 많아도 히트맵·표는 최근 코호트 / 앞쪽 오프셋까지만 그림
+MAX_COHORT_ROWS, MAX_COHORT_OFFSETS = 24, 24
+MAX_CELL_TEXT = 400  # 셀 수가 이보다 많으면 셀 안 텍스트 생략
+
 with tab3:
-    cohort_df = cohort_retention(filtered_matrix)
+    bucket_opts = {
+        t("cohort_bucket_event"): "event",
+        t("cohort_bucket_month"): "month",
+        t("cohort_bucket_quarter"): "quarter",
+        t("cohort_bucket_n"): "n",
+    }
+    b_col, n_col = st.columns([3, 1])
+    bucket_label = b_col.radio(t("cohort_bucket"), list(bucket_opts), horizontal=True)
+    bucket = bucket_opts[bucket_label]
+    if bucket == "n":
+        bucket = int(n_col.number_input(t("cohort_bucket_size"), min_value=2, max_value=52, value=4))
+
+    cohort_df = cached_cohort(data_version, tuple(selected_events), filtered_matrix, bucket, catalog.dates())
 
     if cohort_df.empty:
         st.info(t("cohort_no_data"))
     else:
         st.caption(t("cohort_caption"))
-
-        numeric_cols = [c for c in cohort_df.columns if c != "코호트 크기"]
-        heatmap_df = cohort_df[numeric_cols].copy()
-
-        fig_hm = go.Figure(
-            data=go.Heatmap(
-                z=heatmap_df.values,
-                x=heatmap_df.columns.tolist(),
-                y=heatmap_df.index.tolist(),
-                colorscale="Greens",
-                zmin=0,
-                zmax=100,
-                text=[[f"{v:.0f}%" if pd.notna(v) else "" for v in row]
-                      for row in heatmap_df.values],
-                texttemplate="%{text}",
-                hovertemplate=t("cohort_hover"),
+        shown_df = cohort_df.iloc[-MAX_COHORT_ROWS:, : MAX_COHORT_OFFSETS + 1]
+        if shown_df.shape != cohort_df.shape:
+            st.caption(t("cohort_capped", rows=len(shown_df), total=len(cohort_df),
+                         offsets=shown_df.shape[1] - 1))
+
+        numeric_cols = [c for c in shown_df.columns if c != "코호트 크기"]
+        heatmap_df = shown_df[numeric_cols]
+        show_text = heatmap_df.size <= MAX_CELL_TEXT
+
+        def build_fig_hm():
+            fig_hm = go.Figure(
+                data=go.Heatmap(
+                    z=heatmap_df.values,
+                    x=heatmap_df.columns.tolist(),
+                    y=heatmap_df.index.tolist(),
+                    colorscale="Greens",
+                    zmin=0,
+                    zmax=100,
+                    text=[[f"{v:.0f}%" if pd.notna(v) else "" for v in row]
+                          for row in heatmap_df.values] if show_text else None,
+                    texttemplate="%{text}" if show_text else None,
+                    hovertemplate=t("cohort_hover"),
+                )
             )
-        )
-        fig_hm.update_layout(
-            title=t("cohort_title"),
-            xaxis_title=t("cohort_x"),
-            yaxis_title=t("cohort_y"),
-            height=max(300, len(cohort_df) * 50 + 100),
-        )
-        st.plotly_chart(fig_hm, use_container_width=True)
+            fig_hm.update_layout(
+                title=t("cohort_title"),
+                xaxis_title=t("cohort_x"),
+                yaxis_title=t("cohort_y"),
+                height=max(300, len(shown_df) * 50 + 100),
+            )
+            return fig_hm
 
-        display_cohort = cohort_df.rename(columns={"코호트 크기": t("col_cohort_size")})
-        display_numeric = [c for c in display_cohort.columns if c != t("col_cohort_size")]
+        st.plotly_chart(figure("cohort_heatmap", fig_key + (bucket,), build_fig_hm), use_container_width=True)
+
+        display_cohort = shown_df.rename(columns={"코호트 크기": t("col_cohort_size")})
+        # Styler 대신 column_config로 서식 지정 — 표 크기와 무관하게 가볍게 렌더링
         st.dataframe(
-            display_cohort.style.format("{:.1f}%", subset=display_numeric, na_rep="-"),
+            display_cohort,
             use_container_width=True,
+            column_config={
+                c: st.column_config.NumberColumn(c, format="%.1f%%")
+                for c in numeric_cols
+            },
         )
 
 
@@ -556,21 +1087,24 @@ with tab4:
     st.caption(t("member_caption"))
 
     top_n = min(20, len(display_freq))
-    fig_top = px.bar(
-        display_freq.head(top_n),
-        x=t("col_attend_count"),
-        y=t("member_label"),
-        orientation="h",
-        title=t("top_n_title", n=top_n),
-        color=t("col_attend_count"),
-        color_continuous_scale="Purples",
-        labels={t("member_label"): t("member_label")},
-    )
-    fig_top.update_layout(
-        yaxis=dict(autorange="reversed"),
-        coloraxis_showscale=False,
-    )
-    st.plotly_chart(fig_top, use_container_width=True)
+    def build_fig_top():
+        fig_top = px.bar(
+            display_freq.head(top_n),
+            x=t("col_attend_count"),
+            y=t("member_label"),
+            orientation="h",
+            title=t("top_n_title", n=top_n),
+            color=t("col_attend_count"),
+            color_continuous_scale="Purples",
+            labels={t("member_label"): t("member_label")},
+        )
+        fig_top.update_layout(
+            yaxis=dict(autorange="reversed"),
+            coloraxis_showscale=False,
+        )
+        return fig_top
+
+    st.plotly_chart(figure("top_members", fig_key, build_fig_top), use_container_width=True)
 
     st.dataframe(display_freq, use_container_width=True)
 
@@ -609,36 +1143,42 @@ with tab5:
         }
         display_pay = pay_sum.rename(columns=col_map_pay)
 
-        fig_pay_bar = px.bar(
-            display_pay,
-            x=t("col_event"),
-            y=[t("col_paid"), t("col_unpaid")],
-            barmode="stack",
-            color_discrete_map={t("col_paid"): "#34A853", t("col_unpaid"): "#EA4335"},
-            title=t("pay_bar_title"),
-            labels={"value": t("pay_bar_y"), "variable": ""},
-        )
-        fig_pay_bar.update_layout(legend_title_text="")
-        st.plotly_chart(fig_pay_bar, use_container_width=True)
+        def build_fig_pay_bar():
+            fig_pay_bar = px.bar(
+                display_pay,
+                x=t("col_event"),
+                y=[t("col_paid"), t("col_unpaid")],
+                barmode="stack",
+                color_discrete_map={t("col_paid"): "#34A853", t("col_unpaid"): "#EA4335"},
+                title=t("pay_bar_title"),
+                labels={"value": t("pay_bar_y"), "variable": ""},
+            )
+            fig_pay_bar.update_layout(legend_title_text="")
+            return fig_pay_bar
+
+        st.plotly_chart(figure("payment_bar", fig_key, build_fig_pay_bar), use_container_width=True)
 
         col_left, col_right = st.columns(2)
 
         # 결제율 라인 차트
         with col_left:
-            fig_pay_rate = go.Figure()
-            fig_pay_rate.add_trace(go.Scatter(
-                x=display_pay[t("col_event")],
-                y=pay_sum["결제율(%)"].tolist(),
-                mode="lines+markers",
-                line=dict(color="#FCACF3", width=2),
-                name=t("col_pay_rate"),
-            ))
-            fig_pay_rate.update_layout(
-                title=t("pay_rate_title"),
-                yaxis=dict(range=[0, 100], ticksuffix="%"),
-                showlegend=False,
-            )
-            st.plotly_chart(fig_pay_rate, use_container_width=True)
+            def build_fig_pay_rate():
+                fig_pay_rate = go.Figure()
+                fig_pay_rate.add_trace(go.Scatter(
+                    x=display_pay[t("col_event")],
+                    y=pay_sum["결제율(%)"].tolist(),
+                    mode="lines+markers",
+                    line=dict(color="#FCACF3", width=2),
+                    name=t("col_pay_rate"),
+                ))
+                fig_pay_rate.update_layout(
+                    title=t("pay_rate_title"),
+                    yaxis=dict(range=[0, 100], ticksuffix="%"),
+                    showlegend=False,
+                )
+                return fig_pay_rate
+
+            st.plotly_chart(figure("payment_rate", fig_key, build_fig_pay_rate), use_container_width=True)
 
         # 결제 방법 파이 차트
         with col_right:
@@ -656,15 +1196,18 @@ with tab5:
                     "결제 방법": t("col_method"),
                     "인원": t("col_count"),
                 })
-                fig_method = px.pie(
-                    display_method,
-                    names=t("col_method"),
-                    values=t("col_count"),
-                    title=t("pay_method_title"),
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.sequential.Purples_r,
-                )
-                st.plotly_chart(fig_method, use_container_width=True)
+                def build_fig_method():
+                    fig_method = px.pie(
+                        display_method,
+                        names=t("col_method"),
+                        values=t("col_count"),
+                        title=t("pay_method_title"),
+                        hole=0.4,
+                        color_discrete_sequence=px.colors.sequential.Purples_r,
+                    )
+                    return fig_method
+
+                st.plotly_chart(figure("payment_method", fig_key, build_fig_method), use_container_width=True)
 
         # 이벤트별 요약 테이블
         st.dataframe(display_pay, use_container_width=True, hide_index=True)
@@ -685,6 +1228,63 @@ with tab5:
             })
             st.dataframe(display_cash, use_container_width=True, hide_index=True)
 
+        st.divider()
+
+        # 결제 × 참석 정산
+        st.subheader(t("recon_title"))
+        st.caption(t("recon_caption"))
+        fee = tenant.get("fee_krw")
+        recon_df, balances = cached_reconciliation(
+            data_version, tuple(selected_events), filtered_pay, filtered_detail, fee
+        )
+        recon_col_map = {
+            "이벤트": t("col_event"),
+            "이름": t("col_name"),
+            "등록": t("col_registered"),
+            "결제완료": t("col_settled_paid"),
+            "현금 수납": t("col_cash_collected"),
+            "참석": t("col_attended"),
+            "미결제 참석": t("col_attended_unpaid"),
+            "결제 후 노쇼": t("col_paid_noshow"),
+            "미수금(KRW)": t("col_outstanding_krw"),
+            "현금 수납액(KRW)": t("col_cash_krw"),
+        }
+
+        r1, r2, r3 = st.columns(3)
+        r1.metric(t("recon_cash_collected"), f"{int(balances['현금 수납'].sum())}{t('unit_person')}")
+        r2.metric(t("recon_outstanding"), f"{int(balances['미결제 참석'].sum())}{t('unit_person')}")
+        r3.metric(t("recon_paid_noshow"), f"{int(balances['결제 후 노쇼'].sum())}{t('unit_person')}")
+        if fee:
+            a1, a2 = st.columns(2)
+            a1.metric(t("recon_cash_amount"), f"₩{int(balances['현금 수납액(KRW)'].sum()):,}")
+            a2.metric(t("recon_outstanding_amount"), f"₩{int(balances['미수금(KRW)'].sum()):,}")
+
+        query = st.text_input(t("recon_lookup"), placeholder=t("recon_lookup_placeholder"))
+        if query:
+            found = lookup_member(balances, query)
+            if found.empty:
+                st.info(t("recon_lookup_empty"))
+            else:
+                display_found = found.rename(columns=recon_col_map)
+                display_found.index.name = t("col_name")
+                st.dataframe(display_found, use_container_width=True)
+
+        recon_left, recon_right = st.columns(2)
+        with recon_left:
+            st.markdown(f"**{t('recon_attended_unpaid_title')}**")
+            owed = recon_df.loc[recon_df["미결제 참석"], ["이벤트", "이름", "ID"]]
+            if owed.empty:
+                st.info(t("recon_empty"))
+            else:
+                st.dataframe(owed.rename(columns=recon_col_map), use_container_width=True, hide_index=True)
+        with recon_right:
+            st.markdown(f"**{t('recon_paid_noshow_title')}**")
+            noshow_paid = recon_df.loc[recon_df["결제 후 노쇼"], ["이벤트", "이름", "ID"]]
+            if noshow_paid.empty:
+                st.info(t("recon_empty"))
+            else:
+                st.dataframe(noshow_paid.rename(columns=recon_col_map), use_container_width=True, hide_index=True)
+
 
 # ── Tab 6: 유입 경로 ──────────────────────────────────────────────────────────
 with tab6:
@@ -706,42 +1306,341 @@ with tab6:
                 "유입 경로": t("col_source"),
                 "인원": t("col_source_count"),
             })
-            fig_ref_bar = px.bar(
-                display_dist,
-                x=t("col_source_count"),
-                y=t("col_source"),
+            def build_fig_ref_bar():
+                fig_ref_bar = px.bar(
+                    display_dist,
+                    x=t("col_source_count"),
+                    y=t("col_source"),
+                    orientation="h",
+                    title=t("ref_dist_title"),
+                    color=t("col_source_count"),
+                    color_continuous_scale="Purples",
+                    text=t("col_source_count"),
+                )
+                fig_ref_bar.update_traces(textposition="outside")
+                fig_ref_bar.update_layout(
+                    yaxis=dict(autorange="reversed"),
+                    coloraxis_showscale=False,
+                )
+                return fig_ref_bar
+
+            st.plotly_chart(figure("referral_bar", fig_key, build_fig_ref_bar), use_container_width=True)
+
+        with col_r:
+            def build_fig_ref_pie():
+                fig_ref_pie = px.pie(
+                    display_dist,
+                    names=t("col_source"),
+                    values=t("col_source_count"),
+                    hole=0.4,
+                    color_discrete_sequence=px.colors.sequential.Purples_r,
+                )
+                fig_ref_pie.update_traces(textposition="outside", textinfo="percent+label")
+                return fig_ref_pie
+
+            st.plotly_chart(figure("referral_pie", fig_key, build_fig_ref_pie), use_container_width=True)
+
+        if len(by_event_df.columns) > 1:
+            st.subheader(t("ref_event_title"))
+            def build_fig_ref_event():
+                fig_ref_event = px.bar(
+                    by_event_df.reset_index(),
+                    x="유입 경로",
+                    y=by_event_df.columns.tolist(),
+                    barmode="group",
+                    title=t("ref_event_title"),
+                    labels={"value": t("col_source_count"), "variable": t("col_event")},
+                )
+                return fig_ref_event
+
+            st.plotly_chart(figure("referral_by_event", fig_key, build_fig_ref_event), use_container_width=True)
+
+        with st.expander(t("ref_mapping_title")):
+            mapping = (
+                filtered_ref.groupby(["source", "raw_source"]).size()
+                .reset_index(name="count")
+                .sort_values(["source", "count"], ascending=[True, False])
+                .rename(columns={
+                    "source": t("col_source"),
+                    "raw_source": t("col_raw_source"),
+                    "count": t("col_source_count"),
+                })
+            )
+            st.dataframe(mapping, use_container_width=True, hide_index=True)
+
+
+# ── Tab 7: 함께 오는 멤버 ─────────────────────────────────────────────────────
+CO_TOP_K, CO_MIN_SHARED = 10, 2
+
+with tab7:
+    pairs_df, communities_df, connectors_df = cached_co_attendance(
+        data_version, tuple(selected_events), filtered_matrix, CO_TOP_K, CO_MIN_SHARED
+    )
+
+    if pairs_df.empty:
+        st.info(t("co_no_data"))
+    else:
+        st.caption(t("co_caption", k=CO_TOP_K, m=CO_MIN_SHARED))
+        co_col_map = {
+            "멤버 A": t("col_member_a"),
+            "멤버 B": t("col_member_b"),
+            "함께 참석": t("col_shared"),
+            "유사도": t("col_similarity"),
+            "멤버": t("member_label"),
+            "참석 횟수": t("col_attend_count"),
+            "함께한 멤버 수": t("col_co_members"),
+            "연결 강도": t("col_strength"),
+            "다리 역할": t("col_bridge"),
+            "커뮤니티": t("col_community"),
+            "연결 점수": t("col_connector"),
+            "인원": t("col_count"),
+            "평균 참석": t("col_avg_attend"),
+            "대표 멤버": t("col_top_members"),
+        }
+
+        top_pairs = pairs_df.head(20).rename(columns=co_col_map)
+        top_pairs["pair"] = (
+            top_pairs[t("col_member_a")].astype(str) + " · " + top_pairs[t("col_member_b")].astype(str)
+        )
+        def build_fig_pairs():
+            fig_pairs = px.bar(
+                top_pairs,
+                x=t("col_shared"),
+                y="pair",
                 orientation="h",
-                title=t("ref_dist_title"),
-                color=t("col_source_count"),
+                title=t("co_pairs_title"),
+                color=t("col_similarity"),
                 color_continuous_scale="Purples",
-                text=t("col_source_count"),
+                labels={"pair": ""},
             )
-            fig_ref_bar.update_traces(textposition="outside")
-            fig_ref_bar.update_layout(
+            fig_pairs.update_layout(yaxis=dict(autorange="reversed"))
+            return fig_pairs
+
+        st.plotly_chart(figure("co_pairs", fig_key, build_fig_pairs), use_container_width=True)
+
+        st.subheader(t("co_connectors_title"))
+        st.caption(t("co_connectors_help"))
+        connectors_df.index.name = t("col_rank")
+        st.dataframe(connectors_df.head(50).rename(columns=co_col_map), use_container_width=True)
+
+        if not communities_df.empty:
+            st.subheader(t("co_communities_title"))
+            display_comm = communities_df.rename(columns=co_col_map)
+            display_comm.index.name = t("col_community")
+            st.dataframe(display_comm, use_container_width=True)
+
+
+# ── Tab 8: 이벤트 흐름 ───────────────────────────────────────────────────────
+with tab8:
+    flow_df, prob_df = cached_transitions(data_version, tuple(selected_events), filtered_matrix)
+
+    if len(selected_events) < 2 or flow_df.empty:
+        st.info(t("flow_no_data"))
+    else:
+        st.caption(t("flow_caption"))
+
+        # 바로 다음 이벤트 복귀율 (전이 확률의 대각선 바로 위)
+        next_rates = [prob_df.iat[i, i + 1] for i in range(len(prob_df) - 1)]
+        valid_next = [v for v in next_rates if pd.notna(v)]
+        if valid_next:
+            st.metric(t("flow_next_rate"), f"{sum(valid_next) / len(valid_next):.1f}%")
+
+        node_labels = [t("flow_new")] + list(flow_df.columns)
+        links = flow_df.reset_index(drop=True).stack()
+        links = links[links > 0].sort_values(ascending=False).head(300)
+        def build_fig_sankey():
+            fig_sankey = go.Figure(go.Sankey(
+                node=dict(label=node_labels, pad=12, thickness=14, color="#FCACF3"),
+                link=dict(
+                    source=links.index.get_level_values(0).tolist(),
+                    # 대상 노드는 이벤트 인덱스 + 1 ("신규" 노드가 0번)
+                    target=[flow_df.columns.get_loc(c) + 1 for c in links.index.get_level_values(1)],
+                    value=links.tolist(),
+                ),
+            ))
+            fig_sankey.update_layout(title=t("flow_sankey_title"), height=max(400, len(node_labels) * 20))
+            return fig_sankey
+
+        st.plotly_chart(figure("flow_sankey", fig_key, build_fig_sankey), use_container_width=True)
+
+        display_prob = prob_df.rename(columns={"미복귀": t("flow_churn")})
+        def build_fig_prob():
+            fig_prob = go.Figure(
+                data=go.Heatmap(
+                    z=display_prob.values,
+                    x=display_prob.columns.tolist(),
+                    y=display_prob.index.tolist(),
+                    colorscale="Purples",
+                    zmin=0,
+                    zmax=100,
+                    hovertemplate=t("flow_prob_hover"),
+                )
+            )
+            fig_prob.update_layout(
+                title=t("flow_prob_title"),
+                xaxis_title=t("flow_prob_x"),
+                yaxis_title=t("flow_prob_y"),
                 yaxis=dict(autorange="reversed"),
-                coloraxis_showscale=False,
+                height=max(350, len(display_prob) * 28 + 120),
             )
-            st.plotly_chart(fig_ref_bar, use_container_width=True)
+            return fig_prob
 
-        with col_r:
-            fig_ref_pie = px.pie(
-                display_dist,
-                names=t("col_source"),
-                values=t("col_source_count"),
-                hole=0.4,
-                color_discrete_sequence=px.colors.sequential.Purples_r,
+        st.plotly_chart(figure("flow_prob", fig_key, build_fig_prob), use_container_width=True)
+
+
+# ── Tab 9: 등록 → 참석 (노쇼) ────────────────────────────────────────────────
+FUNNEL_TREND_WINDOW, REPEAT_NOSHOW_MIN = 3, 2
+
+with tab9:
+    funnel_df, noshow_df = cached_funnel(data_version, tuple(selected_events), filtered_detail)
+
+    if funnel_df.empty:
+        st.info(t("funnel_no_data"))
+    else:
+        st.caption(t("funnel_caption"))
+
+        total_reg = int(funnel_df["등록자"].sum())
+        total_att = int(funnel_df["참석자"].sum())
+        f1, f2, f3 = st.columns(3)
+        f1.metric(t("funnel_registered"), f"{total_reg}{t('unit_person')}")
+        f2.metric(t("funnel_attended"), f"{total_att}{t('unit_person')}")
+        f3.metric(t("funnel_noshow_rate"), f"{(total_reg - total_att) / total_reg * 100:.1f}%")
+
+        funnel_col_map = {
+            "이벤트": t("col_event"),
+            "등록자": t("col_registered"),
+            "참석자": t("col_attended"),
+            "노쇼": t("col_noshow"),
+            "노쇼율(%)": t("col_noshow_rate"),
+            "전환율(%)": t("col_conversion"),
+            "전환율 추세(%)": t("col_conversion_trend"),
+            "이름": t("col_name"),
+            "등록": t("col_reg_count"),
+            "참석": t("col_attended"),
+        }
+        display_funnel = funnel_df.rename(columns=funnel_col_map)
+
+        def build_fig_funnel():
+            fig_funnel = px.bar(
+                display_funnel,
+                x=t("col_event"),
+                y=[t("col_attended"), t("col_noshow")],
+                barmode="stack",
+                color_discrete_map={t("col_attended"): "#34A853", t("col_noshow"): "#EA4335"},
+                title=t("funnel_bar_title"),
+                labels={"value": t("bar_y"), "variable": ""},
             )
-            fig_ref_pie.update_traces(textposition="outside", textinfo="percent+label")
-            st.plotly_chart(fig_ref_pie, use_container_width=True)
+            fig_funnel.update_layout(legend_title_text="")
+            return fig_funnel
 
-        if len(by_event_df.columns) > 1:
-            st.subheader(t("ref_event_title"))
-            fig_ref_event = px.bar(
-                by_event_df.reset_index(),
-                x="유입 경로",
-                y=by_event_df.columns.tolist(),
-                barmode="group",
-                title=t("ref_event_title"),
-                labels={"value": t("col_source_count"), "variable": t("col_event")},
+        st.plotly_chart(figure("funnel_bar", fig_key, build_fig_funnel), use_container_width=True)
+
+        def build_fig_conv():
+            fig_conv = go.Figure()
+            fig_conv.add_trace(go.Scatter(
+                x=display_funnel[t("col_event")],
+                y=funnel_df["전환율(%)"],
+                mode="lines+markers",
+                line=dict(color="#FCACF3", width=2),
+                name=t("col_conversion"),
+            ))
+            fig_conv.add_trace(go.Scatter(
+                x=display_funnel[t("col_event")],
+                y=funnel_df["전환율 추세(%)"],
+                mode="lines",
+                line=dict(color="#6E003D", width=2, dash="dash"),
+                name=t("funnel_trend", n=FUNNEL_TREND_WINDOW),
+            ))
+            fig_conv.update_layout(
+                title=t("funnel_rate_title"),
+                yaxis=dict(range=[0, 100], ticksuffix="%"),
             )
-            st.plotly_chart(fig_ref_event, use_container_width=True)
+            return fig_conv
+
+        st.plotly_chart(figure("funnel_conversion", fig_key, build_fig_conv), use_container_width=True)
+
+        st.dataframe(display_funnel, use_container_width=True, hide_index=True)
+
+        st.subheader(t("funnel_repeat_title", n=REPEAT_NOSHOW_MIN))
+        repeat_df = repeat_noshows(noshow_df, REPEAT_NOSHOW_MIN)
+        if repeat_df.empty:
+            st.info(t("funnel_repeat_empty"))
+        else:
+            st.dataframe(repeat_df.rename(columns=funnel_col_map), use_container_width=True, hide_index=True)
+
+
+# ── Tab 10: 체크인 (도착 시각·재체크인·입구 혼잡도) ──────────────────────────
+with tab10:
+    start_time = str(tenant.get("event_start", DEFAULT_START))
+    ci_report = cached_checkins(data_version, tuple(selected_events), filtered_checkin, catalog.dates(), start_time)
+    offsets_df = ci_report["offsets"]
+
+    if filtered_checkin.empty:
+        st.info(t("ci_no_data"))
+    else:
+        st.caption(t("ci_caption", start=start_time, grace=LATE_GRACE_MIN))
+        if len(offsets_df) < len(filtered_checkin):
+            st.caption(t("ci_no_start"))
+
+        c1, c2, c3, c4 = st.columns(4)
+        if not offsets_df.empty:
+            c1.metric(t("ci_late_rate"), f"{(offsets_df['offset_min'] > LATE_GRACE_MIN).mean() * 100:.1f}%")
+            c2.metric(t("ci_median_arrival"), f"{offsets_df['offset_min'].median():+.0f}{t('unit_min')}")
+        c3.metric(t("ci_recheckin_rate"), f"{(filtered_checkin['checkin_count'] > 1).mean() * 100:.1f}%")
+        c4.metric(t("ci_peak"), f"{int(ci_report['peaks']['분당 최대'].max())}{t('unit_person')}")
+
+        arrival_df = ci_report["distribution"]
+        if not arrival_df.empty:
+            def build_fig_arrival():
+                fig_arrival = px.bar(
+                    arrival_df.rename(columns={"도착(분)": t("ci_dist_x"), "인원": t("col_count")}),
+                    x=t("ci_dist_x"),
+                    y=t("col_count"),
+                    title=t("ci_dist_title", bin=ARRIVAL_BIN_MIN),
+                    color_discrete_sequence=["#FCACF3"],
+                )
+                fig_arrival.add_vline(x=0, line_dash="dash", line_color="#6E003D")
+                return fig_arrival
+
+            st.plotly_chart(figure("checkin_arrival", fig_key + (start_time,), build_fig_arrival), use_container_width=True)
+
+        ci_table = (
+            ci_report["recheckins"]
+            .merge(ci_report["late"].drop(columns="체크인"), on="이벤트", how="left")
+            .merge(ci_report["peaks"], on="이벤트", how="left")
+        )
+        st.dataframe(
+            ci_table.rename(columns={
+                "이벤트": t("col_event"),
+                "체크인": t("col_checked_in"),
+                "재체크인": t("col_recheckin"),
+                "재체크인율(%)": t("col_recheckin_rate"),
+                "최대 횟수": t("col_max_count"),
+                "지각": t("col_late"),
+                "지각률(%)": t("col_late_rate"),
+                "도착 중앙값(분)": t("col_median_arrival"),
+                "분당 최대": t("col_peak"),
+                "피크 시각": t("col_peak_time"),
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        load_df = ci_report["load"]
+        load_event = st.selectbox(t("ci_load_event"), list(ci_table["이벤트"]), index=len(ci_table) - 1)
+        event_load = load_df[load_df["event"] == load_event]
+        def build_fig_load():
+            fig_load = px.bar(
+                event_load,
+                x="minute",
+                y="체크인",
+                title=t("ci_load_title", event=load_event),
+                labels={"minute": t("ci_load_x"), "체크인": t("col_checked_in")},
+                color_discrete_sequence=["#6E003D"],
+            )
+            return fig_load
+
+        st.plotly_chart(figure("checkin_load", fig_key + (start_time, load_event), build_fig_load), use_container_width=True)
+
+# 프로세스 시작부터 첫 화면 완성까지 (첫 방문자가 기다린 시간 확인용)
+startup.TIMINGS.setdefault("first render since process start", time.time() - startup.PROCESS_START)
@@ -0,0 +1,61 @@
+"""
+시트 값 → DataFrame 파싱 벤치마크: 원래 경로 vs 빠른 경로 (단일 프로세스 / 여러 프로세스).
+
+    python bench_parse.py
+    python bench_parse.py --tabs 80 --members 1500 --extra-columns 40
+"""
+import argparse
+import os
+import time
+
+import data_loader
+from check_equivalence import original_values_to_frame
+from fake_sheets import make_sheet_values
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="시트 파싱 벤치마크")
+    parser.add_argument("--tabs", type=int, default=40)
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--extra-columns", type=int, default=30, help="설문 추가 질문 열 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sheets = make_sheet_values(n_events=args.tabs, n_members=args.members, extra_columns=args.extra_columns)
+    cells = sum(len(v) * len(v[0]) for v in sheets.values())
+    print(f"{len(sheets)} tabs, {cells:,} cells")
+
+    cases = {
+        "original (pad rows + replace)": lambda: {t: original_values_to_frame(v) for t, v in sheets.items()},
+        "columnar, all columns": lambda: {t: data_loader.values_to_frame(v, all_columns=True) for t, v in sheets.items()},
+        "columnar, needed columns": lambda: {t: data_loader.values_to_frame(v) for t, v in sheets.items()},
+    }
+    results = {name: _best(fn, args.repeat) for name, fn in cases.items()}
+
+    workers = min(data_loader.MAX_PARSE_WORKERS, os.cpu_count() or 1)
+    if workers > 1:
+        # 프로세스 풀은 처음 띄우는 비용을 빼고 측정 (서버에서는 한 번 띄워 재사용)
+        data_loader.PARALLEL_PARSE_CELLS = 0
+        data_loader.parse_tabs(sheets)
+        results[f"columnar, needed columns, {workers} processes"] = _best(
+            lambda: data_loader.parse_tabs(sheets), args.repeat
+        )
+    else:
+        print("  (CPU 1개 — 여러 프로세스 측정 생략)")
+
+    base = results["original (pad rows + replace)"]
+    for name, seconds in results.items():
+        print(f"  {name:<42} {seconds * 1000:8.1f} ms   x{base / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+바이트 예산 기반 공유 캐시.
+원본 시트(raw), 탭 단위 파생 행(derived), 분석 결과(analyzer), 차트(figure)를 하나의 메모리 예산 안에서
+관리합니다. 예산을 넘으면 이름 공간과 무관하게 가장 오래 쓰이지 않은 항목부터 버립니다.
+항목 크기는 DataFrame의 deep memory_usage 등으로 실제 메모리에 가깝게 잽니다.
+
+공개된 스냅샷이 참조하는 항목(원본 시트, 그 탭들의 파생 행, 스냅샷 테이블)은 pin으로 고정합니다.
+고정 항목도 사용량에 포함되지만 밀려나지 않으므로, 버려도 메모리가 줄지 않는 항목을 버리거나
+종료된 시즌을 다시 불러오는 일이 없습니다. 예산이 모자라면 고정되지 않은 항목만 비웁니다.
+"""
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 256
+
+RAW, DERIVED, ANALYZER, FIGURE = "raw", "derived", "analyzer", "figure"
+SNAPSHOT = "snapshot"  # 공개된 스냅샷의 테이블 (사용량 계산용, 항상 고정)
+
+
+def deep_sizeof(obj, _seen: set | None = None) -> int:
+    """객체가 차지하는 대략적인 메모리(바이트). 같은 객체는 한 번만 셉니다."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "to_plotly_json"):  # plotly 그림은 데이터·레이아웃 dict 기준
+        return deep_sizeof(obj.to_plotly_json(), seen)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_sizeof(v, seen) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class BudgetCache:
+    """이름 공간별 키 → 값. 전체 크기가 budget 바이트를 넘지 않도록 LRU로 비웁니다."""
+
+    def __init__(self, budget: int = DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget = budget
+        self._entries: OrderedDict[tuple, tuple[object, int]] = OrderedDict()  # (이름 공간, 키) -> (값, 크기)
+        self._bytes = 0
+        self._stats: dict[str, dict[str, int]] = {}
+        self._pins: dict[object, frozenset] = {}  # 소유자 -> 고정한 (이름 공간, 키)
+        self._pinned: frozenset = frozenset()
+        self._guard = threading.Lock()
+
+    def _stat(self, namespace: str) -> dict[str, int]:
+        return self._stats.setdefault(namespace, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0})
+
+    def get(self, namespace: str, key, default=None):
+        with self._guard:
+            entry = self._entries.get((namespace, key))
+            stat = self._stat(namespace)
+            if entry is None:
+                stat["misses"] += 1
+                return default
+            stat["hits"] += 1
+            self._entries.move_to_end((namespace, key))
+            return entry[0]
+
+    def put(self, namespace: str, key, value) -> None:
+        """값을 저장합니다. 혼자서 예산을 넘는 값은 (고정 항목이 아니면) 저장하지 않습니다."""
+        size = deep_sizeof(value)
+        with self._guard:
+            self._remove((namespace, key))
+            if size > self.budget and (namespace, key) not in self._pinned:
+                return
+            self._entries[(namespace, key)] = (value, size)
+            self._bytes += size
+            stat = self._stat(namespace)
+            stat["entries"] += 1
+            stat["bytes"] += size
+            self._evict()
+
+    def get_or_build(self, namespace: str, key, build):
+        missing = object()
+        value = self.get(namespace, key, missing)
+        if value is missing:
+            value = build()
+            self.put(namespace, key, value)
+        return value
+
+    def pop(self, namespace: str, key) -> None:
+        with self._guard:
+            self._remove((namespace, key))
+
+    def pin(self, owner, keys) -> None:
+        """owner가 쓰는 (이름 공간, 키)들을 고정합니다. 같은 owner의 이전 고정은 대체됩니다.
+        아직 없는 키도 고정해 둘 수 있고, 저장되는 순간부터 밀려나지 않습니다."""
+        with self._guard:
+            self._pins[owner] = frozenset(keys)
+            self._pinned = frozenset().union(*self._pins.values())
+            self._evict()
+
+    def set_budget(self, budget: int) -> None:
+        with self._guard:
+            self.budget = budget
+            self._evict()
+
+    def _remove(self, full_key: tuple) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+            stat = self._stat(full_key[0])
+            stat["entries"] -= 1
+            stat["bytes"] -= entry[1]
+
+    def _evict(self) -> None:
+        if self._bytes <= self.budget:
+            return
+        for full_key in [k for k in self._entries if k not in self._pinned]:
+            self._remove(full_key)
+            self._stat(full_key[0])["evictions"] += 1
+            if self._bytes <= self.budget:
+                return
+
+    def stats(self) -> pd.DataFrame:
+        """이름 공간별 사용량: entries, MB, 고정 MB, hits, misses, evictions"""
+        with self._guard:
+            rows = {ns: {**s, "pinned": 0} for ns, s in self._stats.items()}
+            for full_key in self._pinned:
+                entry = self._entries.get(full_key)
+                if entry is not None:
+                    rows[full_key[0]]["pinned"] += entry[1]
+        df = pd.DataFrame.from_dict(
+            rows, orient="index", columns=["entries", "bytes", "pinned", "hits", "misses", "evictions"]
+        )
+        df.insert(1, "MB", (df.pop("bytes") / 1024 / 1024).round(2))
+        df.insert(2, "고정 MB", (df.pop("pinned") / 1024 / 1024).round(2))
+        return df
+
+    @property
+    def used(self) -> int:
+        return self._bytes
+
+
+# 프로세스 전체에서 공유하는 캐시
+CACHE = BudgetCache()
+
+
+def configure(secrets) -> None:
+    """secrets의 cache_budget_mb로 예산을 정합니다 (없으면 DEFAULT_BUDGET_MB)."""
+    mb = secrets.get("cache_budget_mb")
+    if mb:
+        CACHE.set_budget(int(mb) * 1024 * 1024)
+
+
+def cached(namespace: str = ANALYZER):
+    """
+    함수 결과를 CACHE에 저장하는 데코레이터 (st.cache_data와 같은 규칙:
+    밑줄로 시작하는 인자는 키에서 빼므로 버전 같은 가벼운 인자로 키를 구성합니다).
+    반환값은 사본이 아니라 같은 객체이므로 호출하는 쪽에서 고쳐 쓰면 안 됩니다.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (fn.__qualname__, tuple((k, v) for k, v in bound.arguments.items() if not k.startswith("_")))
+            return CACHE.get_or_build(namespace, key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
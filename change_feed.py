@@ -0,0 +1,94 @@
+"""
+새로고침 사이에 무엇이 바뀌었는지 기록하는 변경 피드.
+연속된 두 스냅샷을 탭 지문으로 비교해 내용이 바뀐 탭만 골라내고,
+그 탭 안에서만 행 키(이메일 해시 + 이벤트)로 비교합니다.
+계산량은 전체 데이터가 아니라 바뀐 탭의 행 수에 비례합니다.
+"""
+import threading
+from collections import deque
+
+import pandas as pd
+
+from data_loader import tab_rows
+
+CHANGE_LOG_SIZE = 5000  # 보관할 최대 변경 건수 (오래된 것부터 버림)
+
+# 변경 종류
+REGISTERED, CHECKED_IN, PAID = "registered", "checked_in", "paid"
+
+COLUMNS = ["at", "event", "user_hash", "name", "kind"]
+
+
+def _member_state(event_name: str, df: pd.DataFrame, fingerprints: dict[str, str]) -> tuple[pd.DataFrame, dict[str, str]]:
+    """탭 하나의 멤버별 상태. index=user_hash, columns=checked_in, paid"""
+    attendance, payment, names = tab_rows(event_name, df, fingerprints)
+    if attendance is None:
+        return pd.DataFrame(columns=["checked_in", "paid"], dtype=bool), names
+    # 체크인 기록이 없는 탭은 등록 = 참석이므로 체크인으로 보지 않음
+    checked = attendance["attended"] & attendance["tracked"]
+    state = checked.groupby(attendance["user_hash"]).max().to_frame("checked_in")
+    if payment is not None:
+        paid = payment.groupby("user_hash")["paid"].max()
+        state["paid"] = paid.reindex(state.index, fill_value=False)
+    else:
+        state["paid"] = False
+    return state, names
+
+
+def diff_tab(old: pd.DataFrame | None, new: pd.DataFrame) -> list[tuple[str, str]]:
+    """두 멤버 상태를 비교해 [(user_hash, 종류)]를 반환합니다. 이전 상태가 없으면 전부 신규 등록."""
+    if old is None:
+        prev = pd.DataFrame(False, index=new.index, columns=["checked_in", "paid"])
+        is_new = pd.Series(True, index=new.index)
+    else:
+        is_new = ~new.index.isin(old.index)
+        prev = old.reindex(new.index, fill_value=False)
+    changes = [(h, REGISTERED) for h in new.index[is_new]]
+    changes += [(h, CHECKED_IN) for h in new.index[new["checked_in"] & ~prev["checked_in"]]]
+    changes += [(h, PAID) for h in new.index[new["paid"] & ~prev["paid"]]]
+    return changes
+
+
+def diff_snapshots(old, new) -> list[tuple]:
+    """
+    두 스냅샷(data_service.Snapshot) 사이의 변경 목록.
+    반환: [(시각, 이벤트, user_hash, 이름, 종류)] — 시각은 새 스냅샷의 loaded_at
+    """
+    changes = []
+    for event, fp in new.fingerprints.items():
+        old_fp = old.fingerprints.get(event)
+        if old_fp == fp:
+            continue
+        new_state, names = _member_state(event, new.events[event], new.fingerprints)
+        old_state = None
+        if old_fp is not None:
+            old_state, _ = _member_state(event, old.events[event], old.fingerprints)
+        for user_hash, kind in diff_tab(old_state, new_state):
+            changes.append((new.loaded_at, event, user_hash, names.get(user_hash, user_hash), kind))
+    return changes
+
+
+class ChangeLog:
+    """최근 변경을 최대 maxlen건까지 보관하는 스레드 안전 기록."""
+
+    def __init__(self, maxlen: int = CHANGE_LOG_SIZE):
+        self._entries: deque[tuple] = deque(maxlen=maxlen)
+        self._guard = threading.Lock()
+
+    def record(self, old, new) -> int:
+        """old → new 스냅샷 사이의 변경을 추가하고 추가된 건수를 반환합니다.
+        첫 스냅샷(old=None)은 기준점일 뿐이라 기록하지 않습니다."""
+        if old is None:
+            return 0
+        changes = diff_snapshots(old, new)
+        with self._guard:
+            self._entries.extend(changes)
+        return len(changes)
+
+    def since(self, at: float | None = None) -> pd.DataFrame:
+        """at 이후의 변경 (최신순). at=None이면 보관 중인 전체."""
+        with self._guard:
+            entries = list(self._entries)
+        if at is not None:
+            entries = [e for e in entries if e[0] > at]
+        return pd.DataFrame(entries[::-1], columns=COLUMNS)
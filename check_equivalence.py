@@ -0,0 +1,257 @@
+"""
+최적화된 구현이 기준 구현(reference.py)과 같은 결과를 내는지, 그리고
+정해진 크기의 합성 데이터에서 시간·메모리 예산을 지키는지 검사합니다.
+
+    python check_equivalence.py              # 동등성 + 예산
+    python check_equivalence.py --seeds 50   # 무작위 입력 개수 지정
+    python check_equivalence.py --no-budget  # 동등성만
+
+하나라도 실패하면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import analyzer
+import data_loader
+import reference
+from aggregates import AggregateStore
+from fake_sheets import make_events, make_sheet_values, edge_case_events
+
+# 예산 측정용 합성 데이터 크기
+BUDGET_SIZE = dict(n_events=120, n_members=3000, seed=42, attend_rate=0.2)
+
+# 함수별 (최대 시간(초), 최대 메모리(MB)) — BUDGET_SIZE 기준
+BUDGETS: dict[str, tuple[float, float]] = {
+    "build_attendance_matrix": (2.5, 120),
+    "build_payment_data": (2.5, 120),
+    "event_summary": (0.1, 20),
+    "cohort_retention": (0.3, 60),
+    "frequency_distribution": (0.05, 10),
+}
+REPEAT = 3  # 시간은 REPEAT번 중 최솟값
+
+
+def _compare(label: str, got: pd.DataFrame, want: pd.DataFrame) -> str | None:
+    try:
+        pd.testing.assert_frame_equal(got, want)
+    except AssertionError as e:
+        return f"{label}: {str(e).splitlines()[0]}"
+    return None
+
+
+def check_case(label: str, events: dict[str, pd.DataFrame], rng: random.Random) -> list[str]:
+    """한 입력에 대해 다섯 함수를 기준 구현과 비교합니다."""
+    failures = []
+
+    ref_matrix, ref_detail = reference.build_attendance_matrix(events)
+    matrix, detail = data_loader.build_attendance_matrix(events)
+    failures.append(_compare(f"{label} / build_attendance_matrix (matrix)", matrix, ref_matrix))
+    # tracked(노쇼 분석)·member_id(결제 대조) 열은 나중에 추가된 열이라 비교에서 제외
+    failures.append(_compare(
+        f"{label} / build_attendance_matrix (detail)",
+        detail.drop(columns=["tracked", "member_id"], errors="ignore"),
+        ref_detail,
+    ))
+
+    failures.append(_compare(
+        f"{label} / build_payment_data",
+        data_loader.build_payment_data(events),
+        reference.build_payment_data(events),
+    ))
+
+    if not ref_matrix.empty:
+        # 전체 이벤트 + 사이드바에서 일부만 고른 경우
+        selections = [list(ref_matrix.columns)]
+        if ref_matrix.shape[1] > 2:
+            k = rng.randint(1, ref_matrix.shape[1] - 1)
+            selections.append(sorted(rng.sample(list(ref_matrix.columns), k), key=list(ref_matrix.columns).index))
+        for cols in selections:
+            sub = ref_matrix[cols]
+            sub_detail = ref_detail[ref_detail["event"].isin(cols)]
+            tag = f"{label} [{len(cols)} events]"
+            failures.append(_compare(
+                f"{tag} / event_summary",
+                analyzer.event_summary(sub, sub_detail),
+                reference.event_summary(sub, sub_detail),
+            ))
+            failures.append(_compare(
+                f"{tag} / cohort_retention",
+                analyzer.cohort_retention(sub),
+                reference.cohort_retention(sub),
+            ))
+            failures.append(_compare(
+                f"{tag} / frequency_distribution",
+                analyzer.frequency_distribution(sub),
+                reference.frequency_distribution(sub),
+            ))
+
+    return [f for f in failures if f]
+
+
+def original_values_to_frame(values: list[list[str]] | None) -> pd.DataFrame | None:
+    """파싱 기준 구현: 열 단위 파싱 이전의 data_loader.values_to_frame (행 패딩 + replace)."""
+    if not values or len(values) < 2:
+        return None
+    headers, *rows = values
+    # 행 길이를 헤더에 맞춤 (짧으면 패딩, 길면 자름)
+    n = len(headers)
+    rows = [(r + [""] * (n - len(r)))[:n] for r in rows]
+    df = pd.DataFrame(rows, columns=headers)
+    # 빈 문자열 → NaN
+    df.replace("", pd.NA, inplace=True)
+    return df
+
+
+def check_parsing(label: str, sheets: dict[str, list[list[str]]]) -> list[str]:
+    """빠른 파싱 경로가 원래 경로와 같은 DataFrame을 만드는지 (전체 열 / 필요한 열만)."""
+    failures = []
+    for title, values in sheets.items():
+        want = original_values_to_frame(values)
+        got_all = data_loader.values_to_frame(values, all_columns=True)
+        got = data_loader.values_to_frame(values)
+        if want is None:
+            if got is not None or got_all is not None:
+                failures.append(f"{label}/{title} / values_to_frame: expected None")
+            continue
+        failures.append(_compare(f"{label}/{title} / values_to_frame (all)", got_all, want))
+        failures.append(_compare(f"{label}/{title} / values_to_frame", got, want[list(got.columns)]))
+    return [f for f in failures if f]
+
+
+def check_aggregates(label: str, events: dict[str, pd.DataFrame], rng: random.Random) -> list[str]:
+    """
+    누적 집계가 매번 처음부터 계산한 결과와 같은지:
+    탭을 하나씩 추가 → 중간 탭 하나를 고침 → 원래대로 되돌림 순서로 같은 저장소를 갱신합니다.
+    """
+    failures = []
+    names = sorted(events)
+    steps = [{n: events[n] for n in names[:k]} for k in range(1, len(names) + 1)]
+    if len(names) > 2:
+        changed = dict(events)
+        victim = rng.choice(names[:-1])
+        changed[victim] = events[victim].iloc[: len(events[victim]) // 2]
+        steps += [changed, dict(events)]
+
+    store = AggregateStore()
+    for i, step in enumerate(steps):
+        matrix, detail = data_loader.build_attendance_matrix(step, identities={})
+        got = store.update(matrix, detail)
+        tag = f"{label} [step {i}]"
+        if matrix.empty:
+            continue
+        failures.append(_compare(f"{tag} / aggregates.summary", got.summary, analyzer.event_summary(matrix, detail)))
+        row_sums = matrix.sum(axis=1)
+        want = (matrix.index.nunique(), int((row_sums > 1).sum()), float(row_sums.mean()))
+        have = (got.total_unique, got.multi_attendees, got.avg_events_per_person)
+        if got.exact and (want[:2] != have[:2] or abs(want[2] - have[2]) > 1e-9):
+            failures.append(f"{tag} / aggregates KPI: {have} != {want}")
+    return [f for f in failures if f]
+
+
+def check_namesakes(label: str, events: dict[str, pd.DataFrame]) -> list[str]:
+    """이름이 같은 다른 멤버가 노쇼 분석에서 한 사람으로 합쳐지지 않는지:
+    이벤트별 등록자 수·멤버 수가 고유 이메일 수와 같아야 합니다."""
+    failures = []
+    _, detail = data_loader.build_attendance_matrix(events, identities={})
+    emails = {name: set(df["이메일 주소"].dropna().str.strip().str.lower()) for name, df in events.items()}
+    registered = analyzer.funnel_by_event(detail).set_index("이벤트")["등록자"].to_dict()
+    want = {name: len(emails[name]) for name in registered}
+    if registered != want:
+        failures.append(f"{label} / funnel_by_event 등록자: {registered} != {want}")
+    members = analyzer.member_noshows(detail)
+    n_members = len(set().union(*emails.values()))
+    if len(members) != n_members:
+        failures.append(f"{label} / member_noshows: {len(members)} rows != {n_members} members")
+    return [f for f in failures if f]
+
+
+def check_equivalence(n_seeds: int) -> list[str]:
+    rng = random.Random(0)
+    failures = check_parsing("sheets", {
+        **make_sheet_values(n_events=3, n_members=60, seed=1, extra_columns=5),
+        "header_only": [["이메일 주소", "이름"]],
+        "long_rows": [["이메일 주소", "CheckedInAt"], ["a@x.com", "", "넘치는 값"], ["b@x.com"], []],
+    })
+    edge_cases = edge_case_events()
+    for name, events in edge_cases.items():
+        failures += check_case(f"edge:{name}", events, rng)
+    failures += check_namesakes("edge:name_collisions", edge_cases["name_collisions"])
+    for seed in range(n_seeds):
+        events = make_events(
+            n_events=rng.randint(1, 25),
+            n_members=rng.randint(5, 300),
+            seed=seed,
+            attend_rate=rng.uniform(0.05, 0.6),
+            noshow_rate=rng.uniform(0, 0.5),
+        )
+        failures += check_case(f"random:{seed}", events, rng)
+        failures += check_aggregates(f"random:{seed}", events, rng)
+    return failures
+
+
+def _measure(fn, *args) -> tuple[float, float]:
+    """(최소 소요 시간(초), 최대 메모리(MB))"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 1024 / 1024
+
+
+def check_budgets() -> tuple[list[str], list[str]]:
+    """반환: (실패 목록, 보고 줄)"""
+    events = make_events(**BUDGET_SIZE)
+    matrix, detail = data_loader.build_attendance_matrix(events)
+    targets = {
+        "build_attendance_matrix": (data_loader.build_attendance_matrix, events),
+        "build_payment_data": (data_loader.build_payment_data, events),
+        "event_summary": (analyzer.event_summary, matrix, detail),
+        "cohort_retention": (analyzer.cohort_retention, matrix),
+        "frequency_distribution": (analyzer.frequency_distribution, matrix),
+    }
+    failures, report = [], [
+        f"budget size: {BUDGET_SIZE['n_events']} events × {BUDGET_SIZE['n_members']} members "
+        f"({matrix.shape[0]} attendees)"
+    ]
+    for name, (fn, *args) in targets.items():
+        seconds, mb = _measure(fn, *args)
+        max_s, max_mb = BUDGETS[name]
+        ok = seconds <= max_s and mb <= max_mb
+        report.append(f"  {'ok  ' if ok else 'FAIL'} {name:<26} {seconds * 1000:8.1f} ms / {max_s * 1000:.0f} ms"
+                      f"   {mb:7.1f} MB / {max_mb:.0f} MB")
+        if not ok:
+            failures.append(f"budget / {name}: {seconds:.3f}s, {mb:.1f}MB (limit {max_s}s, {max_mb}MB)")
+    return failures, report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=30, help="무작위 입력 개수")
+    parser.add_argument("--no-budget", action="store_true", help="시간·메모리 예산 검사 생략")
+    args = parser.parse_args()
+
+    failures = check_equivalence(args.seeds)
+    print(f"equivalence: {len(edge_case_events())} edge cases + {args.seeds} random inputs, "
+          f"{len(failures)} failure(s)")
+    if not args.no_budget:
+        budget_failures, report = check_budgets()
+        print("\n".join(report))
+        failures += budget_failures
+
+    for f in failures:
+        print(f"  ✗ {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+체크인 분석: 도착 시각 분포, 지각률, 재체크인, 분당 입구 혼잡도.
+입력은 data_loader.build_checkin_data 결과(스냅샷의 checkin_df)와 이벤트 날짜입니다.
+이벤트 시작 시각 = 이벤트 날짜 + 시작 시간(secrets의 event_start, 기본 19:00).
+"""
+import pandas as pd
+
+DEFAULT_START = "19:00"
+LATE_GRACE_MIN = 10          # 시작 후 이 시간(분)까지는 지각으로 보지 않음
+OFFSET_LIMIT_MIN = 12 * 60   # 시작 기준 ±12시간을 벗어난 체크인은 잘못된 값으로 보고 제외
+ARRIVAL_BIN_MIN = 5          # 도착 시각 분포의 구간 폭(분)
+
+
+def event_starts(dates: dict[str, pd.Timestamp | None], start_time: str = DEFAULT_START) -> pd.Series:
+    """이벤트별 시작 시각. 날짜를 모르는 이벤트는 NaT."""
+    offset = pd.Timedelta(f"{start_time}:00") if start_time.count(":") == 1 else pd.Timedelta(start_time)
+    return pd.Series({e: (d + offset if d is not None else pd.NaT) for e, d in dates.items()}, dtype="datetime64[ns]")
+
+
+def arrival_offsets(checkin_df: pd.DataFrame, starts: pd.Series) -> pd.DataFrame:
+    """체크인 행마다 시작 대비 도착 시각(분, 음수 = 일찍 옴)을 붙입니다. 시작 시각을 모르는 이벤트는 제외."""
+    if checkin_df.empty:
+        return checkin_df.assign(offset_min=pd.Series(dtype=float))
+    start = checkin_df["event"].map(starts)
+    offset = (checkin_df["checked_in_at"] - start).dt.total_seconds() / 60
+    out = checkin_df.assign(offset_min=offset)
+    return out[offset.abs() <= OFFSET_LIMIT_MIN]
+
+
+def arrival_distribution(offsets: pd.DataFrame, bin_min: int = ARRIVAL_BIN_MIN) -> pd.DataFrame:
+    """도착 시각 분포 — bin_min분 단위 구간별 인원."""
+    if offsets.empty:
+        return pd.DataFrame(columns=["도착(분)", "인원"])
+    bins = (offsets["offset_min"] // bin_min * bin_min).astype(int)
+    dist = bins.value_counts().sort_index()
+    return pd.DataFrame({"도착(분)": dist.index, "인원": dist.values})
+
+
+def late_arrivals(offsets: pd.DataFrame, grace_min: int = LATE_GRACE_MIN) -> pd.DataFrame:
+    """이벤트별 지각 현황 (체크인, 지각, 지각률, 도착 중앙값)."""
+    if offsets.empty:
+        return pd.DataFrame(columns=["이벤트", "체크인", "지각", "지각률(%)", "도착 중앙값(분)"])
+    grp = offsets.groupby("event", sort=False)["offset_min"]
+    total = grp.size()
+    late = (offsets["offset_min"] > grace_min).groupby(offsets["event"], sort=False).sum().astype(int)
+    return pd.DataFrame({
+        "이벤트": total.index,
+        "체크인": total.values,
+        "지각": late.values,
+        "지각률(%)": (late / total * 100).round(1).values,
+        "도착 중앙값(분)": grp.median().round(1).values,
+    })
+
+
+def recheckins(checkin_df: pd.DataFrame) -> pd.DataFrame:
+    """이벤트별 재체크인(CheckinCount 2 이상) 인원과 비율."""
+    if checkin_df.empty:
+        return pd.DataFrame(columns=["이벤트", "체크인", "재체크인", "재체크인율(%)", "최대 횟수"])
+    counts = checkin_df["checkin_count"].fillna(1)
+    grp = counts.groupby(checkin_df["event"], sort=False)
+    total = grp.size()
+    again = (counts > 1).groupby(checkin_df["event"], sort=False).sum()
+    return pd.DataFrame({
+        "이벤트": total.index,
+        "체크인": total.values,
+        "재체크인": again.astype(int).values,
+        "재체크인율(%)": (again / total * 100).round(1).values,
+        "최대 횟수": grp.max().astype(int).values,
+    })
+
+
+def door_load(checkin_df: pd.DataFrame) -> pd.DataFrame:
+    """이벤트·분 단위 체크인 수. 반환: event, minute, 체크인"""
+    if checkin_df.empty:
+        return pd.DataFrame(columns=["event", "minute", "체크인"])
+    minute = checkin_df["checked_in_at"].dt.floor("min")
+    load = checkin_df.groupby([checkin_df["event"], minute], sort=False).size()
+    load.index.names = ["event", "minute"]
+    return load.rename("체크인").reset_index()
+
+
+def peak_door_load(load: pd.DataFrame) -> pd.DataFrame:
+    """이벤트별 분당 최대 체크인 수와 그 시각."""
+    if load.empty:
+        return pd.DataFrame(columns=["이벤트", "분당 최대", "피크 시각"])
+    peak = load.loc[load.groupby("event", sort=False)["체크인"].idxmax()]
+    return pd.DataFrame({
+        "이벤트": peak["event"].values,
+        "분당 최대": peak["체크인"].values,
+        "피크 시각": peak["minute"].dt.strftime("%H:%M").values,
+    })
+
+
+def checkin_report(checkin_df: pd.DataFrame, starts: pd.Series, grace_min: int = LATE_GRACE_MIN) -> dict[str, pd.DataFrame]:
+    """체크인 탭에 필요한 표를 한 번에 계산합니다 (데이터 버전별 캐시용)."""
+    offsets = arrival_offsets(checkin_df, starts)
+    load = door_load(checkin_df)
+    return {
+        "offsets": offsets,
+        "distribution": arrival_distribution(offsets),
+        "late": late_arrivals(offsets, grace_min),
+        "recheckins": recheckins(checkin_df),
+        "load": load,
+        "peaks": peak_door_load(load),
+    }
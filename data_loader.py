@@ -2,11 +2,24 @@
 Google Sheets에서 이벤트 데이터를 불러옵니다.
 각 시트 탭 = 이벤트 1회.
 """
+import difflib
 import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+from types import SimpleNamespace
+import numpy as np
 import pandas as pd
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
+
+from cache_budget import CACHE, RAW, DERIVED
+from fetch_pool import FETCH_POOL
+from sheets_meter import METER, BudgetExceeded
 
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
@@ -15,19 +28,31 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 EMAIL_KEYWORDS   = ["email", "이메일"]
 NAME_KEYWORDS    = ["이름", "name"]
 PAYMENT_KEYWORDS  = ["결제 방법", "결제방법", "payment method", "계좌이체", "참가비"]
+PHONE_KEYWORDS   = ["연락처", "전화", "휴대폰", "핸드폰", "phone", "mobile"]
 REFERRAL_KEYWORDS = ["알게 되셨나요", "어떻게 알게", "how did you find", "find about"]
 CHECKEDIN_COL     = "CheckedInAt"
 COUNT_COL         = "CheckinCount"
 
 
-@st.cache_resource(ttl=300)  # 5분 캐시
+@st.cache_resource(ttl=300, max_entries=1)  # 5분 캐시, 클라이언트는 하나만
 def get_gspread_client():
+    # 부하 테스트·로컬 개발용: sheets_backend = "fake"면 Google 대신 합성 시트(fake_sheets)를 씀
+    if st.secrets.get("sheets_backend") == "fake":
+        from fake_sheets import fake_client
+
+        return METER.wrap(fake_client(st.secrets))
+
+    # gspread·google-auth는 무거워서 실제로 시트에 접근할 때 import
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     info = dict(st.secrets["gcp_service_account"])
     # TOML 형식에 따라 \n이 이스케이프된 경우 실제 줄바꿈으로 변환
     if "private_key" in info:
         info["private_key"] = info["private_key"].replace("\\n", "\n")
     creds = Credentials.from_service_account_info(info, scopes=SCOPES)
-    return gspread.authorize(creds)
+    # 모든 API 요청을 호출 위치별로 세고 요청 예산을 적용
+    return METER.wrap(gspread.authorize(creds))
 
 
 def find_payment_column(df: pd.DataFrame) -> str | None:
@@ -63,6 +88,19 @@ def anonymize_email(email: str) -> str:
     return f"#{h[:8]}"
 
 
+def hash_emails(emails: pd.Series) -> pd.Series:
+    """이메일 Series를 익명 ID로 바꿉니다. 고유값마다 한 번만 해시합니다."""
+    codes, uniques = pd.factorize(emails)
+    hashed = np.array([anonymize_email(e) for e in uniques], dtype=object)
+    return pd.Series(hashed[codes], index=emails.index)
+
+
+def _with_names(ids: pd.Series, name_map: dict[str, str]) -> pd.Series:
+    """익명 ID를 이름으로 바꿉니다 (이름이 없는 ID는 그대로)."""
+    return ids.map(name_map).fillna(ids) if name_map else ids
+
+
+@METER.site("debug_worksheet")
 def debug_worksheet(spreadsheet_id: str, sheet_title: str) -> str:
     """캐시 없이 특정 시트를 직접 조회해 결과 또는 에러 메시지를 반환합니다."""
     client = get_gspread_client()
@@ -77,6 +115,7 @@ def debug_worksheet(spreadsheet_id: str, sheet_title: str) -> str:
     return "❌ 시트를 찾을 수 없음"
 
 
+@METER.site("get_worksheet_names")
 def get_worksheet_names(spreadsheet_id: str) -> list[str]:
     """캐시 없이 스프레드시트의 모든 시트 탭 이름을 반환합니다."""
     client = get_gspread_client()
@@ -84,214 +123,820 @@ def get_worksheet_names(spreadsheet_id: str) -> list[str]:
     return [ws.title for ws in spreadsheet.worksheets()]
 
 
-@st.cache_data(ttl=300)  # 5분 캐시
-def load_all_events(spreadsheet_id: str) -> dict[str, pd.DataFrame]:
+def _fetch_values(spreadsheet, worksheet) -> list[list[str]] | None:
+    """시트 탭 하나의 셀 값을 가져옵니다. 실패하면 None."""
+    try:
+        # get_all_values() 대신 셀 범위로 직접 요청 — 시트 이름 특수문자 우회
+        return spreadsheet.values_get(
+            f"'{worksheet.title.replace(chr(39), chr(39)*2)}'",
+            params={"valueRenderOption": "FORMATTED_VALUE"},
+        ).get("values", [])
+    except BudgetExceeded:
+        raise
+    except Exception:
+        try:
+            # fallback: gid 기반으로 worksheet 객체를 통해 다시 시도
+            with METER.site("get_all_values (fallback)"):
+                return worksheet.get_all_values()
+        except BudgetExceeded:
+            raise
+        except Exception:
+            return None
+
+
+# ── 셀 값 → DataFrame ────────────────────────────────────────────────────────
+PARALLEL_PARSE_CELLS = 2_000_000  # 이보다 작으면 프로세스 간 전송 비용이 더 큼
+MAX_PARSE_WORKERS = 4
+_parse_executor: ProcessPoolExecutor | None = None
+_parse_executor_guard = threading.Lock()
+
+
+def needed_columns(headers: list[str]) -> list[int]:
+    """분석에 쓰이는 열(이메일·이름·연락처·결제·유입 경로·체크인)의 위치.
+    각 키워드 탐색이 고르는 열과 같은 열만 남기므로 잘라낸 뒤에도 탐색 결과가 같습니다."""
+    probe = SimpleNamespace(columns=headers)  # 탐색 함수는 .columns만 봄 — DataFrame을 만들 필요 없음
+    wanted = {
+        find_column(probe, EMAIL_KEYWORDS),
+        find_column(probe, NAME_KEYWORDS),
+        find_column(probe, PHONE_KEYWORDS),
+        find_column(probe, REFERRAL_KEYWORDS),
+        find_payment_column(probe),
+        CHECKEDIN_COL,
+        COUNT_COL,
+    }
+    return [i for i, h in enumerate(headers) if h in wanted]
+
+
+def values_to_frame(values: list[list[str]] | None, all_columns: bool = False) -> pd.DataFrame | None:
+    """
+    셀 값(헤더 + 행)을 DataFrame으로 바꿉니다. 데이터 행이 없으면 None.
+    행을 한 번에 열로 뒤집어(zip) 열 단위로 만들고, 빈 문자열 → NA 변환도 열마다 한 번만 합니다.
+    기본값은 분석에 쓰이는 열만 남깁니다 (all_columns=True면 전체).
+    """
+    if not values or len(values) < 2:
+        return None
+    headers, *rows = values
+    n = len(headers)
+    keep = range(n) if all_columns else needed_columns(headers)
+    # 짧은 행은 ""로 채우고, 헤더보다 긴 부분은 버림
+    columns = list(zip_longest(*rows, fillvalue=""))
+    data = {}
+    for j in keep:
+        col = np.array(columns[j] if j < len(columns) else [""] * len(rows), dtype=object)
+        col[col == ""] = pd.NA
+        data[j] = col
+    df = pd.DataFrame(data, index=pd.RangeIndex(len(rows)))
+    df.columns = pd.Index([headers[j] for j in keep], dtype=object)
+    return df
+
+
+def parse_tabs(raw: dict[str, list[list[str]] | None]) -> dict[str, pd.DataFrame]:
+    """
+    {탭 이름: 셀 값}을 {탭 이름: DataFrame}으로 바꿉니다 (빈 탭 제외, 순서 유지).
+    셀이 PARALLEL_PARSE_CELLS개를 넘고 CPU가 여러 개면 여러 프로세스에서 나눠 파싱합니다.
     """
-    스프레드시트의 모든 시트 탭을 불러와 {탭이름: DataFrame} 형태로 반환합니다.
+    cells = sum(len(v) * len(v[0]) for v in raw.values() if v)
+    if cells < PARALLEL_PARSE_CELLS or len(raw) < 2 or (os.cpu_count() or 1) < 2:
+        parsed = {title: values_to_frame(values) for title, values in raw.items()}
+    else:
+        parsed = dict(zip(raw, _parse_pool().map(values_to_frame, raw.values(), chunksize=4)))
+    return {title: df for title, df in parsed.items() if df is not None}
+
+
+def _parse_pool() -> ProcessPoolExecutor:
+    """파싱용 프로세스 풀 (처음 쓸 때 만들고 계속 재사용).
+    Streamlit 서버는 스레드가 많아 fork 대신 spawn으로 띄웁니다."""
+    global _parse_executor
+    with _parse_executor_guard:
+        if _parse_executor is None:
+            workers = min(MAX_PARSE_WORKERS, os.cpu_count() or 1)
+            _parse_executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _parse_executor
+
+
+@METER.site("fetch_spreadsheet")
+def fetch_spreadsheet(spreadsheet_id: str) -> tuple[str, dict[str, pd.DataFrame]]:
+    """
+    캐시 없이 스프레드시트의 모든 시트 탭을 불러옵니다.
+    반환: (스프레드시트 제목, {탭이름: DataFrame})
     """
     client = get_gspread_client()
     spreadsheet = client.open_by_key(spreadsheet_id)
 
-    events: dict[str, pd.DataFrame] = {}
-    for worksheet in spreadsheet.worksheets():
-        try:
-            # get_all_values() 대신 셀 범위로 직접 요청 — 시트 이름 특수문자 우회
-            values = spreadsheet.values_get(
-                f"'{worksheet.title.replace(chr(39), chr(39)*2)}'",
-                params={"valueRenderOption": "FORMATTED_VALUE"},
-            ).get("values", [])
-        except Exception:
+    # 전부 받아 온 뒤 한꺼번에 파싱 — 큰 스프레드시트는 여러 프로세스에서 나눠 처리
+    raw = {worksheet.title: _fetch_values(spreadsheet, worksheet) for worksheet in spreadsheet.worksheets()}
+    return spreadsheet.title, parse_tabs(raw)
+
+
+@METER.site("fetch_worksheet")
+def fetch_worksheet(spreadsheet_id: str, sheet_title: str) -> pd.DataFrame | None:
+    """캐시 없이 시트 탭 하나만 불러옵니다. 탭이 없거나 비어 있으면 None."""
+    from gspread import WorksheetNotFound
+
+    client = get_gspread_client()
+    spreadsheet = client.open_by_key(spreadsheet_id)
+    try:
+        worksheet = spreadsheet.worksheet(sheet_title)
+    except WorksheetNotFound:
+        return None
+    return values_to_frame(_fetch_values(spreadsheet, worksheet))
+
+
+# ── 여러 스프레드시트(시즌) 통합 ─────────────────────────────────────────────
+SOURCE_TTL = 300        # 활성 시트 캐시 유효 시간(초)
+
+# 원본 캐시(CACHE의 raw 이름 공간):
+# spreadsheet_id -> (불러온 시각, 제목, {탭이름: DataFrame}, {탭이름: 지문})
+# 데이터 서비스가 쓰는 시트는 고정(CACHE.pin)되어 메모리 예산 때문에 밀려나지 않습니다.
+_source_locks: dict[str, threading.Lock] = {}
+_source_locks_guard = threading.Lock()
+
+Source = tuple[str, dict[str, pd.DataFrame], dict[str, str]]
+
+# Sheets API 요청 수: 스프레드시트 열기(메타데이터) + 탭 목록 + 탭마다 값 1회
+SPREADSHEET_REQUESTS = 2
+TAB_REQUESTS = 3  # 열기 + 탭 찾기 + 값
+
+
+def get_sources(secrets) -> list[dict]:
+    """
+    secrets에서 불러올 스프레드시트 목록을 만듭니다.
+    `spreadsheet_ids` 목록이 있으면 마지막 항목만 활성(실시간 갱신) 시트로,
+    나머지는 종료된 시즌(최초 1회만 로드)으로 취급합니다.
+    없으면 기존 `spreadsheet_id` 하나를 활성 시트로 사용합니다.
+    반환: [{"id": str, "frozen": bool}, ...] (오래된 시즌 → 현재 시즌 순)
+    """
+    ids = [str(i).strip() for i in secrets.get("spreadsheet_ids", []) if str(i).strip()]
+    if not ids:
+        single = str(secrets.get("spreadsheet_id", "")).strip()
+        ids = [single] if single else []
+    return [{"id": sid, "frozen": i < len(ids) - 1} for i, sid in enumerate(ids)]
+
+
+def tab_fingerprint(df: pd.DataFrame) -> str:
+    """탭 내용(헤더 + 값)의 해시. 내용이 같으면 항상 같은 값입니다."""
+    h = hashlib.sha256("\x1f".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def data_version(fingerprints: dict[str, str], extra: str = "") -> str:
+    """이벤트 이름·순서·탭 지문으로 데이터 버전을 만듭니다. 파생 계산 캐시의 키로 씁니다.
+    extra: 결과에 영향을 주는 설정(예: 동일인 별칭)의 요약 — 바뀌면 버전도 바뀜"""
+    h = hashlib.sha256(extra.encode())
+    for name, fp in fingerprints.items():
+        h.update(f"{name}\x1f{fp}\x1e".encode())
+    return h.hexdigest()[:16]
+
+
+def _source_lock(spreadsheet_id: str) -> threading.Lock:
+    with _source_locks_guard:
+        return _source_locks.setdefault(spreadsheet_id, threading.Lock())
+
+
+# 스프레드시트별 마지막으로 불러온 탭 수 — 캐시가 없을 때 요청 수 추정용
+_tab_counts: dict[str, int] = {}
+
+
+def _within_budget(requests: int, site: str) -> bool:
+    """요청 예산에 requests회 여유가 있는지. 없으면 site에서 캐시로 대신했다고 기록합니다."""
+    if METER.can_afford(requests):
+        return True
+    METER.degraded(site)
+    return False
+
+
+def _store_source(spreadsheet_id: str, title: str, events: dict[str, pd.DataFrame]) -> Source:
+    fingerprints = {name: tab_fingerprint(df) for name, df in events.items()}
+    _tab_counts[spreadsheet_id] = len(events)
+    CACHE.put(RAW, spreadsheet_id, (time.time(), title, events, fingerprints))
+    return title, events, fingerprints
+
+
+def _load_source(source: dict, force: bool = False, max_age: float | None = SOURCE_TTL) -> Source:
+    """시트 하나를 캐시에서 꺼내거나, 만료됐으면(또는 force) 다시 불러옵니다.
+    max_age=None이면 캐시가 있는 한 그대로 씁니다. 같은 시트를 동시에 요청하면 한 번만 불러옵니다."""
+    sid = source["id"]
+    with _source_lock(sid):
+        cached = CACHE.get(RAW, sid)
+        if cached is None:
+            # 대신 쓸 캐시가 없으니 예산이 모자라면 이번 로드는 실패 (서비스는 이전 스냅샷 유지)
+            if not _within_budget(SPREADSHEET_REQUESTS + _tab_counts.get(sid, 0), "fetch_spreadsheet"):
+                raise BudgetExceeded(f"요청 예산 부족: {sid}를 불러오지 못했습니다")
+            return _store_source(sid, *fetch_spreadsheet(sid))
+        fetched_at, title, events, fingerprints = cached
+        fresh = max_age is None or time.time() - fetched_at < max_age
+        # 종료된 시즌은 만료 없음
+        if source["frozen"] or (not force and fresh):
+            return title, events, fingerprints
+        # 요청 예산이 모자라면 캐시로 대신 — 불러온 시각은 그대로라 다음 새로고침에서 다시 시도
+        if _within_budget(SPREADSHEET_REQUESTS + len(events), "fetch_spreadsheet"):
             try:
-                # fallback: gid 기반으로 worksheet 객체를 통해 다시 시도
-                values = worksheet.get_all_values()
-            except Exception:
-                continue
-        if len(values) < 2:
+                return _store_source(sid, *fetch_spreadsheet(sid))
+            except BudgetExceeded:
+                METER.degraded("fetch_spreadsheet")
+        return title, events, fingerprints
+
+
+def load_sources(
+    sources: list[dict], force: bool = False, max_age: float | None = SOURCE_TTL, tenant: str = ""
+) -> list[Source]:
+    """여러 스프레드시트를 병렬로 불러옵니다. 반환 순서는 sources 순서와 같습니다.
+    force=True면 활성 시트는 캐시를 무시하고 다시 불러옵니다.
+    모든 모임이 공유하는 작업 풀(fetch_pool)에서 tenant의 차례에 실행됩니다."""
+    return FETCH_POOL.map(tenant, lambda s: _load_source(s, force, max_age), sources)
+
+
+def reload_source(spreadsheet_id: str) -> None:
+    """스프레드시트 하나만 다시 불러옵니다. 직접 요청한 경우라 종료된 시즌도 포함합니다.
+    캐시가 있는데 요청 예산이 모자라면 캐시를 그대로 둡니다."""
+    with _source_lock(spreadsheet_id):
+        cached = CACHE.get(RAW, spreadsheet_id)
+        if cached is not None and not _within_budget(SPREADSHEET_REQUESTS + len(cached[2]), "fetch_spreadsheet"):
+            return
+        try:
+            _store_source(spreadsheet_id, *fetch_spreadsheet(spreadsheet_id))
+        except BudgetExceeded:
+            if cached is None:
+                raise
+            METER.degraded("fetch_spreadsheet")
+
+
+def reload_tab(spreadsheet_id: str, sheet_title: str) -> None:
+    """탭 하나만 다시 불러와 캐시에서 그 탭만 교체합니다. 나머지 탭은 그대로 둡니다."""
+    with _source_lock(spreadsheet_id):
+        cached = CACHE.get(RAW, spreadsheet_id)
+        if cached is None:
+            _store_source(spreadsheet_id, *fetch_spreadsheet(spreadsheet_id))
+            return
+        fetched_at, title, events, fingerprints = cached
+        if not _within_budget(TAB_REQUESTS, "fetch_worksheet"):
+            return
+        try:
+            df = fetch_worksheet(spreadsheet_id, sheet_title)
+        except BudgetExceeded:
+            METER.degraded("fetch_worksheet")
+            return
+        # 이미 공개된 스냅샷이 참조 중이므로 사본을 고쳐서 교체
+        events, fingerprints = dict(events), dict(fingerprints)
+        if df is None:
+            events.pop(sheet_title, None)
+            fingerprints.pop(sheet_title, None)
+        else:
+            events[sheet_title] = df
+            fingerprints[sheet_title] = tab_fingerprint(df)
+        CACHE.put(RAW, spreadsheet_id, (fetched_at, title, events, fingerprints))
+
+
+def merge_sources(
+    loaded: list[Source], sources: list[dict] | None = None
+) -> tuple[dict[str, pd.DataFrame], dict[str, str], dict[str, tuple[str, str]]]:
+    """
+    시트별 이벤트를 하나의 이벤트 목록으로 합칩니다.
+    순서는 시트 순서 → 탭 순서. 탭 이름이 겹치면 뒤에 오는 탭에
+    스프레드시트 제목을 붙이고, 그래도 겹치면 번호를 붙입니다.
+    반환: ({이벤트명: DataFrame}, {이벤트명: 탭 지문}, {이벤트명: (spreadsheet_id, 탭 이름)})
+    """
+    merged: dict[str, pd.DataFrame] = {}
+    fingerprints: dict[str, str] = {}
+    origins: dict[str, tuple[str, str]] = {}
+    ids = [s["id"] for s in sources] if sources else [""] * len(loaded)
+    for sid, (title, events, fps) in zip(ids, loaded):
+        for name, df in events.items():
+            key = name
+            if key in merged:
+                key = f"{name} · {title}"
+            n = 2
+            while key in merged:
+                key = f"{name} · {title} ({n})"
+                n += 1
+            merged[key] = df
+            fingerprints[key] = fps[name]
+            origins[key] = (sid, name)
+    return merged, fingerprints, origins
+
+
+# ── 이벤트 날짜 ───────────────────────────────────────────────────────────────
+_DATE_PATTERNS = [
+    # 2024-03-01, 2024.3.1, 2024/03/01, 2024년 3월 1일
+    (re.compile(r"(20\d{2})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})"), 0),
+    # 20240301
+    (re.compile(r"(?<!\d)(20\d{2})(\d{2})(\d{2})(?!\d)"), 0),
+    # 24.03.01, 24-3-1
+    (re.compile(r"(?<!\d)(\d{2})[.\-/](\d{1,2})[.\-/](\d{1,2})(?!\d)"), 2000),
+    # 240301
+    (re.compile(r"(?<!\d)(\d{2})(\d{2})(\d{2})(?!\d)"), 2000),
+]
+
+
+def parse_title_date(title: str) -> pd.Timestamp | None:
+    """탭 이름에서 날짜를 찾습니다 (예: `2024-03-01`, `24.03.01 정기 모임`). 없으면 None."""
+    for pattern, century in _DATE_PATTERNS:
+        m = pattern.search(title)
+        if not m:
+            continue
+        y, mo, d = (int(g) for g in m.groups())
+        try:
+            return pd.Timestamp(year=y + century, month=mo, day=d)
+        except ValueError:
             continue
-        headers, *rows = values
-        # 행 길이를 헤더에 맞춤 (짧으면 패딩, 길면 자름)
-        n = len(headers)
-        rows = [(r + [""] * (n - len(r)))[:n] for r in rows]
-        df = pd.DataFrame(rows, columns=headers)
-        # 빈 문자열 → NaN
-        df.replace("", pd.NA, inplace=True)
-        events[worksheet.title] = df
+    return None
+
+
+# 시각 뒤에 붙은 시간대 (Z, +09:00, -0500) — 떼고 적힌 현지 시각만 씀
+_TZ_SUFFIX = re.compile(r"(\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|GMT|[+-]\d{2}(?::?\d{2})?)$", re.IGNORECASE)
+
 
-    return events
+def parse_checkin_times(values: pd.Series) -> pd.Series:
+    """
+    CheckedInAt 칸을 시간대 없는 datetime64 열로 바꿉니다.
+    시간대가 붙은 값과 없는 값이 섞여 있어도 칸마다 시간대를 떼고 적힌 시각(현지 시각)을 씁니다.
+    읽을 수 없는 값은 NaT.
+    """
+    text = values.astype("string").str.strip().str.replace(_TZ_SUFFIX, r"\1", regex=True)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)  # 시간대가 섞인 값 — 아래에서 값마다 처리
+            stamps = pd.to_datetime(text, errors="coerce", format="mixed")
+    except (ValueError, TypeError):
+        stamps = text.astype(object)
+    if not pd.api.types.is_datetime64_any_dtype(stamps):
+        # 그래도 형식이 섞여 object로 남으면 값마다 변환
+        stamps = pd.Series(
+            [_naive_timestamp(v) for v in stamps], index=values.index, dtype="datetime64[ns]"
+        )
+    elif stamps.dt.tz is not None:
+        stamps = stamps.dt.tz_localize(None)
+    return stamps
+
+
+def _naive_timestamp(value) -> pd.Timestamp:
+    try:
+        stamp = pd.to_datetime(value, errors="coerce")
+    except (ValueError, TypeError):
+        return pd.NaT
+    if isinstance(stamp, pd.Timestamp) and stamp.tzinfo is not None:
+        stamp = stamp.tz_localize(None)
+    return stamp if isinstance(stamp, pd.Timestamp) else pd.NaT
+
+
+def _date_part(name: str, df: pd.DataFrame) -> pd.Timestamp | None:
+    date = parse_title_date(name)
+    if date is None and CHECKEDIN_COL in df.columns:
+        stamps = parse_checkin_times(df[CHECKEDIN_COL])
+        if stamps.notna().any():
+            date = stamps.min().normalize()
+    return date
+
+
+def event_dates(
+    events: dict[str, pd.DataFrame], fingerprints: dict[str, str] | None = None
+) -> dict[str, pd.Timestamp | None]:
+    """이벤트별 날짜. 탭 이름에 날짜가 없으면 가장 이른 CheckedInAt 날짜를 씁니다.
+    fingerprints를 주면 체크인 시각 파싱 결과를 탭 지문 캐시에서 재사용합니다."""
+    return {name: _cached_part("date", _date_part, name, df, fingerprints) for name, df in events.items()}
+
+
+# ── 탭 단위 파생 데이터 캐시 ─────────────────────────────────────────────────
+# (종류, 이벤트명, 탭 지문) -> 탭 하나에서 뽑은 행. 바뀐 탭만 다시 계산합니다.
+# CACHE의 derived 이름 공간에 저장되어 메모리 예산 안에서 관리됩니다.
+DERIVED_KINDS = ("date", "identity", "attendance", "payment", "checkin")
+
+
+def snapshot_cache_keys(sources: list[dict], fingerprints: dict[str, str]) -> set[tuple]:
+    """스냅샷 하나가 참조하는 CACHE 항목: 원본 시트와 그 탭들의 파생 행 (CACHE.pin용)."""
+    keys = {(RAW, s["id"]) for s in sources}
+    keys |= {(DERIVED, (kind, name, fp)) for name, fp in fingerprints.items() for kind in DERIVED_KINDS}
+    return keys
+
+
+def _cached_part(kind: str, builder, event_name: str, df: pd.DataFrame, fingerprints: dict[str, str] | None):
+    fp = fingerprints.get(event_name) if fingerprints else None
+    if fp is None:
+        return builder(event_name, df)
+    return CACHE.get_or_build(DERIVED, (kind, event_name, fp), lambda: builder(event_name, df))
+
+
+def _name_pairs(df: pd.DataFrame, email_series: pd.Series, hash_series: pd.Series) -> dict[str, str]:
+    """user_hash -> 이름 (이름 컬럼이 있을 경우)"""
+    name_col = find_column(df, NAME_KEYWORDS)
+    if not name_col:
+        return {}
+    name_series = df.loc[email_series.index, name_col]
+    valid_mask = name_series.notna() & (name_series.astype(str).str.strip() != "")
+    return dict(zip(
+        hash_series[valid_mask],
+        name_series[valid_mask].astype(str).str.strip(),
+    ))
+
+
+def _attendance_part(event_name: str, df: pd.DataFrame) -> tuple[pd.DataFrame | None, dict[str, str]]:
+    """탭 하나의 등록·참석 행과 이름 매핑."""
+    email_col = find_column(df, EMAIL_KEYWORDS)
+    if email_col is None:
+        return None, {}
+
+    has_checkin = CHECKEDIN_COL in df.columns and df[CHECKEDIN_COL].notna().any()
+
+    # Filter to rows with valid emails
+    email_series = df[email_col].dropna()
+    email_series = email_series[email_series.astype(str).str.strip() != ""]
+    if email_series.empty:
+        return None, {}
+
+    hash_series = hash_emails(email_series.astype(str).str.strip())
+
+    # 실제 참석 여부
+    if has_checkin:
+        attended_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
+    else:
+        attended_series = pd.Series(True, index=email_series.index)
+
+    part = pd.DataFrame({
+        "user_hash": hash_series.values,
+        "event": event_name,
+        "registered": True,
+        "attended": attended_series.values,
+        "tracked": has_checkin,  # 체크인 기록이 있는 탭인지 (없으면 등록 = 참석)
+    })
+    return part, _name_pairs(df, email_series, hash_series)
+
+
+def _identity_part(event_name: str, df: pd.DataFrame) -> pd.DataFrame | None:
+    """탭 하나의 동일인 판별 단서: user_hash, local(이메일 아이디), name(공백 제거·소문자), phone(숫자만)."""
+    email_col = find_column(df, EMAIL_KEYWORDS)
+    if email_col is None:
+        return None
+    emails = df[email_col].dropna().astype(str).str.strip()
+    emails = emails[emails != ""]
+    if emails.empty:
+        return None
+
+    part = pd.DataFrame({
+        "user_hash": hash_emails(emails).values,
+        "local": emails.str.lower().str.split("@").str[0].values,
+        "name": None,
+        "phone": None,
+    })
+    name_col = find_column(df, NAME_KEYWORDS)
+    if name_col:
+        names = df.loc[emails.index, name_col].astype("string").str.replace(r"\s+", "", regex=True).str.lower()
+        part["name"] = names.replace("", pd.NA).astype(object).values
+    phone_col = find_column(df, PHONE_KEYWORDS)
+    if phone_col:
+        digits = df.loc[emails.index, phone_col].astype("string").str.replace(r"\D", "", regex=True)
+        digits = digits.str.replace(r"^82(?=1)", "0", regex=True)  # +82 10-... → 010-...
+        part["phone"] = digits.where(digits.str.len() >= 9).astype(object).values
+    return part
+
+
+def identity_signals(events: dict[str, pd.DataFrame], fingerprints: dict[str, str] | None = None) -> pd.DataFrame:
+    """모든 탭의 동일인 판별 단서를 모읍니다 (identity.resolve_identities 입력)."""
+    parts = [
+        part for event_name, df in events.items()
+        if (part := _cached_part("identity", _identity_part, event_name, df, fingerprints)) is not None
+    ]
+    if not parts:
+        return pd.DataFrame(columns=["user_hash", "local", "name", "phone"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def _merge_identities(
+    df: pd.DataFrame, name_map: dict[str, str], identities: dict[str, str], agg: dict
+) -> tuple[pd.DataFrame, dict[str, str]]:
+    """동일인 해시를 대표 해시로 바꾸고, 이벤트마다 한 사람당 한 행만 남깁니다 (행 순서 유지)."""
+    if identities:
+        df = df.assign(user_hash=df["user_hash"].map(identities).fillna(df["user_hash"]))
+        name_map = {identities.get(h, h): n for h, n in name_map.items()}
+    return df.groupby(["user_hash", "event"], sort=False, as_index=False).agg(**agg), name_map
 
 
 def build_attendance_matrix(
-    events: dict[str, pd.DataFrame]
+    events: dict[str, pd.DataFrame],
+    fingerprints: dict[str, str] | None = None,
+    identities: dict[str, str] | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     출석 매트릭스와 원본 행 데이터를 반환합니다.
+    fingerprints(탭 지문)를 주면 내용이 바뀌지 않은 탭은 이전 결과를 재사용합니다.
+    identities(identity.resolve_identities 결과)를 주면 동일인을 합치고
+    이벤트마다 한 사람당 한 행만 남깁니다. 주지 않으면 중복 등록 행도 그대로 둡니다.
 
     출석 매트릭스: rows=이름(또는 user_hash), cols=event_name, values=0/1
-    행 데이터: user_id, event, registered, attended 컬럼
+    행 데이터: user_hash(이름), event, registered, attended, tracked, member_id(익명 ID) 컬럼
     """
     all_dfs = []
     name_map: dict[str, str] = {}  # user_hash -> 이름
 
     for event_name, df in events.items():
-        email_col = find_column(df, EMAIL_KEYWORDS)
-        if email_col is None:
-            continue
-
-        name_col = find_column(df, NAME_KEYWORDS)
-        has_checkin = CHECKEDIN_COL in df.columns and df[CHECKEDIN_COL].notna().any()
-
-        # Filter to rows with valid emails
-        email_series = df[email_col].dropna()
-        email_series = email_series[email_series.astype(str).str.strip() != ""]
-        if email_series.empty:
+        part, names = _cached_part("attendance", _attendance_part, event_name, df, fingerprints)
+        if part is None:
             continue
-
-        hash_series = email_series.astype(str).str.strip().apply(anonymize_email)
-
-        # 이름 수집 (있을 경우)
-        if name_col:
-            name_series = df.loc[email_series.index, name_col]
-            valid_mask = name_series.notna() & (name_series.astype(str).str.strip() != "")
-            name_map.update(dict(zip(
-                hash_series[valid_mask],
-                name_series[valid_mask].astype(str).str.strip(),
-            )))
-
-        # 실제 참석 여부
-        if has_checkin:
-            attended_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
-        else:
-            attended_series = pd.Series(True, index=email_series.index)
-
-        all_dfs.append(pd.DataFrame({
-            "user_hash": hash_series.values,
-            "event": event_name,
-            "registered": True,
-            "attended": attended_series.values,
-        }))
+        name_map.update(names)
+        all_dfs.append(part)
 
     if not all_dfs:
         return pd.DataFrame(), pd.DataFrame()
 
     detail_df = pd.concat(all_dfs, ignore_index=True)
+    if identities is not None:
+        detail_df, name_map = _merge_identities(detail_df, name_map, identities, {
+            "registered": ("registered", "first"),
+            "attended": ("attended", "max"),
+            "tracked": ("tracked", "first"),
+        })
+
+    # 이름으로 바꾸기 전 익명 ID — 동명이인도 구분됨 (결제 대조는 이 열로 맞춤)
+    detail_df["member_id"] = detail_df["user_hash"]
 
     # 출석 매트릭스 (실제 참석자만)
     attended_df = detail_df[detail_df["attended"]]
     if attended_df.empty:
         return pd.DataFrame(), detail_df
 
-    matrix = attended_df.pivot_table(
-        index="user_hash",
-        columns="event",
-        values="attended",
-        aggfunc="max",
-        fill_value=0,
-    ).astype(int)
+    # pivot_table(aggfunc="max")와 같은 결과 (행·열 정렬, 중복은 1)를 직접 채워 만듦
+    users, user_codes = np.unique(attended_df["user_hash"].to_numpy(), return_inverse=True)
+    event_names, event_codes = np.unique(attended_df["event"].to_numpy(), return_inverse=True)
+    values = np.zeros((len(users), len(event_names)), dtype=int)
+    values[user_codes, event_codes] = 1
+    matrix = pd.DataFrame(
+        values,
+        index=pd.Index(users, dtype=object, name="user_hash"),
+        columns=pd.Index(event_names, dtype=object, name="event"),
+    )
 
     # 이름이 있으면 인덱스를 이름으로 교체
-    matrix.index = matrix.index.map(lambda h: name_map.get(h, h))
-    detail_df["user_hash"] = detail_df["user_hash"].map(lambda h: name_map.get(h, h))
+    matrix.index = pd.Index(_with_names(matrix.index.to_series(), name_map), name="user_hash")
+    detail_df["user_hash"] = _with_names(detail_df["user_hash"], name_map)
 
     return matrix, detail_df
 
-def build_payment_data(events: dict[str, pd.DataFrame]) -> pd.DataFrame:
+
+def _classify_payments(payment_str: pd.Series) -> pd.Series:
+    """결제 응답 → 계좌이체 / 현금 / 기타 (빈 값은 "")."""
+    method = np.select(
+        [
+            payment_str.str.contains("입금", regex=False),
+            payment_str.str.contains("직접|현금") | payment_str.str.lower().str.contains("cash", regex=False),
+            (payment_str != "") & (payment_str != "nan"),
+        ],
+        ["계좌이체", "현금", "기타"],
+        default="",
+    )
+    return pd.Series(method, index=payment_str.index, dtype=object)
+
+
+def _payment_part(event_name: str, df: pd.DataFrame) -> tuple[pd.DataFrame | None, dict[str, str]]:
+    """탭 하나의 결제 행과 이름 매핑."""
+    email_col = find_column(df, EMAIL_KEYWORDS)
+    if email_col is None:
+        return None, {}
+
+    payment_col = find_payment_column(df)
+    if payment_col is None:
+        return None, {}
+
+    email_series = df[email_col].dropna()
+    email_series = email_series[email_series.astype(str).str.strip() != ""]
+    if email_series.empty:
+        return None, {}
+
+    hash_series = hash_emails(email_series.astype(str).str.strip())
+
+    payment_series = df.loc[email_series.index, payment_col]
+    payment_str = payment_series.astype(str).str.strip()
+
+    has_payment = payment_series.notna() & (payment_str != "") & (payment_str != "nan")
+    method_series = _classify_payments(payment_str).where(has_payment)
+
+    # 현금은 미결제로 처리
+    paid_series = has_payment & (method_series != "현금")
+
+    # 체크인 여부
+    if CHECKEDIN_COL in df.columns:
+        checkin_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
+    else:
+        checkin_series = pd.Series(False, index=email_series.index)
+
+    part = pd.DataFrame(
+        {
+            "user_hash": hash_series.values,
+            "event": event_name,
+            "paid": paid_series.values,
+            "method": method_series.values,
+            "checked_in": checkin_series.values,
+        }
+    )
+    return part, _name_pairs(df, email_series, hash_series)
+
+
+def build_payment_data(
+    events: dict[str, pd.DataFrame],
+    fingerprints: dict[str, str] | None = None,
+    identities: dict[str, str] | None = None,
+) -> pd.DataFrame:
     """
     결제 컬럼이 있는 시트에서 결제 데이터를 추출합니다.
+    fingerprints(탭 지문)를 주면 내용이 바뀌지 않은 탭은 이전 결과를 재사용합니다.
+    identities를 주면 동일인을 합치고 이벤트마다 한 사람당 한 행만 남깁니다
+    (한 번이라도 결제했으면 결제, 결제 방법은 결제한 행 기준).
     반환: user_hash, name, event, paid, method 컬럼의 DataFrame
     """
     all_dfs = []
     name_map: dict[str, str] = {}
 
     for event_name, df in events.items():
-        email_col = find_column(df, EMAIL_KEYWORDS)
-        if email_col is None:
+        part, names = _cached_part("payment", _payment_part, event_name, df, fingerprints)
+        if part is None:
             continue
+        name_map.update(names)
+        all_dfs.append(part)
 
-        payment_col = find_payment_column(df)
-        if payment_col is None:
-            continue
+    if not all_dfs:
+        return pd.DataFrame()
 
-        name_col = find_column(df, NAME_KEYWORDS)
+    pay_df = pd.concat(all_dfs, ignore_index=True)
+    if identities is not None:
+        pay_df, name_map = _merge_identities(
+            pay_df.assign(paid_method=pay_df["method"].where(pay_df["paid"])), name_map, identities, {
+                "paid": ("paid", "max"),
+                "method": ("method", "first"),
+                "paid_method": ("paid_method", "first"),
+                "checked_in": ("checked_in", "max"),
+            })
+        pay_df["method"] = pay_df.pop("paid_method").fillna(pay_df["method"])
+    pay_df["name"] = _with_names(pay_df["user_hash"], name_map)
+    return pay_df
 
-        email_series = df[email_col].dropna()
-        email_series = email_series[email_series.astype(str).str.strip() != ""]
-        if email_series.empty:
-            continue
 
-        hash_series = email_series.astype(str).str.strip().apply(anonymize_email)
-
-        if name_col:
-            name_series = df.loc[email_series.index, name_col]
-            valid_mask = name_series.notna() & (
-                name_series.astype(str).str.strip() != ""
-            )
-            name_map.update(
-                dict(
-                    zip(
-                        hash_series[valid_mask],
-                        name_series[valid_mask].astype(str).str.strip(),
-                    )
-                )
-            )
-
-        payment_series = df.loc[email_series.index, payment_col]
-        payment_str = payment_series.astype(str).str.strip()
-
-        def _classify(x: str) -> str:
-            xl = x.lower()
-            if "입금" in x:
-                return "계좌이체"
-            if "직접" in x or "현금" in x or "cash" in xl:
-                return "현금"
-            if x and x != "nan":
-                return "기타"
-            return ""
-
-        has_payment = payment_series.notna() & (payment_str != "") & (payment_str != "nan")
-        method_series = payment_str.apply(_classify).where(has_payment)
-
-        # 현금은 미결제로 처리
-        paid_series = has_payment & (method_series != "현금")
-
-        # 체크인 여부
-        if CHECKEDIN_COL in df.columns:
-            checkin_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
-        else:
-            checkin_series = pd.Series(False, index=email_series.index)
-
-        all_dfs.append(
-            pd.DataFrame(
-                {
-                    "user_hash": hash_series.values,
-                    "event": event_name,
-                    "paid": paid_series.values,
-                    "method": method_series.values,
-                    "checked_in": checkin_series.values,
-                }
-            )
-        )
+def _checkin_part(event_name: str, df: pd.DataFrame) -> tuple[pd.DataFrame | None, dict[str, str]]:
+    """탭 하나의 체크인 행 (체크인한 사람만). 시각·횟수를 타입이 있는 열로 한 번에 변환합니다."""
+    email_col = find_column(df, EMAIL_KEYWORDS)
+    if email_col is None or CHECKEDIN_COL not in df.columns:
+        return None, {}
+
+    stamps = parse_checkin_times(df[CHECKEDIN_COL])
+    emails = df[email_col].astype("string").str.strip()
+    valid = stamps.notna() & emails.notna() & (emails != "")
+    if not valid.any():
+        return None, {}
+
+    email_series = emails[valid].astype(str)
+    hash_series = hash_emails(email_series)
+    if COUNT_COL in df.columns:
+        counts = pd.to_numeric(df.loc[valid, COUNT_COL], errors="coerce").astype("Int64")
+    else:
+        counts = pd.Series(pd.NA, index=email_series.index, dtype="Int64")
+
+    part = pd.DataFrame({
+        "user_hash": hash_series.values,
+        "event": event_name,
+        "checked_in_at": stamps[valid].values,
+        "checkin_count": counts.fillna(1).values,  # 횟수 칸이 비어 있으면 1회
+    })
+    return part, _name_pairs(df, email_series, hash_series)
+
+
+def build_checkin_data(
+    events: dict[str, pd.DataFrame],
+    fingerprints: dict[str, str] | None = None,
+    identities: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """
+    CheckedInAt·CheckinCount를 파싱한 체크인 데이터.
+    identities를 주면 동일인을 합치고 이벤트마다 가장 이른 체크인 한 행만 남깁니다.
+    반환: user_hash(이름), event, checked_in_at(datetime64), checkin_count(Int64) 컬럼의 DataFrame
+    """
+    all_dfs = []
+    name_map: dict[str, str] = {}
+
+    for event_name, df in events.items():
+        part, names = _cached_part("checkin", _checkin_part, event_name, df, fingerprints)
+        if part is None:
+            continue
+        name_map.update(names)
+        all_dfs.append(part)
 
     if not all_dfs:
-        return pd.DataFrame()
+        return pd.DataFrame(columns=["user_hash", "event", "checked_in_at", "checkin_count"])
 
-    pay_df = pd.concat(all_dfs, ignore_index=True)
-    pay_df["name"] = pay_df["user_hash"].map(lambda h: name_map.get(h, h))
-    return pay_df
+    checkin_df = pd.concat(all_dfs, ignore_index=True)
+    if identities is not None:
+        checkin_df, name_map = _merge_identities(checkin_df, name_map, identities, {
+            "checked_in_at": ("checked_in_at", "min"),
+            "checkin_count": ("checkin_count", "max"),
+        })
+    checkin_df["user_hash"] = _with_names(checkin_df["user_hash"], name_map)
+    return checkin_df
 
 
-def build_referral_data(events: dict[str, pd.DataFrame]) -> pd.DataFrame:
+def tab_rows(
+    event_name: str, df: pd.DataFrame, fingerprints: dict[str, str] | None = None
+) -> tuple[pd.DataFrame | None, pd.DataFrame | None, dict[str, str]]:
+    """
+    탭 하나의 (등록·참석 행, 결제 행, 이름 매핑). user_hash는 이름으로 바꾸기 전 해시입니다.
+    스냅샷을 만들 때 쓴 탭 지문을 주면 탭 단위 캐시를 그대로 재사용합니다.
+    """
+    attendance, names = _cached_part("attendance", _attendance_part, event_name, df, fingerprints)
+    payment, _ = _cached_part("payment", _payment_part, event_name, df, fingerprints)
+    return attendance, payment, names
+
+
+# ── 유입 경로 정규화 ──────────────────────────────────────────────────────────
+# 대표 유입 경로 -> 자유 응답에서 흔히 쓰이는 표기
+REFERRAL_SOURCES: dict[str, list[str]] = {
+    "인스타그램": ["인스타그램", "인스타", "instagram", "insta", "ig", "인스타 광고"],
+    "지인 소개": ["지인 소개", "지인", "친구", "친구 소개", "지인 추천", "소개", "friend", "friends", "word of mouth", "referral"],
+    "카카오톡": ["카카오톡", "카톡", "오픈채팅", "오픈톡", "단톡방", "kakao", "kakaotalk", "open chat"],
+    "네이버": ["네이버", "네이버 카페", "네이버 블로그", "naver", "블로그", "blog"],
+    "에브리타임": ["에브리타임", "에타", "everytime"],
+    "당근": ["당근", "당근마켓", "daangn", "karrot"],
+    "검색": ["검색", "구글", "google", "search"],
+    "페이스북": ["페이스북", "페북", "facebook", "fb"],
+    "유튜브": ["유튜브", "youtube"],
+    "스레드": ["스레드", "threads"],
+    "디스코드": ["디스코드", "discord"],
+    "Meetup": ["meetup", "밋업"],
+}
+FUZZY_CUTOFF = 0.75  # difflib 유사도 기준
+
+_referral_lookup: dict[str, str] = {}  # 원본 응답 -> 대표 유입 경로 (한 번 계산한 값은 재사용)
+
+
+def _normalize_source(text: str) -> str:
+    """비교용 키: 소문자, 공백·문장부호 제거."""
+    return re.sub(r"[\s\W_]+", "", text.lower())
+
+
+def _build_source_aliases() -> dict[str, str]:
+    aliases: dict[str, str] = {}
+    for canon, names in REFERRAL_SOURCES.items():
+        for alias in [canon, *names]:
+            aliases.setdefault(_normalize_source(alias), canon)
+    return aliases
+
+
+# 정규화한 별칭 -> 대표 유입 경로. import 시 한 번 만들고 이후에는 읽기만 합니다 (여러 스레드에서 안전).
+_SOURCE_ALIASES: dict[str, str] = _build_source_aliases()
+_ALIASES_BY_LENGTH: tuple[str, ...] = tuple(sorted(_SOURCE_ALIASES, key=len, reverse=True))
+
+
+def canonical_source(raw: str) -> str:
+    """
+    자유 응답 하나를 대표 유입 경로로 바꿉니다.
+    별칭 일치 → 별칭 포함 → 유사 표기(difflib) 순으로 찾고, 없으면 원문을 그대로 씁니다.
+    """
+    key = _normalize_source(raw)
+    if not key:
+        return raw.strip()
+    if key in _SOURCE_ALIASES:
+        return _SOURCE_ALIASES[key]
+    # 긴 별칭부터 — "인스타 보고 왔어요", "friend told me"
+    for alias in _ALIASES_BY_LENGTH:
+        # 짧은 영문 별칭(ig, fb)은 다른 단어 안에 흔히 섞이므로 완전 일치만 허용
+        if (len(alias) >= 4 or not alias.isascii()) and alias in key:
+            return _SOURCE_ALIASES[alias]
+    close = difflib.get_close_matches(key, list(_SOURCE_ALIASES), n=1, cutoff=FUZZY_CUTOFF)
+    return _SOURCE_ALIASES[close[0]] if close else raw.strip()
+
+
+def canonicalize_sources(raw: pd.Series) -> pd.Series:
+    """응답 Series를 대표 유입 경로로 바꿉니다. 처음 보는 고유값에 대해서만 매칭을 계산합니다."""
+    codes, uniques = pd.factorize(raw)
+    for value in uniques:
+        if value not in _referral_lookup:
+            _referral_lookup[value] = canonical_source(value)
+    mapped = np.array([_referral_lookup[v] for v in uniques], dtype=object)
+    return pd.Series(mapped[codes], index=raw.index)
+
+
+def build_referral_data(events: dict[str, pd.DataFrame], identities: dict[str, str] | None = None) -> pd.DataFrame:
     """
     '어떻게 알게 되셨나요' 컬럼이 있는 시트에서 유입 경로 데이터를 추출합니다.
-    반환: event, source 컬럼의 DataFrame
+    identities를 주면 이벤트마다 한 사람당 첫 응답만 셉니다.
+    반환: event, source(대표 유입 경로), raw_source(원본 응답) 컬럼의 DataFrame
     """
-    rows = []
+    all_dfs = []
     for event_name, df in events.items():
         referral_col = find_column(df, REFERRAL_KEYWORDS)
         if referral_col is None:
             continue
-        for val in df[referral_col].dropna():
-            source = str(val).strip()
-            if source:
-                rows.append({"event": event_name, "source": source})
+        answers = df[referral_col].dropna().astype(str).str.strip()
+        answers = answers[answers != ""]
+        email_col = find_column(df, EMAIL_KEYWORDS)
+        if identities is not None and email_col is not None:
+            emails = df.loc[answers.index, email_col].astype("string").str.strip()
+            emails = emails[emails.notna() & (emails != "")].astype(str)
+            users = hash_emails(emails)
+            users = users.map(identities).fillna(users).reindex(answers.index)
+            answers = answers[~(users.notna() & users.duplicated())]
+        if answers.empty:
+            continue
+        all_dfs.append(pd.DataFrame({"event": event_name, "raw_source": answers.values}))
+
+    if not all_dfs:
+        return pd.DataFrame()
 
-    return pd.DataFrame(rows) if rows else pd.DataFrame()
\ No newline at end of file
+    ref_df = pd.concat(all_dfs, ignore_index=True)
+    ref_df.insert(1, "source", canonicalize_sources(ref_df["raw_source"]))
+    return ref_df
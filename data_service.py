@@ -0,0 +1,271 @@
+"""
+모든 세션이 함께 쓰는 데이터 서비스.
+마지막으로 성공한 스냅샷을 즉시 돌려주고, 새로고침은 백그라운드 스레드에서
+한 번에 하나만 실행한 뒤 완성된 새 스냅샷으로 통째로 교체합니다.
+페이지 조회는 (서버 시작 후 첫 로드를 제외하면) Google Sheets를 기다리지 않습니다.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from aggregates import Aggregates, AggregateStore
+from cache_budget import CACHE, RAW, SNAPSHOT
+from change_feed import ChangeLog
+from event_catalog import EventCatalog
+from fetch_pool import FETCH_POOL
+from identity import resolve_identities, aliases_digest
+from sheets_meter import METER
+from data_loader import (
+    SOURCE_TTL,
+    load_sources,
+    reload_source,
+    reload_tab,
+    merge_sources,
+    data_version,
+    build_attendance_matrix,
+    build_payment_data,
+    build_referral_data,
+    build_checkin_data,
+    snapshot_cache_keys,
+)
+
+IDLE_AFTER = 30 * 60            # 이 시간 동안 조회가 없으면 정기 새로고침을 쉼(초)
+MANUAL_REFRESH_COOLDOWN = 30    # 같은 대상을 수동 새로고침할 수 있는 최소 간격(초)
+
+# refresh() 결과
+STARTED, JOINED, RATE_LIMITED = "started", "joined", "rate_limited"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """한 번의 로드 결과. 만들어진 뒤에는 바뀌지 않습니다."""
+    version: str
+    loaded_at: float
+    events: dict[str, pd.DataFrame]
+    fingerprints: dict[str, str]
+    origins: dict[str, tuple[str, str]]  # 이벤트명 -> (spreadsheet_id, 탭 이름)
+    identities: dict[str, str]           # 합쳐진 user_hash -> 대표 user_hash
+    matrix: pd.DataFrame
+    detail_df: pd.DataFrame
+    pay_df: pd.DataFrame
+    ref_df: pd.DataFrame
+    checkin_df: pd.DataFrame
+    aggregates: Aggregates               # 전체 기간 KPI·이벤트 요약 (누적 집계)
+    catalog: EventCatalog                # 날짜순 이벤트 목록·날짜 색인
+
+
+def build_snapshot(
+    events: dict[str, pd.DataFrame],
+    fingerprints: dict[str, str],
+    origins: dict[str, tuple[str, str]],
+    aliases: tuple[tuple[str, ...], ...] = (),
+    store: AggregateStore | None = None,
+    tenant: str = "",
+) -> Snapshot:
+    """원본 탭으로 파생 테이블까지 미리 만들어 스냅샷을 구성합니다.
+    내용이 바뀌지 않은 탭의 파생 행은 탭 지문 캐시에서 재사용됩니다.
+    동일인 식별은 여기서 한 번 적용되어 모든 파생 테이블이 중복 없이 만들어집니다.
+    store를 주면 이전 스냅샷 이후 바뀐 이벤트만 누적 집계에 반영합니다.
+    tenant(모임 ID)는 데이터 버전에 섞여, 버전을 키로 쓰는 분석·그림·API 캐시가 모임별로 나뉩니다.
+    매트릭스 열은 이벤트 카탈로그의 날짜순으로 정렬됩니다 (코호트·흐름·누적 집계의 이벤트 순서)."""
+    identities = resolve_identities(events, fingerprints, aliases)
+    catalog = EventCatalog.build(events, fingerprints)
+    matrix, detail_df = build_attendance_matrix(events, fingerprints, identities)
+    if not matrix.empty:
+        matrix = matrix[catalog.order(matrix.columns)]
+    aggregates = (store if store is not None else AggregateStore()).update(matrix, detail_df)
+    return Snapshot(
+        version=data_version(fingerprints, tenant + aliases_digest(aliases)),
+        loaded_at=time.time(),
+        events=events,
+        fingerprints=fingerprints,
+        origins=origins,
+        identities=identities,
+        matrix=matrix,
+        detail_df=detail_df,
+        pay_df=build_payment_data(events, fingerprints, identities),
+        ref_df=build_referral_data(events, identities),
+        checkin_df=build_checkin_data(events, fingerprints, identities),
+        aggregates=aggregates,
+        catalog=catalog,
+    )
+
+
+class DataService:
+    """
+    스프레드시트 묶음 하나에 대한 공유 스냅샷 + 단일 실행(single-flight) 새로고침.
+
+    새로고침 대상 키: (None, None) = 활성 시트 전체, (id, None) = 스프레드시트 하나,
+    (id, 탭 이름) = 탭 하나. 같은 키의 요청은 진행 중인 작업에 합류합니다.
+    """
+
+    def __init__(
+        self,
+        sources: list[dict],
+        interval: float = SOURCE_TTL,
+        aliases: tuple[tuple[str, ...], ...] = (),
+        tenant: str = "",
+    ):
+        self.sources = sources
+        self.tenant = tenant    # 모임 ID (tenancy) — 단일 모임이면 ""
+        self.aliases = aliases  # 동일인 이메일 묶음 (identity.identity_aliases)
+        self.interval = interval
+        self.last_error: str | None = None
+        self.degraded = False       # 마지막 새로고침이 요청 예산 때문에 캐시를 대신 썼는지
+        self.changes = ChangeLog()  # 새로고침 사이의 등록·체크인·결제 변경
+        self._aggregates = AggregateStore()  # 새로고침 스레드에서만 갱신
+        self._snapshot: Snapshot | None = None
+        self._guard = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._pending: set[tuple[str | None, str | None]] = set()
+        self._inflight: set[tuple[str | None, str | None]] = set()
+        self._manual_at: dict[tuple[str | None, str | None], float] = {}
+        self._last_access = time.time()
+        # 원본 시트는 첫 로드 전부터 고정 — 종료된 시즌이 예산 때문에 밀려나 다시 불러와지지 않도록
+        CACHE.pin(self, {(RAW, s["id"]) for s in sources})
+        self._scheduler = threading.Thread(target=self._schedule, name="data-service-scheduler", daemon=True)
+        self._scheduler.start()
+
+    @property
+    def refreshing(self) -> bool:
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
+    def snapshot(self) -> Snapshot | None:
+        """현재 스냅샷을 즉시 반환합니다.
+        아직 한 번도 로드하지 못했다면 첫 로드가 끝날 때까지만 기다립니다."""
+        self._last_access = time.time()
+        snap = self._snapshot
+        if snap is None:
+            self.refresh()
+            snap = self.wait()
+        elif time.time() - snap.loaded_at > self.interval:
+            self.refresh()  # 오래된 스냅샷은 일단 반환하고 뒤에서 갱신
+        return snap
+
+    def touch(self) -> None:
+        """조회가 있었다고 표시합니다 — 정기 새로고침이 유휴 상태로 멈추지 않게 (새로고침을 기다리지는 않음)."""
+        self._last_access = time.time()
+
+    def latest(self) -> Snapshot | None:
+        """현재 스냅샷 (없으면 None). snapshot()과 달리 새로고침을 요청하지 않고 조회 시각도 남기지 않습니다."""
+        return self._snapshot
+
+    def refresh(self, source_id: str | None = None, tab: str | None = None, manual: bool = False) -> str:
+        """
+        백그라운드 새로고침을 요청합니다.
+        source_id·tab을 주면 그 스프레드시트·탭만 다시 불러오고 나머지 캐시는 유지합니다.
+        manual=True(버튼)면 같은 대상에 대해 MANUAL_REFRESH_COOLDOWN초 간격 제한을 적용합니다.
+        반환: STARTED / JOINED(이미 대기·진행 중) / RATE_LIMITED
+        """
+        key = (source_id, tab if source_id else None)
+        now = time.time()
+        with self._guard:
+            covering = {key, (None, None)} | ({(source_id, None)} if tab else set())
+            if covering & (self._pending | self._inflight):
+                return JOINED
+            if manual:
+                if now - self._manual_at.get(key, 0) < MANUAL_REFRESH_COOLDOWN:
+                    return RATE_LIMITED
+                self._manual_at[key] = now
+            self._pending.add(key)
+            if not self.refreshing:
+                self._worker = threading.Thread(target=self._drain, name="data-service-refresh", daemon=True)
+                self._worker.start()
+            return STARTED
+
+    def cooldown_left(self, source_id: str | None = None, tab: str | None = None) -> float:
+        """수동 새로고침을 다시 할 수 있을 때까지 남은 시간(초)."""
+        key = (source_id, tab if source_id else None)
+        return max(0.0, MANUAL_REFRESH_COOLDOWN - (time.time() - self._manual_at.get(key, 0)))
+
+    def wait(self, timeout: float | None = None) -> Snapshot | None:
+        """진행 중인 새로고침이 끝날 때까지 기다린 뒤 스냅샷을 반환합니다 (서버 시작·도구용)."""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        return self._snapshot
+
+    def _drain(self) -> None:
+        """대기 중인 요청을 모아 처리하고, 처리하는 동안 들어온 요청이 없을 때까지 반복합니다."""
+        while True:
+            with self._guard:
+                if not self._pending:
+                    self._inflight = set()
+                    self._worker = None
+                    return
+                self._inflight, self._pending = self._pending, set()
+            self._run_refresh(self._inflight)
+
+    def _run_refresh(self, keys: set[tuple[str | None, str | None]]) -> None:
+        # 이 새로고침의 요청은 모두 이 모임의 예산 몫으로 셈 (작업 풀 스레드 포함)
+        with METER.tenant(self.tenant), METER.refresh(self._refresh_label(keys)) as record:
+            self._refresh_once(keys)
+        self.degraded = record["캐시 대체"] > 0
+
+    def _refresh_label(self, keys: set[tuple[str | None, str | None]]) -> str:
+        prefix = f"[{self.tenant}] " if self.tenant else ""
+        if self._snapshot is None:
+            return prefix + "첫 로드"
+        if (None, None) in keys:
+            return prefix + "활성 시트 전체"
+        return prefix + ", ".join(tab or sid for sid, tab in sorted(keys, key=lambda k: (k[0], k[1] or "")))
+
+    def _refresh_once(self, keys: set[tuple[str | None, str | None]]) -> None:
+        try:
+            # 시트 요청은 모두 공유 작업 풀에서 이 모임의 차례에 실행
+            if self._snapshot is None:
+                loaded = load_sources(self.sources, tenant=self.tenant)
+            elif (None, None) in keys:
+                loaded = load_sources(self.sources, force=True, tenant=self.tenant)
+            else:
+                for source_id, tab in sorted(keys, key=lambda k: (k[0], k[1] or "")):
+                    if tab is None:
+                        FETCH_POOL.run(self.tenant, reload_source, source_id)
+                    elif (source_id, None) not in keys:
+                        FETCH_POOL.run(self.tenant, reload_tab, source_id, tab)
+                # 나머지 시트는 캐시 그대로 사용
+                loaded = load_sources(self.sources, max_age=None, tenant=self.tenant)
+            snap = build_snapshot(
+                *merge_sources(loaded, self.sources), self.aliases, self._aggregates, tenant=self.tenant
+            )
+            self.changes.record(self._snapshot, snap)
+            # 참조 교체 한 번으로 공개 — 읽는 쪽은 항상 완성된 스냅샷만 봄
+            self._snapshot = snap
+            self._pin(snap)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    def _pin(self, snap: Snapshot) -> None:
+        """공개한 스냅샷이 참조하는 캐시 항목을 고정하고, 스냅샷 테이블도 사용량에 넣습니다.
+        이전 스냅샷만 쓰던 파생 행은 고정이 풀려 예산에 따라 밀려날 수 있습니다."""
+        key = (SNAPSHOT, (self.tenant, id(self)))
+        CACHE.pin(self, snapshot_cache_keys(self.sources, snap.fingerprints) | {key})
+        tables = (snap.matrix, snap.detail_df, snap.pay_df, snap.ref_df, snap.checkin_df, snap.aggregates)
+        CACHE.put(*key, tables)
+
+    def _schedule(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            if time.time() - self._last_access < IDLE_AFTER:
+                self.refresh()
+
+
+_services: dict[tuple, DataService] = {}
+_services_guard = threading.Lock()
+
+
+def get_data_service(
+    sources: list[dict], aliases: tuple[tuple[str, ...], ...] = (), tenant: str = ""
+) -> DataService:
+    """프로세스 전체에서 공유하는 서비스를 반환합니다 (모임·시트 구성·별칭 설정별 1개).
+    같은 시트를 쓰는 모임끼리도 스냅샷은 따로 두고, 원본 시트 캐시(RAW)만 함께 씁니다."""
+    key = (tenant, tuple((s["id"], s["frozen"]) for s in sources), aliases)
+    with _services_guard:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = DataService(sources, aliases=aliases, tenant=tenant)
+        return service
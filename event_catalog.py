@@ -0,0 +1,145 @@
+"""
+이벤트 카탈로그: 날짜순 이벤트 목록과 날짜 색인.
+이벤트 날짜는 탭 이름(예: `2024-03-01 정기 모임`)에서, 없으면 가장 이른 체크인 시각에서 가져옵니다.
+둘 다 없는 탭은 바로 앞 탭(없으면 뒤 탭)의 날짜로 추정해 순서만 맞춥니다.
+
+- 순서: (날짜, 탭 순서) — 탭 이름의 가나다순이 아니라 실제 날짜순
+- 기간 필터는 정렬된 날짜 색인을 이분 탐색(bisect)해 O(log n)에 범위를 찾고, 최근 N개는 날짜순 목록의 끝 구간입니다.
+- 메타데이터: 종류(탭 이름의 키워드), 정원(탭 이름의 `정원 30` / `cap 30`)
+"""
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from data_loader import event_dates, parse_title_date
+
+# 종류 -> 탭 이름 키워드 (앞에 있는 종류가 우선, 해당 없으면 OTHER_KIND)
+EVENT_KINDS = {
+    "대회": ["대회", "토너먼트", "tournament", "championship"],
+    "워크숍": ["워크숍", "워크샵", "강의", "레슨", "workshop", "lesson", "lecture"],
+    "번개": ["번개", "벙개", "casual", "pickup"],
+    "정기 모임": ["정기", "정모", "regular", "weekly", "monthly"],
+}
+OTHER_KIND = "기타"
+_CAPACITY = re.compile(r"(?:정원|cap(?:acity)?)\s*[:=]?\s*(\d+)", re.IGNORECASE)
+
+# 날짜 출처
+TITLE, CHECKIN, ESTIMATED, UNKNOWN = "탭 이름", "체크인", "추정", "없음"
+
+
+def event_kind(title: str) -> str:
+    lowered = title.lower()
+    for kind, keywords in EVENT_KINDS.items():
+        if any(k in lowered for k in keywords):
+            return kind
+    return OTHER_KIND
+
+
+def event_capacity(title: str) -> int | None:
+    m = _CAPACITY.search(title)
+    return int(m.group(1)) if m else None
+
+
+@dataclass(frozen=True)
+class EventInfo:
+    name: str
+    date: pd.Timestamp | None    # 추정 날짜 포함 (날짜가 하나도 없으면 None)
+    date_source: str             # TITLE / CHECKIN / ESTIMATED / UNKNOWN
+    kind: str
+    capacity: int | None
+    tab_position: int            # 불러온 탭 순서 (날짜가 같을 때의 순서)
+
+
+class EventCatalog:
+    """
+    날짜순 이벤트 목록 + 정렬된 날짜 색인. 스냅샷마다 한 번 만들고 바뀌지 않습니다.
+    names[i]의 날짜가 _ordinals[i]라 기간 조회는 bisect 두 번으로 names의 구간이 됩니다.
+    """
+
+    def __init__(self, infos: list[EventInfo]):
+        ordered = sorted(infos, key=lambda e: (e.date is None, e.date or pd.Timestamp.min, e.tab_position))
+        self.infos: dict[str, EventInfo] = {e.name: e for e in ordered}
+        self.names: list[str] = [e.name for e in ordered]
+        self._position = {name: i for i, name in enumerate(self.names)}
+        # 날짜 있는 이벤트는 앞쪽에 모여 있음 (날짜가 하나도 없으면 빈 색인)
+        self._ordinals: list[int] = [e.date.toordinal() for e in ordered if e.date is not None]
+
+    @classmethod
+    def build(cls, events: dict[str, pd.DataFrame], fingerprints: dict[str, str] | None = None) -> "EventCatalog":
+        """불러온 탭(탭 순서대로)으로 카탈로그를 만듭니다."""
+        found = event_dates(events, fingerprints)
+        names = list(found)
+        sources = [
+            UNKNOWN if found[n] is None else TITLE if parse_title_date(n) is not None else CHECKIN
+            for n in names
+        ]
+        # 날짜 없는 탭은 탭 순서상 이웃의 날짜로 추정 (event_buckets와 같은 규칙)
+        filled = pd.Series([found[n] for n in names], dtype="datetime64[ns]").ffill().bfill()
+        infos = [
+            EventInfo(
+                name=n,
+                date=None if pd.isna(d) else d,
+                date_source=ESTIMATED if s == UNKNOWN and not pd.isna(d) else s,
+                kind=event_kind(n),
+                capacity=event_capacity(n),
+                tab_position=i,
+            )
+            for i, (n, d, s) in enumerate(zip(names, filled, sources))
+        ]
+        return cls(infos)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def dated(self) -> bool:
+        return bool(self._ordinals)
+
+    @property
+    def first_date(self) -> date | None:
+        return date.fromordinal(self._ordinals[0]) if self._ordinals else None
+
+    @property
+    def last_date(self) -> date | None:
+        return date.fromordinal(self._ordinals[-1]) if self._ordinals else None
+
+    @property
+    def kinds(self) -> list[str]:
+        return sorted({e.kind for e in self.infos.values()})
+
+    def dates(self) -> dict[str, pd.Timestamp | None]:
+        """탭 이름·체크인에서 찾은 날짜만 (추정 제외) — 시작 시각·월 묶음 계산용."""
+        return {n: (e.date if e.date_source in (TITLE, CHECKIN) else None) for n, e in self.infos.items()}
+
+    # ── 필터 (모두 날짜순 이름 목록을 반환) ──
+    def between(self, start: date | None = None, end: date | None = None) -> list[str]:
+        """start ~ end(포함) 사이 이벤트. 한쪽을 비우면 그쪽은 제한 없음."""
+        lo = bisect_left(self._ordinals, start.toordinal()) if start else 0
+        hi = bisect_right(self._ordinals, end.toordinal()) if end else len(self._ordinals)
+        return self.names[lo:hi]
+
+    def of_kind(self, names: list[str], kinds: list[str] | set[str]) -> list[str]:
+        return [n for n in names if self.infos[n].kind in kinds]
+
+    def order(self, names) -> list[str]:
+        """주어진 이벤트를 날짜순으로 (카탈로그에 없는 이름은 뒤에, 원래 순서대로)."""
+        end = len(self.names)
+        return sorted(names, key=lambda n: self._position.get(n, end))
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                {
+                    "이벤트": e.name,
+                    "날짜": e.date.date() if e.date is not None else None,
+                    "날짜 출처": e.date_source,
+                    "종류": e.kind,
+                    "정원": e.capacity,
+                }
+                for e in self.infos.values()
+            ],
+            columns=["이벤트", "날짜", "날짜 출처", "종류", "정원"],
+        ).astype({"정원": "Int64"})
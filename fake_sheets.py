@@ -0,0 +1,236 @@
+"""
+합성 시트 데이터 생성기.
+실제 Google Sheets 없이 동등성 검사·벤치마크·부하 테스트를 돌릴 때 사용합니다.
+값은 Sheets API 응답과 같은 모양(헤더 + 문자열 행, 빈 칸은 "")으로 만듭니다.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+from data_loader import values_to_frame
+
+HEADERS = [
+    "타임스탬프",
+    "이메일 주소",
+    "이름",
+    "연락처",
+    "결제 방법 (계좌이체 / 현장 결제)",
+    "어떻게 알게 되셨나요?",
+    "CheckedInAt",
+    "CheckinCount",
+]
+PAYMENT_ANSWERS = ["입금 완료했습니다", "현장에서 현금으로 직접 낼게요", "cash", "카드", ""]
+REFERRAL_ANSWERS = ["인스타", "Instagram", "insta", "지인 소개", "친구", "카톡 오픈채팅", "에타", "네이버 카페", ""]
+
+
+def make_sheet_values(
+    n_events: int = 20,
+    n_members: int = 300,
+    seed: int = 0,
+    attend_rate: float = 0.25,
+    noshow_rate: float = 0.15,
+    extra_columns: int = 0,
+) -> dict[str, list[list[str]]]:
+    """{탭 이름: [헤더, 행...]} 형태의 합성 시트 값.
+    멤버마다 참석 성향이 달라 단골·뜨내기가 섞이고, 일부 행은 짧게 잘려 있습니다."""
+    rng = random.Random(seed)
+    propensity = [min(0.95, rng.betavariate(1.2, 3) * attend_rate * 4) for _ in range(n_members)]
+    start = pd.Timestamp("2024-01-06")
+    headers = HEADERS + [f"추가 질문 {i + 1}" for i in range(extra_columns)]
+
+    sheets: dict[str, list[list[str]]] = {}
+    for e in range(n_events):
+        day = start + pd.Timedelta(days=7 * e)
+        rows = []
+        for m in range(n_members):
+            if rng.random() >= propensity[m]:
+                continue
+            checked = rng.random() >= noshow_rate
+            stamp = day + pd.Timedelta(hours=19, minutes=rng.randint(-20, 45))
+            row = [
+                (day - pd.Timedelta(days=rng.randint(1, 6))).strftime("%Y-%m-%d %H:%M:%S"),
+                f"member{m}@example.com",
+                f"멤버{m}",
+                f"010-{1000 + m:04d}-{(m * 7919) % 10000:04d}",
+                rng.choice(PAYMENT_ANSWERS),
+                rng.choice(REFERRAL_ANSWERS),
+                stamp.strftime("%Y-%m-%d %H:%M:%S") if checked else "",
+                str(rng.choice([1, 1, 1, 2])) if checked else "",
+            ] + [rng.choice(["예", "아니오", ""]) for _ in range(extra_columns)]
+            # Sheets API는 뒤쪽 빈 칸을 잘라서 돌려줌
+            while row and row[-1] == "":
+                row.pop()
+            rows.append(row)
+        sheets[day.strftime("%Y-%m-%d")] = [headers] + rows
+    return sheets
+
+
+def make_events(**kwargs) -> dict[str, pd.DataFrame]:
+    """make_sheet_values 결과를 로더와 같은 방식으로 DataFrame으로 바꿉니다."""
+    events = {}
+    for title, values in make_sheet_values(**kwargs).items():
+        df = values_to_frame(values)
+        if df is not None:
+            events[title] = df
+    return events
+
+
+def edge_case_events() -> dict[str, dict[str, pd.DataFrame]]:
+    """경계 사례 모음: {사례 이름: events}"""
+    base = make_events(n_events=4, n_members=40, seed=7)
+    titles = list(base)
+
+    def frame(rows: list[dict]) -> pd.DataFrame:
+        return pd.DataFrame(rows, dtype=object).astype(object).where(lambda d: d.notna(), pd.NA)
+
+    no_checkin = {t: df.drop(columns=["CheckedInAt", "CheckinCount"]) for t, df in base.items()}
+
+    empty_checkin = dict(base)
+    empty_checkin[titles[1]] = base[titles[1]].assign(CheckedInAt=pd.NA)
+
+    duplicate_emails = dict(base)
+    dup = base[titles[2]]
+    # 같은 사람이 두 번 등록 (대소문자·공백만 다름, 한쪽은 체크인 안 함)
+    twice = dup.head(5).copy()
+    twice["이메일 주소"] = twice["이메일 주소"].str.upper() + "  "
+    twice["CheckedInAt"] = pd.NA
+    duplicate_emails[titles[2]] = pd.concat([dup, twice], ignore_index=True)
+
+    name_collisions = {
+        "2024-05-04": frame([
+            {"이메일 주소": "kim1@example.com", "이름": "김민수", "CheckedInAt": "2024-05-04 19:00:00"},
+            {"이메일 주소": "kim2@example.com", "이름": "김민수", "CheckedInAt": "2024-05-04 19:05:00"},
+            {"이메일 주소": "lee@example.com", "이름": "이서연", "CheckedInAt": None},
+        ]),
+        "2024-05-11": frame([
+            {"이메일 주소": "kim2@example.com", "이름": "김민수", "CheckedInAt": "2024-05-11 19:02:00"},
+            {"이메일 주소": "lee@example.com", "이름": " 이서연 ", "CheckedInAt": "2024-05-11 19:10:00"},
+            {"이메일 주소": "park@example.com", "이름": None, "CheckedInAt": "2024-05-11 19:11:00"},
+        ]),
+    }
+
+    missing_emails = dict(base)
+    holes = base[titles[0]].copy()
+    holes.loc[holes.index[:6], "이메일 주소"] = pd.NA
+    holes.loc[holes.index[6:8], "이메일 주소"] = "   "
+    missing_emails[titles[0]] = holes
+
+    empty_tabs = dict(base)
+    empty_tabs["빈 탭"] = frame([{"이메일 주소": None, "이름": None, "CheckedInAt": None}])
+    empty_tabs["이메일 없는 탭"] = frame([{"이름": "홍길동", "CheckedInAt": "2024-06-01 19:00:00"}])
+
+    return {
+        "no_checkin_column": no_checkin,
+        "checkin_column_empty": empty_checkin,
+        "duplicate_emails": duplicate_emails,
+        "name_collisions": name_collisions,
+        "missing_emails": missing_emails,
+        "empty_tabs": empty_tabs,
+        "single_event": {titles[0]: base[titles[0]]},
+    }
+
+
+# ── 가짜 Sheets 백엔드 ───────────────────────────────────────────────────────
+class _Response:
+    def __init__(self, payload: dict):
+        self.content = json.dumps(payload, ensure_ascii=False).encode()
+
+    def json(self) -> dict:
+        return json.loads(self.content)
+
+
+class FakeHTTPClient:
+    """
+    gspread HTTPClient 대역. 스프레드시트 ID마다 ID로 시드한 합성 시트를 만들어 두고 응답합니다.
+    요청은 모두 request()를 거치므로 sheets_meter의 계측·요청 예산이 실제와 같이 적용됩니다.
+    """
+
+    def __init__(self, n_events: int = 20, n_members: int = 300, latency: float = 0.0):
+        self.n_events, self.n_members, self.latency = n_events, n_members, latency
+        self._books: dict[str, tuple[str, dict[str, list[list[str]]]]] = {}
+        self._guard = threading.Lock()
+
+    def _book(self, key: str) -> tuple[str, dict[str, list[list[str]]]]:
+        with self._guard:
+            if key not in self._books:
+                seed = zlib.crc32(key.encode())
+                self._books[key] = (f"Fake {key}", make_sheet_values(self.n_events, self.n_members, seed=seed))
+            return self._books[key]
+
+    def request(self, method: str, endpoint: str, params=None, **kwargs) -> _Response:
+        if self.latency:
+            time.sleep(self.latency)
+        key, _, rng = endpoint.partition("/values/")
+        title, tabs = self._book(key)
+        with self._guard:
+            if not rng:
+                return _Response({"properties": {"title": title}, "sheets": [{"properties": {"title": t}} for t in tabs]})
+            tab = rng[1:-1].replace("''", "'") if rng.startswith("'") else rng
+            return _Response({"range": rng, "values": [list(r) for r in tabs.get(tab, [])]})
+
+    def append_row(self, key: str, row: list[str]) -> None:
+        """마지막 탭에 행을 추가합니다 (행사 중 등록·체크인 흉내)."""
+        _, tabs = self._book(key)
+        with self._guard:
+            tabs[list(tabs)[-1]].append(row)
+
+
+class _FakeWorksheet:
+    def __init__(self, spreadsheet: "_FakeSpreadsheet", title: str):
+        self.spreadsheet, self.title = spreadsheet, title
+
+    def get_all_values(self) -> list[list[str]]:
+        return self.spreadsheet.values_get("'" + self.title.replace("'", "''") + "'").get("values", [])
+
+
+class _FakeSpreadsheet:
+    def __init__(self, http: FakeHTTPClient, key: str):
+        self.http, self.id = http, key
+        self.title = self._metadata()["properties"]["title"]  # gspread도 열 때 메타데이터를 한 번 읽음
+
+    def _metadata(self) -> dict:
+        return self.http.request("get", self.id).json()
+
+    def worksheets(self) -> list[_FakeWorksheet]:
+        return [_FakeWorksheet(self, s["properties"]["title"]) for s in self._metadata()["sheets"]]
+
+    def worksheet(self, title: str) -> _FakeWorksheet:
+        from gspread import WorksheetNotFound
+
+        for ws in self.worksheets():
+            if ws.title == title:
+                return ws
+        raise WorksheetNotFound(title)
+
+    def values_get(self, range_name: str, params=None) -> dict:
+        return self.http.request("get", f"{self.id}/values/{range_name}", params=params).json()
+
+
+class FakeSheetsClient:
+    """gspread.Client 대역 — data_loader가 쓰는 open_by_key만 있습니다."""
+
+    def __init__(self, n_events: int = 20, n_members: int = 300, latency: float = 0.0):
+        self.http_client = FakeHTTPClient(n_events, n_members, latency)
+
+    def open_by_key(self, key: str) -> _FakeSpreadsheet:
+        return _FakeSpreadsheet(self.http_client, key)
+
+
+_fake_clients: dict[tuple, FakeSheetsClient] = {}
+
+
+def fake_client(secrets) -> FakeSheetsClient:
+    """secrets의 fake_events·fake_members·fake_latency_ms로 가짜 클라이언트를 돌려줍니다.
+    설정이 같으면 같은 클라이언트 — 클라이언트 캐시가 만료돼도 추가된 행이 남아 있습니다."""
+    config = (
+        int(secrets.get("fake_events", 20)),
+        int(secrets.get("fake_members", 300)),
+        float(secrets.get("fake_latency_ms", 0)) / 1000,
+    )
+    if config not in _fake_clients:
+        _fake_clients[config] = FakeSheetsClient(*config)
+    return _fake_clients[config]
@@ -0,0 +1,98 @@
+"""
+스프레드시트 불러오기용 공유 작업 풀 (여러 모임이 한 프로세스를 쓸 때).
+모든 모임의 시트 요청이 스레드 MAX_FETCH_WORKERS개를 함께 쓰고,
+대기열은 모임(tenant)별로 따로 두어 돌아가며(round-robin) 하나씩 꺼냅니다.
+시트가 많은 모임이 새로고침을 몰아 보내도 다른 모임의 요청은 한 바퀴 안에 실행됩니다.
+
+반환값은 concurrent.futures.Future라 ThreadPoolExecutor와 같은 방식으로 기다립니다.
+호출 위치·새로고침 계측(sheets_meter)은 bind_context로 작업 스레드까지 이어집니다.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import pandas as pd
+
+from sheets_meter import bind_context
+
+MAX_FETCH_WORKERS = 4   # 동시에 불러올 스프레드시트 수 (모든 모임 합계)
+
+
+class FairPool:
+    """모임별 대기열을 돌아가며 처리하는 고정 크기 스레드 풀."""
+
+    def __init__(self, workers: int = MAX_FETCH_WORKERS):
+        self.workers = workers
+        self._queues: OrderedDict[str, deque] = OrderedDict()  # 대기 작업이 있는 모임만, 다음 차례가 앞
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def submit(self, tenant: str, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        task = (future, bind_context(fn), args, kwargs, time.perf_counter())
+        with self._cond:
+            self._queues.setdefault(tenant, deque()).append(task)
+            self._stat(tenant)["대기"] += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"sheets-fetch-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def run(self, tenant: str, fn, *args, **kwargs):
+        """풀에서 실행하고 결과를 기다립니다 (예외는 그대로 올라옴)."""
+        return self.submit(tenant, fn, *args, **kwargs).result()
+
+    def map(self, tenant: str, fn, items) -> list:
+        """items를 풀에서 병렬로 처리합니다. 반환 순서는 items 순서와 같습니다."""
+        return [f.result() for f in [self.submit(tenant, fn, item) for item in items]]
+
+    def _next(self):
+        """다음 차례 모임의 작업 하나. 그 모임에 작업이 남았으면 맨 뒤로 보냄."""
+        tenant, queue = next(iter(self._queues.items()))
+        task = queue.popleft()
+        if queue:
+            self._queues.move_to_end(tenant)
+        else:
+            del self._queues[tenant]
+        return tenant, task
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                tenant, (future, fn, args, kwargs, queued_at) = self._next()
+                stat = self._stat(tenant)
+                stat["대기"] -= 1
+                stat["실행 중"] += 1
+                stat["대기 시간"] += time.perf_counter() - queued_at
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    stat["실행 중"] -= 1
+                    stat["완료"] += 1
+
+    def _stat(self, tenant: str) -> dict[str, float]:
+        return self._stats.setdefault(tenant, {"대기": 0, "실행 중": 0, "완료": 0, "대기 시간": 0.0})
+
+    def stats(self) -> pd.DataFrame:
+        """모임별: 대기, 실행 중, 완료, 평균 대기(ms)"""
+        with self._cond:
+            rows = {tenant: dict(s) for tenant, s in self._stats.items()}
+        df = pd.DataFrame.from_dict(rows, orient="index", columns=["대기", "실행 중", "완료", "대기 시간"], dtype=float)
+        df = df.astype({c: int for c in ("대기", "실행 중", "완료")})
+        df["평균 대기 ms"] = (df.pop("대기 시간") / df["완료"].where(df["완료"] > 0) * 1000).round(0)
+        return df
+
+
+# 프로세스 전체에서 공유하는 풀
+FETCH_POOL = FairPool()
@@ -0,0 +1,16 @@
+"""
+Plotly 그림 캐시.
+같은 (데이터 버전, 이벤트 선택, 언어, 테마)의 그림은 한 번만 만들고, 모든 세션·재실행이
+공유 캐시(cache_budget)의 figure 이름 공간에서 꺼내 씁니다. 행사 중 여러 사람이 같은 화면을
+계속 새로고침해도 plotly express로 그림을 다시 만드는 비용(그림당 수십 ms)이 들지 않습니다.
+
+JSON 문자열이나 dict가 아니라 검증이 끝난 go.Figure를 저장합니다. st.plotly_chart는 dict를 받으면
+go.Figure로 다시 검증하므로(그림당 약 20 ms) 그림 객체를 넘기는 쪽이 더 빠릅니다.
+꺼낸 그림은 여러 세션이 함께 쓰므로 고쳐 쓰면 안 됩니다.
+"""
+from cache_budget import CACHE, FIGURE
+
+
+def figure(name: str, key: tuple, build):
+    """name 그림을 key별로 한 번만 build()로 만듭니다. 그림에 영향을 주는 값은 모두 key에 넣어야 합니다."""
+    return CACHE.get_or_build(FIGURE, (name, *key), build)
@@ -0,0 +1,104 @@
+"""
+동일인 식별 (identity resolution).
+같은 사람이 이벤트마다 다른 이메일로 등록한 경우를 한 명으로 합칩니다.
+
+합치는 근거:
+- 같은 전화번호 (숫자만 비교, +82 10… → 010…)
+- secrets의 identity_aliases 목록 (같은 사람의 이메일 묶음)
+- 같은 이름 + 같은 이메일 아이디 (예: minsu.kim@gmail.com / minsu.kim@naver.com)
+
+이름만 같은 경우는 동명이인일 수 있어 합치지 않습니다.
+이메일 해시 단위 union-find(경로 압축 + 크기 기준 합치기)라 행 수에 거의 선형입니다.
+결과는 data_service.build_snapshot에서 한 번 적용되어 모든 파생 테이블이 같은 기준으로 중복 제거됩니다.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from data_loader import anonymize_email, identity_signals
+
+
+class UnionFind:
+    """0..n-1 원소의 서로소 집합."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:  # 경로 압축
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def identity_aliases(secrets) -> tuple[tuple[str, ...], ...]:
+    """secrets의 identity_aliases (이메일 목록의 목록)를 읽습니다. 두 개 이상인 묶음만 사용."""
+    groups = []
+    for group in secrets.get("identity_aliases", []):
+        emails = tuple(str(e).strip() for e in group if str(e).strip())
+        if len(emails) > 1:
+            groups.append(emails)
+    return tuple(groups)
+
+
+def aliases_digest(aliases: tuple[tuple[str, ...], ...]) -> str:
+    """별칭 설정의 요약 — 데이터 버전에 섞어 설정이 바뀌면 분석 캐시도 새로 계산되게 합니다."""
+    if not aliases:
+        return ""
+    return hashlib.sha256(repr(aliases).encode()).hexdigest()[:16]
+
+
+def resolve_identities(
+    events: dict[str, pd.DataFrame],
+    fingerprints: dict[str, str] | None = None,
+    aliases: tuple[tuple[str, ...], ...] = (),
+) -> dict[str, str]:
+    """
+    반환: user_hash -> 대표 user_hash. 다른 해시와 합쳐진 해시만 들어 있습니다.
+    대표는 묶음에서 가장 먼저 등장한 해시(이벤트 순서 기준)입니다.
+    """
+    signals = identity_signals(events, fingerprints)
+    alias_rows = [(anonymize_email(e), i) for i, group in enumerate(aliases) for e in group]
+    codes, hashes = pd.factorize(pd.concat([
+        signals["user_hash"],
+        pd.Series([h for h, _ in alias_rows], dtype=object),
+    ], ignore_index=True))
+    if len(hashes) == 0:
+        return {}
+
+    uf = UnionFind(len(hashes))
+    n_sig = len(signals)
+    name_local = signals["name"].astype("string").str.cat(signals["local"].astype("string"), sep="\x1f")
+    for key in (signals["phone"].astype("string"), name_local):
+        mask = key.notna().to_numpy()
+        if not mask.any():
+            continue
+        sig_codes = pd.Series(codes[:n_sig][mask])
+        # 같은 단서를 가진 해시를 그 단서의 첫 해시와 합침
+        first = sig_codes.groupby(key[mask].to_numpy()).transform("first").to_numpy()
+        for a, b in zip(sig_codes.to_numpy(), first):
+            if a != b:
+                uf.union(a, b)
+    alias_codes = codes[n_sig:]
+    for i in range(1, len(alias_rows)):
+        if alias_rows[i][1] == alias_rows[i - 1][1]:
+            uf.union(alias_codes[i - 1], alias_codes[i])
+
+    roots = np.array([uf.find(i) for i in range(len(hashes))])
+    # 묶음마다 가장 작은 코드(먼저 등장한 해시)를 대표로
+    rep = pd.Series(np.arange(len(hashes))).groupby(roots).transform("min").to_numpy()
+    merged = rep != np.arange(len(hashes))
+    return dict(zip(hashes[merged], hashes[rep[merged]]))
@@ -0,0 +1,225 @@
+"""
+대시보드 동시 접속 부하 테스트.
+Streamlit 테스트 API(AppTest)로 app.py를 브라우저 없이 여러 세션에서 동시에 실행합니다.
+시트는 가짜 백엔드(sheets_backend = "fake", fake_sheets)라 Google Sheets 할당량을 쓰지 않지만,
+요청은 실제와 같은 경로(data_loader → sheets_meter)를 거치므로 요청 수·예산도 그대로 측정됩니다.
+
+    python loadtest.py                                   # 40세션 × 조작 6회
+    python loadtest.py --sessions 50 --actions 10 --events 60 --members 800 --latency-ms 150
+    python loadtest.py --max-p95 2.0                     # p95가 2초를 넘으면 종료 코드 1
+
+세션마다 이벤트 범위 변경(전체·기간·최근 N개·직접 선택), 탭 안 위젯(코호트 단위·입구 혼잡도 이벤트), 언어 전환, 새로고침 버튼,
+단순 재실행을 무작위로 섞습니다. st.tabs는 매 실행마다 모든 탭을 그리므로 탭 전환 자체는
+서버 비용이 없어 탭 안 위젯 조작으로 대신합니다. 실행 중에는 마지막 탭에 등록 행이 계속 추가됩니다.
+"""
+import argparse
+import random
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import streamlit as st
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+import fake_sheets
+from sheets_meter import METER
+
+SPREADSHEET_ID = "loadtest"
+ACTIONS = ["rerun", "select", "cohort", "door", "language", "refresh"]
+WEIGHTS = [3, 3, 2, 1, 1, 1]
+
+# 위젯은 표시 문구로 찾음 (app.py TRANSLATIONS의 ko / en)
+COHORT_LABELS = ("코호트 단위", "Cohort unit")
+DOOR_LABELS = ("입구 혼잡도를 볼 이벤트", "Event for door load")
+REFRESH_LABELS = ("🔄 새로고침", "🔄 Refresh")
+FILTER_LABELS = ("이벤트 범위", "Event range")
+LAST_N_LABELS = ("최근 이벤트 수", "Number of recent events")
+PICK_LABELS = ("분석할 이벤트 선택", "Select events to analyze")
+
+
+def _rss_mb() -> float:
+    """프로세스 최대 RSS(MB). Linux는 KiB, macOS는 바이트 단위."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _find(widgets, labels):
+    return next((w for w in widgets if w.label in labels), None)
+
+
+def _act(at: AppTest, action: str, rng: random.Random) -> str:
+    """조작 하나를 적용합니다. 대상 위젯이 없으면 단순 재실행으로 바꿔 실행하고 그 이름을 돌려줍니다."""
+    if action == "select":
+        # 이벤트 범위: 지금 모드의 위젯(최근 N개·직접 선택·기간)을 조정하거나 다른 모드로 바꿈
+        mode = _find(at.radio, FILTER_LABELS)
+        last = _find(at.number_input, LAST_N_LABELS)
+        pick = _find(at.multiselect, PICK_LABELS)
+        if last is not None and rng.random() < 0.7:
+            last.set_value(rng.randint(last.min, last.max))
+        elif pick is not None and rng.random() < 0.7:
+            options = list(pick.options)
+            pick.set_value(rng.sample(options, rng.randint(1, len(options))))
+        elif at.date_input and rng.random() < 0.7:
+            start, end = at.date_input[0].value
+            lo = start + timedelta(days=rng.randint(0, (end - start).days))
+            at.date_input[0].set_value((lo, lo + timedelta(days=rng.randint(0, (end - lo).days))))
+        elif mode is not None:
+            mode.set_value(rng.choice([m for m in mode.options if m != mode.value]))
+    elif action == "cohort" and (widget := _find(at.radio, COHORT_LABELS)) is not None:
+        widget.set_value(rng.choice([o for o in widget.options if o != widget.value]))
+    elif action == "door" and (widget := _find(at.selectbox, DOOR_LABELS)) is not None:
+        widget.set_value(rng.choice(widget.options))
+    elif action == "language":
+        lang = at.radio(key="lang_radio")
+        lang.set_value("English" if lang.value == "한국어" else "한국어")
+    elif action == "refresh" and (widget := _find(at.button, REFRESH_LABELS)) is not None:
+        widget.click()
+    else:
+        action = "rerun"
+    at.run()
+    return action
+
+
+def use_secrets(secrets: dict) -> None:
+    """
+    모든 세션이 함께 쓰는 st.secrets를 한 번만 설정합니다.
+    AppTest에 secrets를 주면 실행마다 전역 st.secrets를 바꿨다가 되돌리므로,
+    여러 세션이 동시에 실행되면 서로의 설정을 덮어써 엉뚱한 화면이 나옵니다.
+    """
+    shared = Secrets()
+    shared._secrets = secrets
+    st.secrets = shared
+
+
+def run_session(index: int, args, results: dict, guard: threading.Lock) -> None:
+    rng = random.Random(args.seed * 1000 + index)
+    time.sleep(args.ramp * index / max(1, args.sessions))
+    at = AppTest.from_file("app.py", default_timeout=args.timeout)
+    at.session_state["authenticated"] = True
+
+    timings: list[tuple[str, float]] = []
+    errors: list[str] = []
+    harness: list[str] = []
+    for step in range(args.actions + 1):
+        action = "first load" if step == 0 else rng.choices(ACTIONS, WEIGHTS)[0]
+        start = time.perf_counter()
+        try:
+            if step == 0:
+                at.run()
+            else:
+                action = _act(at, action, rng)
+        except KeyError as e:
+            # AppTest는 실행마다 전역 Runtime을 바꿔 끼워, 동시 실행 중 드물게 위젯 상태를 못 찾음 (앱 오류 아님)
+            harness.append(f"session {index} / {action}: KeyError: {e}")
+            break
+        except Exception as e:  # 시간 초과 등 — 세션 하나가 실패해도 나머지는 계속
+            errors.append(f"session {index} / {action}: {type(e).__name__}: {e}")
+            break
+        timings.append((action, time.perf_counter() - start))
+        errors += [f"session {index} / {action}: {e.value}" for e in at.exception]
+        time.sleep(rng.uniform(0, args.think))
+    with guard:
+        for action, seconds in timings:
+            results[action].append(seconds)
+        results["errors"] += errors
+        results["harness"] += harness
+
+
+def live_writer(client: fake_sheets.FakeSheetsClient, stop: threading.Event, interval: float) -> None:
+    """행사 중처럼 마지막 탭에 등록·체크인 행을 계속 추가합니다."""
+    n = 0
+    while not stop.wait(interval):
+        n += 1
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        client.http_client.append_row(
+            SPREADSHEET_ID, [stamp, f"walkin{n}@example.com", f"현장{n}", "", "", "", stamp, "1"]
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="대시보드 동시 접속 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=40, help="동시 세션 수")
+    parser.add_argument("--actions", type=int, default=6, help="세션당 조작 횟수 (첫 로드 제외)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="모든 세션이 시작될 때까지 걸리는 시간(초)")
+    parser.add_argument("--think", type=float, default=1.0, help="조작 사이 최대 대기(초)")
+    parser.add_argument("--events", type=int, default=20, help="가짜 시트 탭(이벤트) 수")
+    parser.add_argument("--members", type=int, default=300, help="가짜 시트 멤버 수")
+    parser.add_argument("--latency-ms", type=float, default=0, help="가짜 Sheets 요청당 지연(ms)")
+    parser.add_argument("--live-interval", type=float, default=2.0, help="마지막 탭에 행을 추가하는 간격(초), 0이면 끔")
+    parser.add_argument("--timeout", type=float, default=300, help="재실행 한 번의 최대 시간(초)")
+    parser.add_argument("--max-p95", type=float, default=None, help="재실행 p95 상한(초) — 넘으면 종료 코드 1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    secrets = {
+        "password": "loadtest",
+        "sheets_backend": "fake",
+        "spreadsheet_id": SPREADSHEET_ID,
+        "fake_events": args.events,
+        "fake_members": args.members,
+        "fake_latency_ms": args.latency_ms,
+    }
+    use_secrets(secrets)
+    rss_start = _rss_mb()
+
+    results: dict[str, list] = defaultdict(list)
+    guard = threading.Lock()
+    stop = threading.Event()
+    if args.live_interval > 0:
+        # 앱과 같은 가짜 클라이언트(설정이 같으면 공유)에 행을 추가
+        client = fake_sheets.fake_client(secrets)
+        threading.Thread(target=live_writer, args=(client, stop, args.live_interval), daemon=True).start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        for i in range(args.sessions):
+            pool.submit(run_session, i, args, results, guard)
+    elapsed = time.perf_counter() - started
+    stop.set()
+
+    print(f"{args.sessions} sessions × {args.actions} actions in {elapsed:.1f}s — fake sheet: "
+          f"{args.events} tabs × {args.members} members, {args.latency_ms:g} ms/request")
+    reruns = [s for action, values in results.items() if action not in ("first load", "errors", "harness") for s in values]
+    rows = [("first load", results["first load"]), ("all reruns", reruns)]
+    rows += [(action, results[action]) for action in ACTIONS if results[action]]
+    print(f"  {'':<12} {'n':>5} {'p50':>8} {'p95':>8} {'max':>8}")
+    for name, values in rows:
+        if values:
+            print(f"  {name:<12} {len(values):>5} {_percentile(values, 50):>7.2f}s "
+                  f"{_percentile(values, 95):>7.2f}s {max(values):>7.2f}s")
+
+    print(f"peak RSS: {_rss_mb():.0f} MB (before sessions {rss_start:.0f} MB)")
+    stats = METER.stats()
+    refreshes = METER.recent_refreshes()
+    print(f"Sheets API: {int(stats['요청'].sum())} requests, {stats['KB'].sum():.0f} KB, "
+          f"{int(stats['차단'].sum())} blocked, {int(stats['캐시 대체'].sum())} served from cache, "
+          f"{len(refreshes)} refreshes")
+    if not stats.empty:
+        print(stats.to_string())
+
+    errors = results["errors"]
+    print(f"exceptions: {len(errors)}")
+    for e in errors[:20]:
+        print(f"  ✗ {e}")
+    if results["harness"]:
+        print(f"AppTest races (not counted as failures): {len(results['harness'])}")
+        for e in results["harness"][:5]:
+            print(f"  ~ {e}")
+    failed = bool(errors)
+    if args.max_p95 is not None and reruns and _percentile(reruns, 95) > args.max_p95:
+        print(f"  ✗ rerun p95 {_percentile(reruns, 95):.2f}s > {args.max_p95}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+최적화 전 원래 구현 (기준 오라클).
+check_equivalence.py가 analyzer / data_loader의 최적화된 구현과 결과를 비교할 때 사용합니다.
+대시보드 숫자가 바뀌지 않았음을 보장하는 기준이므로 수정하지 마세요.
+"""
+import pandas as pd
+
+from data_loader import (
+    EMAIL_KEYWORDS,
+    NAME_KEYWORDS,
+    CHECKEDIN_COL,
+    find_column,
+    find_payment_column,
+    anonymize_email,
+)
+
+
+def event_summary(matrix: pd.DataFrame, detail_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    이벤트별 요약:
+    - 등록자 수, 실제 참석자 수, 신규/복귀 참석자 수, 복귀율
+    """
+    event_cols = list(matrix.columns)
+    results = []
+    cumulative_seen: set = set()
+
+    for event in event_cols:
+        attendees = set(matrix.index[matrix[event] > 0].tolist())
+        new_users = attendees - cumulative_seen
+        returning_users = attendees & cumulative_seen
+
+        # 복귀율: 이전까지 온 사람 중 이번에도 온 비율
+        prev_base = len(cumulative_seen)
+        retention_rate = (
+            len(returning_users) / prev_base * 100 if prev_base > 0 else None
+        )
+
+        # 등록자 수 (실제 참석 여부 무관)
+        registered_count = (
+            detail_df[detail_df["event"] == event]["user_hash"].nunique()
+            if detail_df is not None
+            else None
+        )
+
+        results.append(
+            {
+                "이벤트": event,
+                "등록자": registered_count,
+                "참석자": len(attendees),
+                "신규": len(new_users),
+                "복귀": len(returning_users),
+                "복귀율(%)": round(retention_rate, 1) if retention_rate is not None else "-",
+            }
+        )
+        cumulative_seen |= attendees
+
+    return pd.DataFrame(results)
+
+
+def cohort_retention(matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    코호트 리텐션 테이블.
+    코호트 = 처음 참석한 이벤트.
+    각 셀: 코호트 중 N번째 이후 이벤트에도 온 비율(%).
+    """
+    event_cols = list(matrix.columns)
+    n = len(event_cols)
+
+    # 각 사용자의 첫 참석 이벤트 인덱스
+    def first_event_idx(row):
+        for i, col in enumerate(event_cols):
+            if row[col] > 0:
+                return i
+        return None
+
+    matrix = matrix.copy()
+    matrix["cohort_idx"] = matrix.apply(first_event_idx, axis=1)
+    matrix = matrix.dropna(subset=["cohort_idx"])
+    matrix["cohort_idx"] = matrix["cohort_idx"].astype(int)
+
+    cohort_data = {}
+    for c_idx in range(n):
+        cohort = matrix[matrix["cohort_idx"] == c_idx]
+        if cohort.empty:
+            continue
+        cohort_size = len(cohort)
+        row = {"코호트": event_cols[c_idx], "코호트 크기": cohort_size}
+        for offset in range(n - c_idx):
+            target_idx = c_idx + offset
+            target_col = event_cols[target_idx]
+            came = cohort[target_col].sum()
+            row[f"+{offset}"] = round(came / cohort_size * 100, 1)
+        cohort_data[c_idx] = row
+
+    if not cohort_data:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(cohort_data.values()).set_index("코호트")
+    return df
+
+
+def frequency_distribution(matrix: pd.DataFrame) -> pd.DataFrame:
+    """몇 번 참석한 사람이 몇 명인지 분포."""
+    counts = matrix.sum(axis=1)
+    dist = counts.value_counts().sort_index().reset_index()
+    dist.columns = ["참석 횟수", "인원 수"]
+    return dist
+
+
+def build_attendance_matrix(
+    events: dict[str, pd.DataFrame]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    출석 매트릭스와 원본 행 데이터를 반환합니다.
+
+    출석 매트릭스: rows=이름(또는 user_hash), cols=event_name, values=0/1
+    행 데이터: user_id, event, registered, attended 컬럼
+    """
+    all_dfs = []
+    name_map: dict[str, str] = {}  # user_hash -> 이름
+
+    for event_name, df in events.items():
+        email_col = find_column(df, EMAIL_KEYWORDS)
+        if email_col is None:
+            continue
+
+        name_col = find_column(df, NAME_KEYWORDS)
+        has_checkin = CHECKEDIN_COL in df.columns and df[CHECKEDIN_COL].notna().any()
+
+        # Filter to rows with valid emails
+        email_series = df[email_col].dropna()
+        email_series = email_series[email_series.astype(str).str.strip() != ""]
+        if email_series.empty:
+            continue
+
+        hash_series = email_series.astype(str).str.strip().apply(anonymize_email)
+
+        # 이름 수집 (있을 경우)
+        if name_col:
+            name_series = df.loc[email_series.index, name_col]
+            valid_mask = name_series.notna() & (name_series.astype(str).str.strip() != "")
+            name_map.update(dict(zip(
+                hash_series[valid_mask],
+                name_series[valid_mask].astype(str).str.strip(),
+            )))
+
+        # 실제 참석 여부
+        if has_checkin:
+            attended_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
+        else:
+            attended_series = pd.Series(True, index=email_series.index)
+
+        all_dfs.append(pd.DataFrame({
+            "user_hash": hash_series.values,
+            "event": event_name,
+            "registered": True,
+            "attended": attended_series.values,
+        }))
+
+    if not all_dfs:
+        return pd.DataFrame(), pd.DataFrame()
+
+    detail_df = pd.concat(all_dfs, ignore_index=True)
+
+    # 출석 매트릭스 (실제 참석자만)
+    attended_df = detail_df[detail_df["attended"]]
+    if attended_df.empty:
+        return pd.DataFrame(), detail_df
+
+    matrix = attended_df.pivot_table(
+        index="user_hash",
+        columns="event",
+        values="attended",
+        aggfunc="max",
+        fill_value=0,
+    ).astype(int)
+
+    # 이름이 있으면 인덱스를 이름으로 교체
+    matrix.index = matrix.index.map(lambda h: name_map.get(h, h))
+    detail_df["user_hash"] = detail_df["user_hash"].map(lambda h: name_map.get(h, h))
+
+    return matrix, detail_df
+
+
+def build_payment_data(events: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    결제 컬럼이 있는 시트에서 결제 데이터를 추출합니다.
+    반환: user_hash, name, event, paid, method 컬럼의 DataFrame
+    """
+    all_dfs = []
+    name_map: dict[str, str] = {}
+
+    for event_name, df in events.items():
+        email_col = find_column(df, EMAIL_KEYWORDS)
+        if email_col is None:
+            continue
+
+        payment_col = find_payment_column(df)
+        if payment_col is None:
+            continue
+
+        name_col = find_column(df, NAME_KEYWORDS)
+
+        email_series = df[email_col].dropna()
+        email_series = email_series[email_series.astype(str).str.strip() != ""]
+        if email_series.empty:
+            continue
+
+        hash_series = email_series.astype(str).str.strip().apply(anonymize_email)
+
+        if name_col:
+            name_series = df.loc[email_series.index, name_col]
+            valid_mask = name_series.notna() & (
+                name_series.astype(str).str.strip() != ""
+            )
+            name_map.update(
+                dict(
+                    zip(
+                        hash_series[valid_mask],
+                        name_series[valid_mask].astype(str).str.strip(),
+                    )
+                )
+            )
+
+        payment_series = df.loc[email_series.index, payment_col]
+        payment_str = payment_series.astype(str).str.strip()
+
+        def _classify(x: str) -> str:
+            xl = x.lower()
+            if "입금" in x:
+                return "계좌이체"
+            if "직접" in x or "현금" in x or "cash" in xl:
+                return "현금"
+            if x and x != "nan":
+                return "기타"
+            return ""
+
+        has_payment = payment_series.notna() & (payment_str != "") & (payment_str != "nan")
+        method_series = payment_str.apply(_classify).where(has_payment)
+
+        # 현금은 미결제로 처리
+        paid_series = has_payment & (method_series != "현금")
+
+        # 체크인 여부
+        if CHECKEDIN_COL in df.columns:
+            checkin_series = df.loc[email_series.index, CHECKEDIN_COL].notna()
+        else:
+            checkin_series = pd.Series(False, index=email_series.index)
+
+        all_dfs.append(
+            pd.DataFrame(
+                {
+                    "user_hash": hash_series.values,
+                    "event": event_name,
+                    "paid": paid_series.values,
+                    "method": method_series.values,
+                    "checked_in": checkin_series.values,
+                }
+            )
+        )
+
+    if not all_dfs:
+        return pd.DataFrame()
+
+    pay_df = pd.concat(all_dfs, ignore_index=True)
+    pay_df["name"] = pay_df["user_hash"].map(lambda h: name_map.get(h, h))
+    return pay_df
@@ -0,0 +1,222 @@
+"""
+Google Sheets API 호출 계측과 요청 예산.
+gspread 클라이언트의 HTTP 요청을 감싸 호출 위치(call site)별·새로고침별로 요청 수, 응답 크기, 지연을 셉니다.
+최근 WINDOW초 동안의 요청이 예산(secrets의 sheets_request_budget)에 닿으면 요청을 보내지 않고
+BudgetExceeded를 올립니다. data_loader는 이때 캐시된 데이터로 대신하고, 다음 새로고침에서 다시 시도합니다.
+
+Google Sheets 읽기 할당량은 사용자(서비스 계정)당 분당 60회라 기본 예산은 여유를 두고 50회입니다.
+
+여러 모임(tenancy)이면 모임마다 예산의 몫(기본: 예산 ÷ 모임 수, [tenants.<ID>]의 sheets_request_share로 조정)을
+따로 셉니다. 한 모임이 새로고침을 몰아 보내도 자기 몫까지만 쓰고, 다른 모임의 몫은 남습니다.
+요청이 어느 모임 것인지는 tenant()로 표시하며, 작업 풀 스레드까지 bind_context로 이어집니다.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_BUDGET = 50   # WINDOW초당 최대 요청 수
+WINDOW = 60           # 예산을 세는 구간(초)
+OTHER = "other"       # 호출 위치를 지정하지 않은 요청
+
+_site: contextvars.ContextVar[str] = contextvars.ContextVar("sheets_call_site", default=OTHER)
+_refresh: contextvars.ContextVar[dict | None] = contextvars.ContextVar("sheets_refresh", default=None)
+_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("sheets_tenant", default="")
+
+
+class BudgetExceeded(Exception):
+    """요청 예산을 다 써서 Google Sheets에 요청하지 않았습니다."""
+
+
+class SheetsMeter:
+    """gspread 요청 계측 + 슬라이딩 윈도 요청 예산."""
+
+    def __init__(self, budget: int = DEFAULT_BUDGET, window: float = WINDOW):
+        self.budget = budget
+        self.window = window
+        self._sent: deque[float] = deque()  # 최근 window초 안의 요청 시각
+        self._shares: dict[str, int] = {}   # 모임 ID -> 예산 중 그 모임의 몫 (없으면 전체 예산만 적용)
+        self._sent_by: dict[str, deque[float]] = {}  # 모임별 최근 요청 시각
+        self._sites: dict[str, dict[str, float]] = {}
+        self._refreshes: deque[dict] = deque(maxlen=50)
+        self._guard = threading.Lock()
+
+    # ── 호출 위치·새로고침 표시 ──
+    @contextmanager
+    def site(self, name: str):
+        """이 블록(또는 데코레이터로 감싼 함수) 안의 요청을 name으로 셉니다. 안쪽 표시가 우선."""
+        token = _site.set(name)
+        try:
+            yield
+        finally:
+            _site.reset(token)
+
+    @contextmanager
+    def tenant(self, tenant_id: str):
+        """이 블록 안의 요청을 tenant_id 모임의 몫으로 셉니다."""
+        token = _tenant.set(tenant_id)
+        try:
+            yield
+        finally:
+            _tenant.reset(token)
+
+    @contextmanager
+    def refresh(self, label: str):
+        """새로고침 한 번의 요청 합계를 기록합니다."""
+        record = {"시작": time.time(), "대상": label, "요청": 0, "bytes": 0, "요청 시간": 0.0, "캐시 대체": 0, "초": 0.0}
+        token = _refresh.set(record)
+        try:
+            yield record
+        finally:
+            _refresh.reset(token)
+            record["초"] = time.time() - record["시작"]
+            with self._guard:
+                self._refreshes.append(record)
+
+    # ── 예산 ──
+    def _prune(self, now: float) -> None:
+        for sent in (self._sent, *self._sent_by.values()):
+            while sent and now - sent[0] >= self.window:
+                sent.popleft()
+
+    def _remaining(self, tenant: str) -> int:
+        left = self.budget - len(self._sent)
+        if tenant in self._shares:
+            left = min(left, self._shares[tenant] - len(self._sent_by.get(tenant, ())))
+        return max(0, left)
+
+    def remaining(self, tenant: str | None = None) -> int:
+        """지금 보낼 수 있는 요청 수. tenant(기본: 현재 표시된 모임)의 몫이 있으면 그 안에서."""
+        with self._guard:
+            self._prune(time.time())
+            return self._remaining(_tenant.get() if tenant is None else tenant)
+
+    def can_afford(self, requests: int) -> bool:
+        return self.remaining() >= requests
+
+    def share(self, tenant: str) -> int:
+        """tenant 모임이 window초 동안 쓸 수 있는 요청 수."""
+        return min(self.budget, self._shares.get(tenant, self.budget))
+
+    def degraded(self, site: str | None = None) -> None:
+        """예산 때문에 site(기본: 현재 호출 위치)에서 요청 대신 캐시를 썼음을 기록합니다."""
+        with self._guard:
+            self._stat(site or _site.get())["캐시 대체"] += 1
+            record = _refresh.get()
+            if record is not None:
+                record["캐시 대체"] += 1
+
+    def set_budget(self, budget: int) -> None:
+        with self._guard:
+            self.budget = budget
+
+    def set_shares(self, shares: dict[str, int]) -> None:
+        with self._guard:
+            self._shares = dict(shares)
+
+    # ── 계측 ──
+    def _stat(self, site: str) -> dict[str, float]:
+        return self._sites.setdefault(
+            site, {"요청": 0, "bytes": 0, "요청 시간": 0.0, "최대 지연": 0.0, "오류": 0, "차단": 0, "캐시 대체": 0}
+        )
+
+    def wrap(self, client):
+        """gspread 클라이언트의 HTTP 요청을 계측합니다. 같은 클라이언트를 여러 번 감싸도 한 번만 적용."""
+        http = client.http_client
+        if getattr(http, "_sheets_meter", None) is self:
+            return client
+        send = http.request
+
+        def request(*args, **kwargs):
+            site, record, tenant = _site.get(), _refresh.get(), _tenant.get()
+            with self._guard:
+                now = time.time()
+                self._prune(now)
+                if self._remaining(tenant) < 1:
+                    self._stat(site)["차단"] += 1
+                    raise BudgetExceeded(
+                        f"Sheets API 요청 예산 초과 ({self.share(tenant)}회 / {self.window:g}초)"
+                    )
+                self._sent.append(now)
+                self._sent_by.setdefault(tenant, deque()).append(now)
+            start = time.perf_counter()
+            response, failed = None, False
+            try:
+                response = send(*args, **kwargs)
+                return response
+            except Exception as e:
+                failed = True
+                response = getattr(e, "response", None)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                size = len(response.content) if response is not None else 0
+                with self._guard:
+                    stat = self._stat(site)
+                    stat["요청"] += 1
+                    stat["bytes"] += size
+                    stat["요청 시간"] += elapsed
+                    stat["최대 지연"] = max(stat["최대 지연"], elapsed)
+                    stat["오류"] += failed
+                    if record is not None:
+                        record["요청"] += 1
+                        record["bytes"] += size
+                        record["요청 시간"] += elapsed
+
+        http.request = request
+        http._sheets_meter = self
+        return client
+
+    # ── 조회 ──
+    def stats(self) -> pd.DataFrame:
+        """호출 위치별 누적: 요청, KB, 평균·최대 지연(ms), 오류, 차단, 캐시 대체"""
+        with self._guard:
+            rows = {site: dict(s) for site, s in self._sites.items()}
+        df = pd.DataFrame.from_dict(
+            rows, orient="index", columns=["요청", "bytes", "요청 시간", "최대 지연", "오류", "차단", "캐시 대체"], dtype=float
+        )
+        df = df.astype({c: int for c in ("요청", "오류", "차단", "캐시 대체")})
+        df["KB"] = (df.pop("bytes") / 1024).round(1)
+        seconds = df.pop("요청 시간")
+        df["평균 ms"] = (seconds / df["요청"].where(df["요청"] > 0) * 1000).round(0)
+        df["최대 ms"] = (df.pop("최대 지연") * 1000).round(0)
+        return df[["요청", "KB", "평균 ms", "최대 ms", "오류", "차단", "캐시 대체"]]
+
+    def recent_refreshes(self) -> pd.DataFrame:
+        """최근 새로고침별 요청 합계 (최신순)."""
+        with self._guard:
+            rows = [dict(r) for r in reversed(self._refreshes)]
+        df = pd.DataFrame(rows, columns=["시작", "대상", "요청", "bytes", "요청 시간", "캐시 대체", "초"])
+        df = df.astype({"요청": int, "bytes": float, "요청 시간": float, "캐시 대체": int, "초": float})
+        df["시작"] = [time.strftime("%H:%M:%S", time.localtime(t)) for t in df["시작"]]
+        df["KB"] = (df.pop("bytes") / 1024).round(1)
+        df["요청 시간"] = df["요청 시간"].round(2)
+        df["초"] = df["초"].round(2)
+        return df[["시작", "대상", "요청", "KB", "요청 시간", "초", "캐시 대체"]]
+
+
+# 프로세스 전체에서 공유하는 계측기 (gspread 클라이언트도 하나를 공유)
+METER = SheetsMeter()
+
+
+def configure(secrets) -> None:
+    """secrets의 sheets_request_budget(분당 요청 수)으로 예산을 정합니다 (없으면 DEFAULT_BUDGET).
+    모임이 여럿이면 모임별 몫(sheets_request_share, 기본: 예산 ÷ 모임 수)도 정합니다."""
+    from tenancy import load_tenants
+
+    budget = secrets.get("sheets_request_budget")
+    if budget:
+        METER.set_budget(int(budget))
+    tenants = load_tenants(secrets)
+    if len(tenants) > 1:
+        default = max(1, METER.budget // len(tenants))
+        METER.set_shares({tid: int(t.get("sheets_request_share") or default) for tid, t in tenants.items()})
+
+
+def bind_context(fn):
+    """현재 호출 위치·새로고침 표시를 다른 스레드(ThreadPoolExecutor)에서도 쓰도록 fn을 감쌉니다."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
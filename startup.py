@@ -0,0 +1,98 @@
+"""
+서버 시작 시 미리 데우기(prewarm) 후 Streamlit을 실행하는 런처.
+
+    python startup.py                 # streamlit run app.py 와 같음
+    python startup.py --server.port 8502
+
+Streamlit 서버가 뜨는 동안 백그라운드에서 무거운 모듈을 import하고,
+gspread 클라이언트를 만들고, 첫 스냅샷을 불러옵니다. 앱과 같은 프로세스라
+배포 후 첫 방문자도 이미 로드된 대시보드를 보게 됩니다.
+각 단계의 소요 시간은 TIMINGS에 기록되어 사이드바 관리자 패널에 표시됩니다.
+secrets에 api_port가 있으면 조회 API(api_server.py)도 같은 프로세스에서 함께 띄웁니다.
+여러 모임([tenants.*], tenancy.py)이면 모든 모임의 첫 스냅샷을 함께 불러옵니다.
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROCESS_START = time.time()
+
+# 단계 이름 -> 소요 시간(초). 같은 이름은 처음 한 번만 기록
+TIMINGS: dict[str, float] = {}
+prewarm_error: str | None = None
+
+
+@contextmanager
+def timed(label: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIMINGS.setdefault(label, time.perf_counter() - start)
+
+
+def prewarm() -> None:
+    """무거운 import → 인증 클라이언트 → 첫 스냅샷 순서로 미리 준비합니다."""
+    global prewarm_error
+    try:
+        with timed("import pandas"):
+            import pandas  # noqa: F401
+        with timed("import plotly"):
+            import plotly.express  # noqa: F401
+            import plotly.graph_objects  # noqa: F401
+        with timed("import gspread"):
+            import gspread  # noqa: F401
+            import google.oauth2.service_account  # noqa: F401
+        with timed("import analyzer"):
+            import analyzer  # noqa: F401
+
+        import streamlit as st
+        from data_loader import get_gspread_client
+        from tenancy import load_tenants
+        from cache_budget import configure as configure_cache
+        from sheets_meter import configure as configure_meter
+
+        configure_cache(st.secrets)
+        configure_meter(st.secrets)
+        tenants = [t for t in load_tenants(st.secrets).values() if t.sources]
+        if not tenants:
+            return
+        with timed("gspread client"):
+            get_gspread_client()
+        services = [t.service() for t in tenants]
+        if st.secrets.get("api_port"):
+            from api_server import start_in_background, tenant_services
+
+            start_in_background(tenant_services({t.id: t for t in tenants}), port=int(st.secrets["api_port"]))
+        # 모든 모임을 함께 시작 — 시트 요청은 공유 작업 풀에서 모임별로 돌아가며 실행
+        with timed("first snapshot"):
+            for service in services:
+                service.refresh()
+            for service in services:
+                service.wait()
+            prewarm_error = "; ".join(
+                f"{t.id}: {s.last_error}" if t.id else s.last_error
+                for t, s in zip(tenants, services) if s.last_error
+            ) or None
+    except Exception as e:
+        prewarm_error = f"{type(e).__name__}: {e}"
+    finally:
+        TIMINGS.setdefault("ready since process start", time.time() - PROCESS_START)
+
+
+def main(argv: list[str]) -> int:
+    from streamlit.web import cli as stcli
+
+    threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    sys.argv = ["streamlit", "run", app, *argv]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    # 앱이 `import startup`으로 같은 TIMINGS를 보도록 __main__이 아닌 모듈로 실행
+    import startup
+
+    sys.exit(startup.main(sys.argv[1:]))
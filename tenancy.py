@@ -0,0 +1,76 @@
+"""
+여러 모임(tenant)을 한 프로세스에서 서비스하기.
+모임마다 스프레드시트·비밀번호·설정이 다르고, 프로세스 자원은 함께 씁니다.
+
+    [tenants.chess]
+    name = "체스 클럽"
+    password = "..."
+    spreadsheet_ids = ["지난시즌_ID", "현재시즌_ID"]
+    fee_krw = 15000
+
+    [tenants.boardgame]
+    name = "보드게임 모임"
+    password = "..."
+    spreadsheet_id = "..."
+
+- 모임 설정 = 공통 secrets 위에 [tenants.<ID>] 값을 덮어쓴 것. 단, 비밀번호·시트·동일인 별칭·API 토큰은
+  모임마다 따로 적어야 하며 공통 값을 물려받지 않습니다.
+- [tenants]가 없으면 지금처럼 secrets 전체가 모임 하나(ID "")입니다.
+- 공유: gspread 클라이언트(서비스 계정 하나), 시트 요청 작업 풀(fetch_pool), 요청 예산(sheets_meter),
+  메모리 예산(cache_budget). 모임별: 데이터 서비스·스냅샷, 그리고 데이터 버전을 키로 쓰는 분석·그림·API 캐시.
+
+로그인 화면에서 쓰이므로 import 시 pandas 등을 불러오지 않습니다.
+"""
+import hmac
+from dataclasses import dataclass
+
+DEFAULT_TENANT = ""
+# 공통 secrets에서 물려받지 않는 설정 — 다른 모임의 데이터·비밀번호로 새지 않도록
+PRIVATE_KEYS = ("password", "spreadsheet_id", "spreadsheet_ids", "identity_aliases", "api_token")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: str
+    name: str
+    settings: dict  # 공통 secrets + [tenants.<ID>]
+
+    def get(self, key: str, default=None):
+        return self.settings.get(key, default)
+
+    @property
+    def sources(self) -> list[dict]:
+        from data_loader import get_sources
+
+        return get_sources(self.settings)
+
+    @property
+    def aliases(self) -> tuple[tuple[str, ...], ...]:
+        from identity import identity_aliases
+
+        return identity_aliases(self.settings)
+
+    def check_password(self, password: str) -> bool:
+        expected = str(self.get("password", ""))
+        if self.id and not expected:  # 비밀번호를 적지 않은 모임은 로그인할 수 없음
+            return False
+        return hmac.compare_digest(password.encode(), expected.encode())
+
+    def service(self):
+        """이 모임의 공유 데이터 서비스 (프로세스에 하나)."""
+        from data_service import get_data_service
+
+        return get_data_service(self.sources, self.aliases, self.id)
+
+
+def load_tenants(secrets) -> dict[str, Tenant]:
+    """secrets의 [tenants.*]로 모임 목록을 만듭니다. 없으면 secrets 전체가 모임 하나."""
+    tables = secrets.get("tenants")
+    if not tables:
+        return {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, "", dict(secrets))}
+    shared = {k: v for k, v in secrets.items() if k != "tenants" and k not in PRIVATE_KEYS}
+    return {
+        str(tid): Tenant(str(tid), str(table.get("name", tid)), {**shared, **dict(table)})
+        for tid, table in tables.items()
+    }
+